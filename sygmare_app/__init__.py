@@ -1,10 +1,44 @@
 """Sygmare orchestration package for the Aurvo ecosystem."""
+from __future__ import annotations
+
+from importlib import import_module
+
+# Los nombres públicos se importan al primer uso: el cliente del daemon
+# (``python -m sygmare_app``) no debe pagar la carga del orquestador.
+_EXPORTS = {
+    "AsyncOrchestrator": "orchestrator",
+    "BuildError": "models",
+    "BuildKind": "models",
+    "BuildRecord": "models",
+    "BuildStatus": "statuses",
+    "Component": "models",
+    "Manifest": "models",
+    "QualitySpec": "models",
+    "ResourceSpec": "models",
+    "TimeoutSpec": "models",
+    "Orchestrator": "orchestrator",
+    "OrchestratorConfig": "orchestrator",
+    "Totals": "reporting",
+    "render_json": "reporting",
+    "render_table": "reporting",
+}
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
 
-from .models import BuildError, BuildKind, BuildRecord, Component, Manifest, QualitySpec
-from .orchestrator import Orchestrator, OrchestratorConfig
-from .statuses import BuildStatus
 
 __all__ = [
+    "AsyncOrchestrator",
     "BuildError",
     "BuildKind",
     "BuildRecord",
@@ -12,6 +46,8 @@ __all__ = [
     "Component",
     "Manifest",
     "QualitySpec",
+    "ResourceSpec",
+    "TimeoutSpec",
     "Orchestrator",
     "OrchestratorConfig",
     "Totals",
@@ -1,11 +1,7 @@
 """Permite ejecutar la aplicación Sygmare como módulo."""
 from __future__ import annotations
 
-from .cli import run_cli
-
-
-def main() -> int:
-    return run_cli()
+from .client import main
 
 
 if __name__ == "__main__":
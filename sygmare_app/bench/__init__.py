@@ -0,0 +1,16 @@
+"""Benchmarks de escalabilidad de Sygmare sobre repositorios sintéticos."""
+
+from .generator import MANIFEST_NAME, SyntheticSpec, generate_repo, write_stubs
+from .runner import BenchmarkRun, StageResult, compare_results, run_benchmark, write_results
+
+__all__ = [
+    "BenchmarkRun",
+    "MANIFEST_NAME",
+    "StageResult",
+    "SyntheticSpec",
+    "compare_results",
+    "generate_repo",
+    "run_benchmark",
+    "write_results",
+    "write_stubs",
+]
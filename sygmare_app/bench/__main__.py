@@ -0,0 +1,144 @@
+"""Permite ejecutar los benchmarks con ``python -m sygmare_app.bench``."""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .generator import SyntheticSpec
+from .runner import BenchmarkRun, compare_results, run_benchmark, write_results
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m sygmare_app.bench",
+        description="Mide cómo escalan las etapas de Sygmare con repositorios sintéticos.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000],
+        metavar="N",
+        help="Número de componentes de cada repositorio sintético (p. ej. 1000 10000 50000).",
+    )
+    parser.add_argument("--depth", type=int, default=8, help="Niveles de dependencias.")
+    parser.add_argument(
+        "--fan-out",
+        type=int,
+        default=3,
+        help="Dependencias de cada componente en el nivel anterior.",
+    )
+    parser.add_argument("--files", type=int, default=4, help="Archivos por componente.")
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        default=["python", "shell", "node"],
+        choices=["python", "shell", "node"],
+        help="Tipos de componente que se alternan en el repositorio.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador.")
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Ejecuta compilaciones reales (con npm/shellcheck falsos) en lugar de un dry-run.",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Trabajos en paralelo.")
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Mide también el pico de memoria Python de cada etapa (más lento).",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=None,
+        help="Directorio donde generar los repositorios; se conserva al terminar.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("sygmare-bench.json"),
+        help="Archivo JSON donde se escriben los resultados.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Resultados previos con los que comparar; termina con error si hay regresiones.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Caída de rendimiento admitida frente a --baseline (0.2 = 20%%).",
+    )
+    return parser
+
+
+def _print_run(run: BenchmarkRun) -> None:
+    print(f"▶ {run.spec.components} componentes ({'build' if run.build else 'dry-run'})")
+    for stage in run.stages:
+        memory = f"{stage.peak_rss_kb / 1024:.0f} MiB" if stage.peak_rss_kb else "-"
+        traced = (
+            f", pico Python {stage.peak_traced_bytes / 2**20:.1f} MiB"
+            if stage.peak_traced_bytes is not None
+            else ""
+        )
+        print(
+            f"    {stage.name:<14}{stage.seconds:>9.3f}s{stage.throughput:>12.0f}/s"
+            f"   RSS máx. {memory}{traced}"
+        )
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = build_argument_parser().parse_args(argv)
+    runs: List[BenchmarkRun] = []
+    for size in args.sizes:
+        spec = SyntheticSpec(
+            components=size,
+            depth=args.depth,
+            fan_out=args.fan_out,
+            files_per_component=args.files,
+            kinds=tuple(args.kinds),
+            seed=args.seed,
+        )
+        if args.workdir is not None:
+            target = args.workdir / f"bench-{size}"
+            shutil.rmtree(target, ignore_errors=True)
+            target.mkdir(parents=True)
+            workdir = nullcontext(str(target))
+        else:
+            workdir = tempfile.TemporaryDirectory(prefix="sygmare-bench-")
+        with workdir as directory:
+            runs.append(
+                run_benchmark(
+                    spec,
+                    Path(directory),
+                    build=args.build,
+                    jobs=args.jobs,
+                    trace_memory=args.tracemalloc,
+                )
+            )
+        _print_run(runs[-1])
+
+    write_results(args.output, runs)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline is not None:
+        regressions = compare_results(json.loads(args.baseline.read_text()), runs, args.tolerance)
+        if regressions:
+            print("✖ Regresiones de rendimiento:")
+            for line in regressions:
+                print(f"    {line}")
+            return 1
+        print("✔ Sin regresiones frente a la referencia.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""Generador de repositorios y manifiestos sintéticos para benchmarks."""
+from __future__ import annotations
+
+import json
+import random
+import stat
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from ..models import BuildKind
+
+MANIFEST_NAME = "sygmare_manifest.json"
+
+_NPM_STUB = """#!/bin/sh
+# npm falso para benchmarks: instala un node_modules vacío y compila al instante.
+case "$1" in
+  --version) echo "10.0.0-bench" ;;
+  ci|install) mkdir -p node_modules && : > node_modules/.bench ;;
+  run) exit 0 ;;
+esac
+exit 0
+"""
+
+_SHELLCHECK_STUB = """#!/bin/sh
+# shellcheck falso para benchmarks: nunca reporta hallazgos.
+for arg in "$@"; do
+  case "$arg" in
+    --version) echo "version: 0.0.0-bench"; exit 0 ;;
+    json|json1) echo "[]"; exit 0 ;;
+  esac
+done
+exit 0
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """Shape of a synthetic repository.
+
+    Components are spread over ``depth`` dependency levels; each one depends
+    on up to ``fan_out`` components of the previous level.
+    """
+
+    components: int = 1000
+    depth: int = 8
+    fan_out: int = 3
+    files_per_component: int = 4
+    kinds: Sequence[str] = (BuildKind.PYTHON.value, BuildKind.SHELL.value, BuildKind.NODE.value)
+    seed: int = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["kinds"] = list(self.kinds)
+        return data
+
+
+def write_stubs(bin_dir: Path) -> Path:
+    """Writes fake ``npm`` and ``shellcheck`` executables into ``bin_dir``."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in (("npm", _NPM_STUB), ("shellcheck", _SHELLCHECK_STUB)):
+        target = bin_dir / name
+        target.write_text(content)
+        target.chmod(target.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+def _write_component(root: Path, name: str, kind: BuildKind, files: int) -> str:
+    if kind == BuildKind.SHELL:
+        relative = f"components/{name}.sh"
+        lines = ["#!/bin/sh", "set -eu"]
+        lines.extend(f"echo {name} paso {index}" for index in range(max(1, files)))
+        (root / relative).write_text("\n".join(lines) + "\n")
+        return relative
+
+    relative = f"components/{name}"
+    directory = root / relative
+    directory.mkdir()
+    if kind == BuildKind.PYTHON:
+        (directory / "__init__.py").write_text(f'"""Paquete sintético {name}."""\n')
+        for index in range(max(0, files - 1)):
+            (directory / f"mod_{index}.py").write_text(
+                f"def value_{index}(x: int) -> int:\n    return x * {index} + {len(name)}\n"
+            )
+    else:
+        package = {"name": name, "version": "1.0.0", "scripts": {"build": "true"}}
+        (directory / "package.json").write_text(json.dumps(package))
+        lock = {"name": name, "version": "1.0.0", "lockfileVersion": 3, "packages": {}}
+        (directory / "package-lock.json").write_text(json.dumps(lock))
+        (directory / "src").mkdir()
+        for index in range(max(0, files - 2)):
+            (directory / "src" / f"file_{index}.js").write_text(
+                f"export const v{index} = {index};\n"
+            )
+    return relative
+
+
+def generate_repo(root: Path, spec: SyntheticSpec) -> Path:
+    """Creates the synthetic tree under ``root`` and returns its manifest path."""
+    rng = random.Random(spec.seed)
+    kinds = [BuildKind(kind) for kind in spec.kinds]
+    depth = max(1, min(spec.depth, spec.components))
+    (root / "components").mkdir(parents=True, exist_ok=True)
+
+    levels: List[List[str]] = [[] for _ in range(depth)]
+    items: List[Dict[str, object]] = []
+    for index in range(spec.components):
+        name = f"c{index:06d}"
+        level = index * depth // spec.components
+        kind = kinds[index % len(kinds)]
+        dependencies: List[str] = []
+        if level > 0 and spec.fan_out > 0:
+            previous = levels[level - 1]
+            dependencies = rng.sample(previous, min(spec.fan_out, len(previous)))
+        levels[level].append(name)
+        items.append(
+            {
+                "name": name,
+                "path": _write_component(root, name, kind, spec.files_per_component),
+                "kind": kind.value,
+                "dependencies": dependencies,
+            }
+        )
+
+    manifest = root / MANIFEST_NAME
+    manifest.write_text(json.dumps(items, indent=1))
+    return manifest
+
+
+__all__ = ["MANIFEST_NAME", "SyntheticSpec", "generate_repo", "write_stubs"]
@@ -0,0 +1,230 @@
+"""Medición de las etapas de Sygmare sobre repositorios sintéticos."""
+from __future__ import annotations
+
+import contextlib
+import gc
+import json
+import os
+import platform
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..fsindex import FileSystemIndex
+from ..manifest import ManifestLoader
+from ..models import Component, Manifest
+from ..orchestrator import Orchestrator, OrchestratorConfig
+from ..planner import StrictPlanner
+from ..quality import StrictQualityInspector
+from ..state import write_atomic
+from .generator import SyntheticSpec, generate_repo, write_stubs
+
+RESULTS_VERSION = 1
+_PROC_SELF = Path("/proc/self")
+
+
+@dataclass(frozen=True)
+class StageResult:
+    name: str
+    items: int
+    seconds: float
+    peak_rss_kb: Optional[int]
+    peak_traced_bytes: Optional[int] = None
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["throughput"] = self.throughput
+        return data
+
+
+@dataclass
+class BenchmarkRun:
+    spec: SyntheticSpec
+    build: bool
+    stages: List[StageResult] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spec": self.spec.to_dict(),
+            "build": self.build,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+
+def _reset_peak_rss() -> bool:
+    """Restarts the kernel's RSS high-water mark so that it covers a single stage.
+
+    ``ru_maxrss`` only grows over the life of the process; Linux lets the
+    mark be reset through ``clear_refs``.  Returns False where it cannot.
+    """
+    try:
+        (_PROC_SELF / "clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        status = (_PROC_SELF / "status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1])
+    return None
+
+
+@contextlib.contextmanager
+def _stub_path(bin_dir: Path) -> Iterator[None]:
+    previous = os.environ.get("PATH", "")
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{previous}"
+    try:
+        yield
+    finally:
+        os.environ["PATH"] = previous
+
+
+def _measure(
+    name: str, trace_memory: bool, action: Callable[[], Tuple[Any, int]]
+) -> Tuple[Any, StageResult]:
+    gc.collect()
+    # Sin un pico reiniciable no se informa el RSS: el de todo el proceso engañaría.
+    rss_tracked = _reset_peak_rss()
+    if trace_memory:
+        tracemalloc.start()
+    started = perf_counter()
+    try:
+        value, items = action()
+        seconds = perf_counter() - started
+        traced = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    peak_rss = _peak_rss_kb() if rss_tracked else None
+    return value, StageResult(name, items, seconds, peak_rss, traced)
+
+
+def run_benchmark(
+    spec: SyntheticSpec,
+    workdir: Path,
+    *,
+    build: bool = False,
+    jobs: Optional[int] = None,
+    trace_memory: bool = False,
+) -> BenchmarkRun:
+    """Generates a repository for ``spec`` under ``workdir`` and times every stage.
+
+    Each stage gets a fresh :class:`FileSystemIndex` so that no stage benefits
+    from listings cached by the previous one.  Without ``build`` the
+    orchestrator runs in dry-run mode; with it, real builds run against the
+    fake ``npm``/``shellcheck`` stubs.  Peak RSS is measured per stage where
+    the platform allows it (Linux) and covers this process only.
+    ``trace_memory`` enables ``tracemalloc``, which slows the stages down
+    noticeably.
+    """
+    run = BenchmarkRun(spec, build)
+    repo = workdir / "repo"
+    bin_dir = write_stubs(workdir / "bin")
+
+    manifest_path, generated = _measure(
+        "generate", False, lambda: (generate_repo(repo, spec), spec.components)
+    )
+    run.stages.append(generated)
+
+    def load_manifest() -> Tuple[Manifest, int]:
+        manifest = ManifestLoader(repo, FileSystemIndex()).load(manifest_path)
+        return manifest, len(manifest.components)
+
+    manifest, stage = _measure("manifest_load", trace_memory, load_manifest)
+    run.stages.append(stage)
+
+    def plan_manifest() -> Tuple[List[Component], int]:
+        plan = StrictPlanner(manifest).plan()
+        return plan, len(plan)
+
+    plan, stage = _measure("plan", trace_memory, plan_manifest)
+    run.stages.append(stage)
+
+    config = OrchestratorConfig(dry_run=not build, jobs=jobs, state_dir=workdir / "state")
+
+    def inspect() -> Tuple[None, int]:
+        # Igual que el orquestador: toda la fase de calidad en paralelo.
+        inspector = StrictQualityInspector(FileSystemIndex())
+        inspector.evaluate_all(plan, config.resolved_jobs())
+        return None, len(plan)
+
+    _, stage = _measure("quality", trace_memory, inspect)
+    run.stages.append(stage)
+
+    orchestrator = Orchestrator(config, FileSystemIndex())
+    try:
+        with _stub_path(bin_dir), open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            _, stage = _measure(
+                "orchestrate", trace_memory, lambda: (orchestrator.build(plan), len(plan))
+            )
+    finally:
+        orchestrator.shutdown()
+    run.stages.append(stage)
+    return run
+
+
+def results_payload(runs: Sequence[BenchmarkRun]) -> Dict[str, Any]:
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": [run.to_dict() for run in runs],
+    }
+
+
+def write_results(path: Path, runs: Sequence[BenchmarkRun]) -> None:
+    write_atomic(path, json.dumps(results_payload(runs), indent=2).encode())
+
+
+def compare_results(
+    baseline: Dict[str, Any], runs: Sequence[BenchmarkRun], tolerance: float
+) -> List[str]:
+    """Lists stages whose throughput fell more than ``tolerance`` below the baseline.
+
+    Runs are matched by their spec; stages missing from the baseline are
+    ignored.
+    """
+    reference: Dict[Tuple[str, str], float] = {}
+    for entry in baseline.get("runs", []):
+        key = json.dumps([entry.get("spec"), entry.get("build")], sort_keys=True)
+        for stage in entry.get("stages", []):
+            reference[(key, stage["name"])] = stage["throughput"]
+
+    regressions: List[str] = []
+    for run in runs:
+        key = json.dumps([run.spec.to_dict(), run.build], sort_keys=True)
+        for stage in run.stages:
+            expected = reference.get((key, stage.name))
+            if not expected or stage.name == "generate":
+                continue
+            if stage.throughput < expected * (1 - tolerance):
+                regressions.append(
+                    f"{run.spec.components} componentes / {stage.name}: "
+                    f"{stage.throughput:.0f}/s frente a {expected:.0f}/s"
+                )
+    return regressions
+
+
+__all__ = [
+    "BenchmarkRun",
+    "RESULTS_VERSION",
+    "StageResult",
+    "compare_results",
+    "results_payload",
+    "run_benchmark",
+    "write_results",
+]
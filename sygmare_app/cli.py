@@ -1,16 +1,69 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
 from collections import Counter
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+from . import events, tracing
+from .client import daemon_socket, forward
+from .critical_path import analyze_critical_path
+from .executors import DEFAULT_TAIL_LINES, PYTHON_MODES
+from .history import BuildHistory
+from .logarchive import DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_SIZE_MB
 from .manifest import ManifestLoader
-from .models import BuildError
+from .models import BuildError, Component, Manifest
 from .orchestrator import Orchestrator, OrchestratorConfig
-from .planner import StrictPlanner
-from .reporting import Totals, render_json, render_table
+from .plancache import PlanCache
+from .remote import SECRET_ENV, load_secret
+from .planner import (
+    StrictPlanner,
+    components_for_paths,
+    prioritize,
+    restrict,
+    with_dependents,
+)
+from .reporting import (
+    Totals,
+    render_critical_path_table,
+    render_history_json,
+    render_history_table,
+    render_json,
+    render_table,
+)
+from .session import Session
+from .state import DEFAULT_STATE_DIRNAME
 from .statuses import BuildStatus
+from .tracing import Tracer
+from .vcs import changed_files
+from .watch import (
+    DEFAULT_DEBOUNCE,
+    changes_since,
+    ignore_predicate,
+    open_watcher,
+    signatures,
+    wait_for_changes,
+)
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("debe ser un entero mayor o igual que 1")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if not number > 0 or number == float("inf"):
+        raise argparse.ArgumentTypeError("debe ser un número mayor que 0")
+    return number
 
 
 def build_argument_parser() -> argparse.ArgumentParser:
@@ -23,6 +76,16 @@ def build_argument_parser() -> argparse.ArgumentParser:
         default=Path("sygmare_manifest.json"),
         help="Ruta al manifiesto JSON que describe los componentes a compilar.",
     )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help=(
+            "Excluye rutas del autodescubrimiento (sintaxis de .gitignore). "
+            "Puede especificarse varias veces."
+        ),
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -33,72 +96,556 @@ def build_argument_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Detiene la orquestación en el primer fallo de compilación o de calidad.",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=_positive_int,
+        default=None,
+        metavar="N",
+        help=(
+            "Número máximo de componentes compilados en paralelo "
+            "(por defecto, el número de CPUs disponibles)."
+        ),
+    )
+    parser.add_argument(
+        "--cpu-budget",
+        type=_positive_float,
+        default=None,
+        metavar="CPUS",
+        help=(
+            "CPUs que pueden reservar a la vez los componentes según su campo "
+            "'resources.cpu' (por defecto, el número de trabajos)."
+        ),
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=_positive_int,
+        default=None,
+        metavar="MB",
+        help=(
+            "Memoria en MB que pueden reservar a la vez los componentes según "
+            "'resources.memory_mb' (por defecto, la memoria física total)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        action="append",
+        default=[],
+        metavar="DIRECCIÓN",
+        help=(
+            "Ejecuta los builds en workers remotos (host:puerto o unix:/ruta); "
+            "puede repetirse. Inicie cada worker con 'python -m sygmare_app worker --listen ...'."
+        ),
+    )
+    parser.add_argument(
+        "--worker-secret-file",
+        type=Path,
+        default=None,
+        metavar="ARCHIVO",
+        help=f"Secreto compartido con los workers (por defecto, ${SECRET_ENV}).",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=None,
+        help=(
+            "Directorio de estado local para compilaciones incrementales "
+            f"(por defecto, {DEFAULT_STATE_DIRNAME} en la raíz del repositorio)."
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompila todos los componentes aunque sus entradas no hayan cambiado.",
+    )
+    parser.add_argument(
+        "--python-mode",
+        choices=PYTHON_MODES,
+        default="pool",
+        help=(
+            "Estrategia de compilación Python: 'pool' compila en un pool de procesos "
+            "compartido; 'incremental' recompila solo los archivos modificados con pycs "
+            "validados por hash; 'subprocess' lanza un intérprete por componente."
+        ),
+    )
+    parser.add_argument(
+        "--log-dir",
+        type=Path,
+        default=None,
+        help="Guarda la salida completa de cada componente en un archivo .log de este directorio.",
+    )
+    parser.add_argument(
+        "--no-log-archive",
+        action="store_true",
+        help=(
+            "No archiva la salida de los comandos de esta ejecución "
+            "(ver 'python -m sygmare_app logs')."
+        ),
+    )
+    parser.add_argument(
+        "--log-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE_DAYS,
+        metavar="DÍAS",
+        help="Elimina del archivo de registros las ejecuciones más antiguas que esta edad.",
+    )
+    parser.add_argument(
+        "--log-max-size",
+        type=_positive_int,
+        default=DEFAULT_MAX_SIZE_MB,
+        metavar="MB",
+        help="Tamaño máximo del archivo de registros; se eliminan antes las ejecuciones más antiguas.",
+    )
+    parser.add_argument(
+        "--tail-lines",
+        type=_positive_int,
+        default=DEFAULT_TAIL_LINES,
+        metavar="N",
+        help="Líneas finales de salida que se conservan en memoria para el resumen de fallos.",
+    )
+    parser.add_argument(
+        "--no-node-cache",
+        action="store_true",
+        help="Ejecuta siempre la instalación de npm sin reutilizar node_modules del almacén local.",
+    )
+    parser.add_argument(
+        "--no-plan-cache",
+        action="store_true",
+        help="Ignora la caché del manifiesto y del plan y los recalcula desde cero.",
+    )
     parser.add_argument(
         "--format",
         choices=("table", "json"),
         default="table",
         help="Formato de salida para el resumen final.",
     )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help=(
+            "Muestra la tendencia y los percentiles de duración de cada componente "
+            "según el historial de builds y termina sin compilar."
+        ),
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help=(
+            "No registra esta ejecución en el historial ni lo usa para adelantar "
+            "los componentes más lentos."
+        ),
+    )
+    parser.add_argument(
+        "--critical-path",
+        action="store_true",
+        help=(
+            "Añade al resumen la ruta crítica del grafo ponderada por las duraciones "
+            "medidas, la holgura de cada componente y el tiempo mínimo alcanzable."
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=None,
+        metavar="ARCHIVO",
+        help=(
+            "Escribe una traza en formato Chrome trace-event (abrible en Perfetto) con "
+            "la carga del manifiesto, la planificación, la calidad, los builders y "
+            "cada subproceso."
+        ),
+    )
+    parser.add_argument(
+        "--events",
+        default=None,
+        metavar="ARCHIVO",
+        help=(
+            "Emite en vivo un evento JSON por línea (inicio y fin de cada componente, "
+            "calidad, comandos y su salida). Con '-' se escriben en stdout y el resto "
+            "de la salida pasa a stderr."
+        ),
+    )
+    parser.add_argument(
+        "--fs-stats",
+        action="store_true",
+        help="Muestra cuántas llamadas a scandir/stat realizó el índice de archivos compartido.",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help=(
+            "Ejecuta en este proceso aunque haya un daemon escuchando "
+            "(ver 'python -m sygmare_app daemon')."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Tras la primera ejecución sigue observando las rutas de los componentes y "
+            "recompila solo los modificados y sus dependientes."
+        ),
+    )
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help="Usa sondeo con stat en lugar de inotify para --watch.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SEGUNDOS",
+        help="Tiempo sin cambios que espera --watch antes de recompilar una ráfaga de ediciones.",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        default=None,
+        help=(
+            "Compila solo los componentes con archivos modificados respecto a la "
+            "referencia de git indicada y los que dependen de ellos."
+        ),
+    )
     parser.add_argument(
         "--only",
         action="append",
         metavar="FILTRO",
         help=(
-            "Compila solo componentes cuyo nombre contenga el filtro proporcionado. "
-            "Puede especificarse varias veces."
+            "Compila solo componentes cuyo nombre contenga el filtro proporcionado, "
+            "junto con sus dependencias. Puede especificarse varias veces."
+        ),
+    )
+    parser.add_argument(
+        "--dependents-of",
+        action="append",
+        metavar="COMPONENTE",
+        help=(
+            "Lista el componente indicado y todos los que dependen de él, directa o "
+            "indirectamente, y termina sin compilar. Puede especificarse varias veces."
         ),
     )
     return parser
 
 
-def run_cli(argv: Optional[Iterable[str]] = None) -> int:
+def run_cli(
+    argv: Optional[Iterable[str]] = None,
+    *,
+    session: Session | None = None,
+    use_daemon: bool = True,
+) -> int:
+    """Runs the CLI; with a daemon listening, only forwards ``argv`` to it.
+
+    ``session`` carries warm state between calls; the daemon passes its own.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["worker"]:
+        from .worker import run_worker
+
+        return run_worker(argv[1:])
+    if argv[:1] == ["daemon"]:
+        from .daemon import run_daemon
+
+        return run_daemon(argv[1:])
+    if argv[:1] == ["logs"]:
+        from .logarchive import run_logs
+
+        return run_logs(argv[1:])
+
     parser = build_argument_parser()
     args = parser.parse_args(argv)
 
-    repo_root = Path(__file__).resolve().parent.parent
-    loader = ManifestLoader(repo_root)
+    if use_daemon and not args.no_daemon and not args.watch:
+        exit_code = forward(argv, daemon_socket(args.state_dir))
+        if exit_code is not None:
+            return exit_code
 
-    try:
-        manifest = loader.load(args.manifest)
-    except Exception as exc:  # noqa: BLE001
-        parser.error(str(exc))
+    sinks: List[events.EventSink] = []
+    if args.events is not None:
+        try:
+            sinks.append(events.NdjsonSink.open(args.events))
+        except OSError as exc:
+            parser.error(f"No se pudo abrir {args.events}: {exc}")
+    # Con los eventos en stdout, la salida legible pasa a stderr.
+    human_output = redirect_stdout(sys.stderr) if args.events == "-" else nullcontext()
 
-    planner = StrictPlanner(manifest)
+    tracer = Tracer() if args.trace else None
+    # Una sesión propia no sobrevive a esta ejecución: se cierra al terminar.
+    owned = session is None
+    if session is None:
+        session = Session()
     try:
-        plan = planner.plan()
-    except BuildError as exc:
-        parser.error(str(exc))
+        with tracing.activate(tracer), events.activate(sinks), human_output:
+            return _run(parser, args, session)
+    finally:
+        if owned:
+            session.shutdown()
+        for sink in sinks:
+            sink.close()
+        if tracer is not None:
+            tracer.write(args.trace)
+
+
+def _matching(names: Iterable[str], filters: Sequence[str]) -> List[str]:
+    lowered_filters = [token.lower() for token in filters]
+    return [name for name in names if any(token in name.lower() for token in lowered_filters)]
+
+
+def _load_plan(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    repo_root: Path,
+    session: Session,
+    loader: ManifestLoader,
+    state_dir: Path,
+) -> Tuple[Manifest, List[Component]]:
+    """Returns the manifest and the plan for ``--only`` targets and their dependencies.
+
+    Without ``--only`` the whole manifest is planned and cached; with it, a
+    cached plan is narrowed down, or only the needed subgraph is planned.
+    """
+    cache: PlanCache | None = None
+    if not args.no_plan_cache:
+        cache_key = (str(repo_root), str(args.manifest.absolute()), *args.exclude)
+        cache = session.plan_cache(state_dir, cache_key)
+        with tracing.span("plan_cache", "startup") as trace_args:
+            cached = cache.load()
+            trace_args["hit"] = cached is not None
+        if cached is not None:
+            manifest, plan = cached
+            if args.only:
+                targets = _matching((component.name for component in plan), args.only)
+                planner = StrictPlanner(manifest)
+                plan = restrict(plan, planner.graph.dependencies_closure(targets))
+            return manifest, plan
 
+    # Un proceso persistente puede conservar listados anteriores al cambio.
+    session.fs.clear()
+    with tracing.span("manifest", "startup"):
+        try:
+            manifest = loader.load(args.manifest)
+        except Exception as exc:  # noqa: BLE001
+            parser.error(str(exc))
+
+    targets: Optional[List[str]] = None
     if args.only:
-        lowered_filters = [token.lower() for token in args.only]
-        plan = [
-            component
-            for component in plan
-            if any(token in component.name.lower() for token in lowered_filters)
-        ]
+        targets = _matching((component.name for component in manifest.components), args.only)
+
+    with tracing.span("plan", "startup", components=len(manifest.components)):
+        planner = StrictPlanner(manifest)
+        try:
+            plan = planner.plan(targets)
+        except BuildError as exc:
+            parser.error(str(exc))
+
+    if cache is not None and targets is None:
+        cache.store(manifest, plan, loader.inputs())
+    return manifest, plan
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, session: Session) -> int:
+    repo_root = Path(__file__).resolve().parent.parent
+    session.refresh()
+    loader = session.loader(repo_root, args.exclude)
+    state_dir = args.state_dir or repo_root / DEFAULT_STATE_DIRNAME
+
+    history = BuildHistory(state_dir)
+    if args.history:
+        return _show_history(args, history)
+
+    manifest, plan = _load_plan(parser, args, repo_root, session, loader, state_dir)
+    if args.dependents_of:
+        return _show_dependents(parser, args, manifest)
+    if not args.no_history:
+        # Los componentes más lentos de cada nivel arrancan primero para no
+        # alargar el final de la ejecución.
+        plan = prioritize(plan, history.median_durations())
+
+    if args.since:
+        with tracing.span("since", "startup", ref=args.since):
+            plan = _select_since(parser, args, plan)
         if not plan:
-            print("No se encontraron componentes que coincidan con los filtros proporcionados.")
+            print(f"Ningún componente cambió desde {args.since}.")
             return 0
 
-    orchestrator = Orchestrator(
-        OrchestratorConfig(dry_run=args.dry_run, stop_on_failure=args.stop_on_failure)
+    if args.only and not plan:
+        print("No se encontraron componentes que coincidan con los filtros proporcionados.")
+        return 0
+
+    orchestrator = session.orchestrator(
+        OrchestratorConfig(
+            dry_run=args.dry_run,
+            stop_on_failure=args.stop_on_failure,
+            jobs=args.jobs,
+            state_dir=state_dir,
+            force=args.force,
+            python_mode=args.python_mode,
+            log_dir=args.log_dir,
+            tail_lines=args.tail_lines,
+            node_cache=not args.no_node_cache,
+            cpu_budget=args.cpu_budget,
+            memory_budget_mb=args.memory_budget,
+            workers=tuple(args.workers),
+            worker_secret=_worker_secret(parser, args),
+            log_archive=not args.no_log_archive,
+            log_max_age_days=args.log_max_age,
+            log_max_size_mb=args.log_max_size,
+        )
+    )
+    session.track(
+        manifest.components,
+        ignore_predicate(loader.ignore_rules(), _excluded_paths(args, orchestrator)),
     )
 
+    known = [component.name for component in manifest.components]
+    exit_code = _build_and_report(args, orchestrator, plan, history, known)
+    if not args.watch:
+        return exit_code
+    return _watch(args, orchestrator, loader, plan, history)
+
+
+def _build_and_report(
+    args: argparse.Namespace,
+    orchestrator: Orchestrator,
+    plan: List[Component],
+    history: BuildHistory,
+    known: Optional[Sequence[str]] = None,
+) -> int:
+    started_at = time.time()
     try:
-        records = orchestrator.build(plan)
+        records = orchestrator.build(plan, known=known)
     except BuildError as exc:
         print(f"✖ {exc}")
         return 1
 
+    if not args.dry_run and not args.no_history:
+        try:
+            history.record(records, started_at)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"⚠ No se pudo guardar el historial de builds: {exc}", file=sys.stderr)
+
+    analysis = analyze_critical_path(records) if args.critical_path else None
     if args.format == "json":
-        print(render_json(records))
+        print(render_json(records, analysis))
     else:
         print(render_table(records))
+        if analysis is not None:
+            print()
+            print(render_critical_path_table(analysis))
+
+    if orchestrator.last_run_id is not None:
+        print(
+            f"Salida archivada: python -m sygmare_app logs {orchestrator.last_run_id} <componente>",
+            file=sys.stderr,
+        )
+
+    if args.fs_stats:
+        fs = orchestrator.fs
+        counters = ", ".join(f"{name}={count}" for name, count in sorted(fs.counters.items()))
+        print(f"Índice de archivos: {counters or 'sin accesos'}", file=sys.stderr)
 
     totals = Totals.from_records(records)
-    failures = totals.counts[BuildStatus.FAILED]
+    failures = totals.counts[BuildStatus.FAILED] + totals.counts[BuildStatus.TIMED_OUT]
     quality_failures = totals.counts[BuildStatus.QUALITY_FAILED]
     return 0 if failures == 0 and quality_failures == 0 else 1
 
 
+def _worker_secret(parser: argparse.ArgumentParser, args: argparse.Namespace) -> Optional[str]:
+    if not args.workers:
+        return None
+    try:
+        return load_secret(args.worker_secret_file)
+    except OSError as exc:
+        parser.error(f"No se pudo leer {args.worker_secret_file}: {exc}")
+
+
+def _excluded_paths(args: argparse.Namespace, orchestrator: Orchestrator) -> List[Path]:
+    """Paths the build itself writes to, which must not count as changes."""
+    return [path for path in (orchestrator.config.state_dir, args.log_dir, args.trace) if path]
+
+
+def _watch(
+    args: argparse.Namespace,
+    orchestrator: Orchestrator,
+    loader: ManifestLoader,
+    plan: List[Component],
+    history: BuildHistory,
+) -> int:
+    ignored = ignore_predicate(loader.ignore_rules(), _excluded_paths(args, orchestrator))
+    roots = [component.path for component in plan]
+    watcher = open_watcher(roots, ignored, polling=args.watch_polling)
+    print(f"👁 Observando {len(plan)} componente(s); Ctrl+C para salir.")
+    exit_code = 0
+    pending: List[Path] = []
+    try:
+        while True:
+            changed = pending or wait_for_changes(watcher, args.debounce)
+            pending = []
+            owners = components_for_paths(plan, changed)
+            targets = with_dependents(plan, owners)
+            if not targets:
+                continue
+            # El índice usa las rutas tal como aparecen en el manifiesto.
+            for component in targets:
+                if component.name in owners:
+                    orchestrator.fs.invalidate(component.path)
+            print()
+            print(f"↻ Cambios detectados: {', '.join(component.name for component in targets)}")
+            before = signatures(roots, ignored)
+            exit_code = _build_and_report(args, orchestrator, targets, history)
+            # Lo que el propio build tocó sin cambiar (permisos, temporales) no
+            # cuenta; lo guardado mientras compilaba se recompila a continuación.
+            pending = changes_since(watcher, before)
+    except KeyboardInterrupt:
+        print()
+        return exit_code
+    finally:
+        watcher.close()
+
+
+def _select_since(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, plan: List[Component]
+) -> List[Component]:
+    cwd = args.manifest.absolute().parent if args.manifest else Path.cwd()
+    try:
+        changed = changed_files(args.since, cwd)
+    except BuildError as exc:
+        parser.error(str(exc))
+    # Si cambia el manifiesto, cualquier componente puede verse afectado.
+    if args.manifest and Path(os.path.realpath(args.manifest)) in changed:
+        return plan
+    return with_dependents(plan, components_for_paths(plan, changed))
+
+
+def _show_dependents(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, manifest: Manifest
+) -> int:
+    try:
+        dependents = StrictPlanner(manifest).dependents_of(args.dependents_of)
+    except BuildError as exc:
+        parser.error(str(exc))
+    if args.format == "json":
+        print(json.dumps([component.name for component in dependents], ensure_ascii=False))
+    else:
+        print(f"Dependientes de {', '.join(args.dependents_of)}:")
+        for component in dependents:
+            print(f"  • {component.name} ({component.kind.value})")
+    return 0
+
+
+def _show_history(args: argparse.Namespace, history: BuildHistory) -> int:
+    try:
+        trends = history.trends()
+    except (OSError, sqlite3.Error) as exc:
+        print(f"✖ No se pudo leer el historial: {exc}")
+        return 1
+    if args.only:
+        selected = set(_matching((trend.name for trend in trends), args.only))
+        trends = [trend for trend in trends if trend.name in selected]
+    if args.format == "json":
+        print(render_history_json(trends))
+    else:
+        print(render_history_table(trends))
+    return 0
+
+
 __all__ = ["build_argument_parser", "run_cli"]
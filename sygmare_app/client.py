@@ -0,0 +1,107 @@
+"""Cliente ligero que delega la ejecución en el daemon de Sygmare.
+
+Solo importa la biblioteca estándar imprescindible: el resto del paquete se
+carga únicamente si no hay daemon escuchando.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .state import DEFAULT_STATE_DIRNAME
+
+SOCKET_NAME = "daemon.sock"
+
+Message = Dict[str, Any]
+
+
+def daemon_socket(state_dir: Optional[Path] = None) -> Path:
+    """Socket of the daemon serving ``state_dir`` (by default the repository's)."""
+    if state_dir is None:
+        state_dir = Path(__file__).resolve().parent.parent / DEFAULT_STATE_DIRNAME
+    return Path(os.path.abspath(state_dir)) / SOCKET_NAME
+
+
+def encode(message: Message) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def forward(argv: List[str], socket_path: Path) -> Optional[int]:
+    """Runs ``argv`` on the daemon and relays its output.
+
+    Returns the exit code, or ``None`` when no daemon listens on ``socket_path``.
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(socket_path))
+    except OSError:
+        connection.close()
+        return None
+    with connection, connection.makefile("rb") as reader:
+        try:
+            connection.sendall(
+                encode(
+                    {
+                        "type": "run",
+                        "argv": argv,
+                        "cwd": os.getcwd(),
+                        "env": dict(os.environ),
+                    }
+                )
+            )
+            for line in reader:
+                message = json.loads(line)
+                kind = message.get("type")
+                if kind == "output":
+                    stream = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+                    stream.write(message.get("text", ""))
+                    stream.flush()
+                elif kind == "exit":
+                    return int(message.get("code", 1))
+        except KeyboardInterrupt:
+            return 130
+        except (OSError, ValueError) as exc:
+            print(f"✖ Error de comunicación con el daemon: {exc}", file=sys.stderr)
+            return 1
+    print("✖ El daemon cerró la conexión antes de terminar.", file=sys.stderr)
+    return 1
+
+
+def _forwarding_target(argv: List[str]) -> Optional[Path]:
+    """Daemon socket for ``argv``, or ``None`` if it must run in this process."""
+    # Los subcomandos no pasan por el daemon: 'logs' solo lee archivos.
+    if argv[:1] in (["worker"], ["daemon"], ["logs"]):
+        return None
+    scanner = argparse.ArgumentParser(add_help=False, exit_on_error=False)
+    scanner.add_argument("--state-dir", type=Path, default=None)
+    scanner.add_argument("--no-daemon", action="store_true")
+    scanner.add_argument("--watch", action="store_true")
+    try:
+        options, _ = scanner.parse_known_args(argv)
+    except argparse.ArgumentError:
+        return None
+    # El modo --watch es de larga duración y observa el disco localmente.
+    if options.no_daemon or options.watch:
+        return None
+    return daemon_socket(options.state_dir)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    target = _forwarding_target(argv)
+    if target is not None:
+        exit_code = forward(argv, target)
+        if exit_code is not None:
+            return exit_code
+
+    from .cli import run_cli
+
+    return run_cli(argv, use_daemon=False)
+
+
+__all__ = ["SOCKET_NAME", "daemon_socket", "encode", "forward", "main"]
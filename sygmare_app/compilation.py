@@ -0,0 +1,163 @@
+"""Motor de compilación de bytecode Python en un pool de procesos compartido."""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import py_compile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .state import dump_json, load_json
+
+
+@dataclass(frozen=True)
+class FileCompileResult:
+    path: Path
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def compile_file(path: str, checked_hash: bool = False) -> Optional[str]:
+    """Compiles a single file and returns the error message, if any."""
+    mode = py_compile.PycInvalidationMode.CHECKED_HASH if checked_hash else None
+    try:
+        py_compile.compile(path, doraise=True, invalidation_mode=mode)
+    except py_compile.PyCompileError as exc:
+        return exc.msg.strip()
+    except OSError as exc:
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for the compile pool: ``forkserver``, or ``spawn`` where missing.
+
+    The pool is created lazily while other builds are already running on
+    worker threads and spawning subprocesses.  A ``fork`` at that point
+    copies whatever locks those threads hold (stdio, logging, the import
+    lock); the copies are never released in the child and the worker hangs
+    forever, which stalled ``--jobs`` builds mixing Python and shell or
+    node components.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PythonCompileEngine:
+    """Runs ``py_compile`` for every Python component on one shared process pool.
+
+    The pool is created lazily on first use and reused by all components of a
+    run, so interpreter start-up is paid once per worker instead of once per
+    component.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def compile(
+        self, files: Sequence[Path], *, checked_hash: bool = False
+    ) -> List[FileCompileResult]:
+        if not files:
+            return []
+        executor = self._ensure_executor()
+        chunksize = max(1, len(files) // (self._max_workers * 4))
+        errors = executor.map(
+            compile_file,
+            [str(path) for path in files],
+            repeat(checked_hash),
+            chunksize=chunksize,
+        )
+        return [FileCompileResult(path, error) for path, error in zip(files, errors)]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers, mp_context=_pool_context()
+                )
+            return self._executor
+
+
+class BytecodeIndex:
+    """Per-file index of compiled sources: ``path -> (size, mtime_ns, sha256)``.
+
+    A file is reused when its size and mtime match the index, or when only the
+    mtime changed but the content hash still matches (fresh CI checkouts).
+    """
+
+    FILENAME = "bytecode_index.json"
+
+    def __init__(self, state_dir: Path) -> None:
+        self._path = state_dir / self.FILENAME
+        self._entries: Dict[str, List] = dict(load_json(self._path, {}))
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def partition(self, files: Sequence[Path]) -> Tuple[List[Path], int, Dict[Path, List]]:
+        """Splits ``files`` into stale files and a count of reusable ones.
+
+        Returns the stale files, the number of reused files and the index
+        entries to store for the stale files once they compile successfully.
+        """
+        stale: List[Path] = []
+        pending: Dict[Path, List] = {}
+        reused = 0
+        for path in files:
+            key = str(path)
+            try:
+                stat = path.stat()
+            except OSError:
+                stale.append(path)
+                continue
+            entry = self._entries.get(key)
+            has_pyc = os.path.exists(importlib.util.cache_from_source(key))
+            if has_pyc and entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                reused += 1
+                continue
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            current = [stat.st_size, stat.st_mtime_ns, digest]
+            if has_pyc and entry and entry[2] == digest:
+                reused += 1
+                with self._lock:
+                    self._entries[key] = current
+                    self._dirty = True
+                continue
+            stale.append(path)
+            pending[path] = current
+        return stale, reused, pending
+
+    def update(self, results: Sequence[FileCompileResult], pending: Dict[Path, List]) -> None:
+        with self._lock:
+            for result in results:
+                key = str(result.path)
+                if result.ok and result.path in pending:
+                    self._entries[key] = pending[result.path]
+                else:
+                    self._entries.pop(key, None)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if self._dirty:
+                dump_json(self._path, self._entries)
+                self._dirty = False
+
+
+__all__ = ["BytecodeIndex", "FileCompileResult", "PythonCompileEngine", "compile_file"]
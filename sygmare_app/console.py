@@ -0,0 +1,130 @@
+"""Salida de consola agrupada por componente para ejecuciones concurrentes."""
+from __future__ import annotations
+
+import io
+import shutil
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Callable, Iterator, TextIO
+
+# Por encima de este tamaño la salida agrupada se vuelca a un archivo temporal.
+SPOOL_MAX_SIZE = 1 << 20
+
+_buffer: ContextVar[IO[str] | None] = ContextVar("sygmare_output_buffer", default=None)
+_lock = threading.Lock()
+
+
+class _RoutingStream(io.TextIOBase):
+    """Redirects writes to the active component buffer, if any."""
+
+    def __init__(self, target: TextIO) -> None:
+        self._target = target
+
+    @property
+    def target(self) -> TextIO:
+        return self._target
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer = _buffer.get()
+        if buffer is not None:
+            return buffer.write(text)
+        with _lock:
+            written = self._target.write(text)
+            self._target.flush()
+            return written
+
+    def flush(self) -> None:
+        if _buffer.get() is None:
+            self._target.flush()
+
+    def write_block(self, source: IO[str]) -> None:
+        with _lock:
+            shutil.copyfileobj(source, self._target)
+            self._target.flush()
+
+
+@contextmanager
+def routed_stdout() -> Iterator[None]:
+    """Installs the routing stream on ``sys.stdout`` for the duration of a run."""
+    original = sys.stdout
+    if isinstance(original, _RoutingStream):
+        yield
+        return
+    sys.stdout = _RoutingStream(original)
+    try:
+        yield
+    finally:
+        sys.stdout = original
+
+
+@contextmanager
+def grouped_output() -> Iterator[None]:
+    """Collects everything printed in the current context and emits it as one block.
+
+    The block is spooled to disk once it grows past ``SPOOL_MAX_SIZE`` so that
+    chatty commands do not accumulate their whole output in memory.
+    """
+    with tempfile.SpooledTemporaryFile(
+        max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", errors="replace"
+    ) as buffer:
+        token = _buffer.set(buffer)
+        try:
+            yield
+        finally:
+            _buffer.reset(token)
+            buffer.seek(0)
+            stream = sys.stdout
+            if isinstance(stream, _RoutingStream):
+                stream.write_block(buffer)
+            else:
+                shutil.copyfileobj(buffer, stream)
+                stream.flush()
+
+
+class LineForwarder(io.TextIOBase):
+    """Text sink that hands complete lines to ``send``; :meth:`flush` sends the rest."""
+
+    def __init__(self, send: Callable[[str], None]) -> None:
+        self._send = send
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._pending += text
+            if "\n" not in self._pending:
+                return len(text)
+            complete, _, self._pending = self._pending.rpartition("\n")
+        self._send(complete + "\n")
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, ""
+        if pending:
+            self._send(pending)
+
+
+@contextmanager
+def captured_output(sink: IO[str]) -> Iterator[None]:
+    """Sends everything printed in the current context to ``sink`` instead of stdout.
+
+    Requires :func:`routed_stdout` to be active.
+    """
+    token = _buffer.set(sink)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+
+
+__all__ = ["LineForwarder", "captured_output", "grouped_output", "routed_stdout"]
@@ -0,0 +1,108 @@
+"""Análisis de ruta crítica del grafo de dependencias con duraciones medidas."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Dict, List, Sequence
+
+from .models import BuildRecord
+
+
+@dataclass(frozen=True)
+class NodeTiming:
+    name: str
+    duration: float
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+
+    @property
+    def slack(self) -> float:
+        return max(0.0, self.latest_start - self.earliest_start)
+
+    @property
+    def critical(self) -> bool:
+        return self.slack <= 1e-9
+
+
+@dataclass(frozen=True)
+class CriticalPathAnalysis:
+    nodes: Sequence[NodeTiming]
+    critical_path: Sequence[str]
+    minimum_wall_time: float
+    total_work: float
+
+    @property
+    def max_parallelism(self) -> float:
+        if self.minimum_wall_time <= 0:
+            return 1.0
+        return self.total_work / self.minimum_wall_time
+
+
+def analyze_critical_path(records: Sequence[BuildRecord]) -> CriticalPathAnalysis:
+    """Computes earliest/latest schedules over the DAG of ``records``.
+
+    Only dependencies present in ``records`` are considered.  The minimum
+    wall time is the length of the longest path, i.e. the duration of a run
+    with unlimited parallelism.
+    """
+    durations = {record.component.name: record.duration or 0.0 for record in records}
+    dependencies: Dict[str, List[str]] = {
+        record.component.name: [dep for dep in record.component.dependencies if dep in durations]
+        for record in records
+    }
+    dependents: Dict[str, List[str]] = {name: [] for name in durations}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+
+    order = list(TopologicalSorter(dependencies).static_order())
+
+    earliest_finish: Dict[str, float] = {}
+    predecessor: Dict[str, str | None] = {}
+    for name in order:
+        best = max(dependencies[name], key=earliest_finish.__getitem__, default=None)
+        start = earliest_finish[best] if best is not None else 0.0
+        earliest_finish[name] = start + durations[name]
+        predecessor[name] = best
+
+    minimum_wall_time = max(earliest_finish.values(), default=0.0)
+
+    latest_finish: Dict[str, float] = {}
+    for name in reversed(order):
+        successors = dependents[name]
+        latest_finish[name] = min(
+            (latest_finish[succ] - durations[succ] for succ in successors),
+            default=minimum_wall_time,
+        )
+
+    nodes = [
+        NodeTiming(
+            name=name,
+            duration=durations[name],
+            earliest_start=earliest_finish[name] - durations[name],
+            earliest_finish=earliest_finish[name],
+            latest_start=latest_finish[name] - durations[name],
+            latest_finish=latest_finish[name],
+        )
+        for name in durations
+    ]
+
+    path: List[str] = []
+    if earliest_finish:
+        current: str | None = max(order, key=lambda name: earliest_finish[name])
+        while current is not None:
+            path.append(current)
+            current = predecessor[current]
+        path.reverse()
+
+    return CriticalPathAnalysis(
+        nodes=nodes,
+        critical_path=path,
+        minimum_wall_time=minimum_wall_time,
+        total_work=sum(durations.values()),
+    )
+
+
+__all__ = ["CriticalPathAnalysis", "NodeTiming", "analyze_critical_path"]
@@ -0,0 +1,213 @@
+"""Daemon que mantiene el estado caliente y ejecuta las invocaciones de la CLI."""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+from . import tools
+from .client import daemon_socket, encode
+from .console import LineForwarder
+from .session import Session
+
+
+class _Connection:
+    """Sends messages to one client; write errors mean the client went away."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: dict) -> None:
+        data = encode(message)
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self._sock.sendall(data)
+            except OSError:
+                self.closed = True
+
+    def stream(self, name: str) -> LineForwarder:
+        return LineForwarder(
+            lambda text: self.send({"type": "output", "stream": name, "text": text})
+        )
+
+
+@contextlib.contextmanager
+def _client_context(cwd: str, env: Mapping[str, str]) -> Iterator[None]:
+    previous_cwd = os.getcwd()
+    previous_env = dict(os.environ)
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(previous_env)
+        os.chdir(previous_cwd)
+
+
+class BuildDaemon:
+    """Runs CLI invocations received on a Unix socket with warm state.
+
+    Each working directory gets a :class:`Session` that survives between
+    invocations, so the manifest, plan, filesystem index and resolved tools
+    are reused.  Invocations run one at a time: each one takes over the
+    process' working directory, environment and standard streams.
+    """
+
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        self._claim_socket()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                daemon._handle(self.request, self.rfile)
+
+        # Cualquiera con acceso al socket puede ejecutar comandos como este usuario:
+        # se crea ya sin permisos para otros, sin ventana entre bind y chmod.
+        previous_umask = os.umask(0o077)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        finally:
+            os.umask(previous_umask)
+        server.daemon_threads = True
+        print(f"Daemon de Sygmare escuchando en {self.socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            with contextlib.suppress(OSError):
+                os.unlink(self.socket_path)
+            for session in self._sessions.values():
+                session.shutdown()
+
+    def _claim_socket(self) -> None:
+        if not os.path.exists(self.socket_path):
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            # Socket de un daemon que no terminó limpiamente.
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise SystemExit(f"✖ Ya hay un daemon escuchando en {self.socket_path}")
+
+    def _handle(self, sock: socket.socket, reader) -> None:
+        connection = _Connection(sock)
+        try:
+            request = json.loads(reader.readline() or b"null")
+        except ValueError:
+            request = None
+        if not isinstance(request, dict) or request.get("type") != "run":
+            connection.send({"type": "exit", "code": 2})
+            return
+        argv: List[str] = [str(arg) for arg in request.get("argv", [])]
+        if argv[:1] in (["worker"], ["daemon"]):
+            text = f"✖ El subcomando {argv[0]!r} no puede ejecutarse a través del daemon.\n"
+            connection.send({"type": "output", "stream": "stderr", "text": text})
+            connection.send({"type": "exit", "code": 2})
+            return
+        cwd = str(request.get("cwd") or os.getcwd())
+        env = {str(key): str(value) for key, value in (request.get("env") or os.environ).items()}
+
+        if not self._lock.acquire(blocking=False):
+            connection.send(
+                {
+                    "type": "output",
+                    "stream": "stderr",
+                    "text": "⏳ El daemon está ocupado con otra ejecución; esperando...\n",
+                }
+            )
+            self._lock.acquire()
+        try:
+            exit_code = self._run(connection, argv, cwd, env)
+        finally:
+            self._lock.release()
+        connection.send({"type": "exit", "code": exit_code})
+
+    def _run(
+        self, connection: _Connection, argv: List[str], cwd: str, env: Mapping[str, str]
+    ) -> int:
+        from .cli import run_cli
+
+        stdout, stderr = connection.stream("stdout"), connection.stream("stderr")
+        # El cliente puede haber instalado o quitado herramientas desde la última vez.
+        tools.forget_commands()
+        session = self._sessions.get(cwd)
+        if session is None:
+            session = self._sessions[cwd] = Session(track_changes=True)
+        try:
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(_client_context(cwd, env))
+                stack.enter_context(contextlib.redirect_stdout(stdout))
+                stack.enter_context(contextlib.redirect_stderr(stderr))
+                try:
+                    return run_cli(argv, session=session, use_daemon=False)
+                except SystemExit as exc:
+                    if exc.code is None or isinstance(exc.code, int):
+                        return exc.code or 0
+                    print(exc.code, file=sys.stderr)
+                    return 1
+                except Exception:  # noqa: BLE001
+                    traceback.print_exc()
+                    return 1
+        except OSError as exc:
+            # p. ej. el directorio del cliente ya no existe.
+            print(f"✖ {exc}", file=stderr)
+            return 1
+        finally:
+            stdout.flush()
+            stderr.flush()
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m sygmare_app daemon",
+        description=(
+            "Mantiene en memoria el manifiesto, el plan y el índice de archivos y "
+            "ejecuta las invocaciones de la CLI sin coste de arranque."
+        ),
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=None,
+        help="Directorio de estado donde se crea el socket (el mismo que usan los clientes).",
+    )
+    return parser
+
+
+def run_daemon(argv: Optional[Iterable[str]] = None) -> int:
+    args = build_argument_parser().parse_args(argv)
+    socket_path = daemon_socket(args.state_dir)
+    # SIGTERM termina igual que Ctrl+C: se cierra el socket y se guarda el estado.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    BuildDaemon(socket_path).serve_forever()
+    return 0
+
+
+__all__ = ["BuildDaemon", "run_daemon"]
@@ -0,0 +1,179 @@
+"""Eventos tipados de una ejecución, entregados en vivo a sumideros intercambiables."""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, ClassVar, Dict, Iterator, Optional, Protocol, Sequence
+
+_sinks: ContextVar[Sequence["EventSink"]] = ContextVar("sygmare_event_sinks", default=())
+_component: ContextVar[Optional[str]] = ContextVar("sygmare_event_component", default=None)
+
+
+@dataclass(frozen=True)
+class Event:
+    type: ClassVar[str] = "event"
+    timestamp: float = field(default_factory=time.time, init=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"event": self.type, **asdict(self)}
+
+
+@dataclass(frozen=True)
+class RunStarted(Event):
+    type: ClassVar[str] = "run_started"
+    components: int
+    jobs: int
+    dry_run: bool
+
+
+@dataclass(frozen=True)
+class ComponentStarted(Event):
+    type: ClassVar[str] = "component_started"
+    component: str
+    kind: str
+
+
+@dataclass(frozen=True)
+class QualityFinished(Event):
+    type: ClassVar[str] = "quality_finished"
+    component: str
+    passed: bool
+    details: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CommandStarted(Event):
+    type: ClassVar[str] = "command_started"
+    component: Optional[str]
+    command: str
+    cwd: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CommandOutput(Event):
+    type: ClassVar[str] = "command_output"
+    component: Optional[str]
+    line: str
+
+
+@dataclass(frozen=True)
+class CommandFinished(Event):
+    type: ClassVar[str] = "command_finished"
+    component: Optional[str]
+    command: str
+    exit_code: int
+    duration: float
+    timed_out: bool = False
+
+
+@dataclass(frozen=True)
+class ComponentFinished(Event):
+    type: ClassVar[str] = "component_finished"
+    component: str
+    status: str
+    duration: Optional[float] = None
+    details: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RunFinished(Event):
+    type: ClassVar[str] = "run_finished"
+    totals: Dict[str, int]
+    duration: float
+
+
+class EventSink(Protocol):
+    def handle(self, event: Event) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class NdjsonSink:
+    """Writes one JSON object per event and flushes it immediately.
+
+    ``open("-")`` writes to the standard output captured at creation time, so
+    the grouped console output of a run does not capture the events.
+    """
+
+    def __init__(self, stream: IO[str], *, owned: bool = False) -> None:
+        self._stream = stream
+        self._owned = owned
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, target: str | Path) -> "NdjsonSink":
+        if str(target) == "-":
+            return cls(sys.stdout)
+        path = Path(target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(path.open("w", encoding="utf-8"), owned=True)
+
+    def handle(self, event: Event) -> None:
+        line = json.dumps(event.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self) -> None:
+        if self._owned:
+            self._stream.close()
+
+
+def enabled() -> bool:
+    """Whether any sink is listening; lets hot paths skip building events."""
+    return bool(_sinks.get())
+
+
+def emit(event: Event) -> None:
+    for sink in _sinks.get():
+        sink.handle(event)
+
+
+def current_component() -> Optional[str]:
+    return _component.get()
+
+
+@contextmanager
+def activate(sinks: Sequence[EventSink]) -> Iterator[None]:
+    token = _sinks.set(tuple(sinks))
+    try:
+        yield
+    finally:
+        _sinks.reset(token)
+
+
+@contextmanager
+def component(name: str) -> Iterator[None]:
+    """Attributes command events emitted in the current context to ``name``."""
+    token = _component.set(name)
+    try:
+        yield
+    finally:
+        _component.reset(token)
+
+
+__all__ = [
+    "CommandFinished",
+    "CommandOutput",
+    "CommandStarted",
+    "ComponentFinished",
+    "ComponentStarted",
+    "Event",
+    "EventSink",
+    "NdjsonSink",
+    "QualityFinished",
+    "RunFinished",
+    "RunStarted",
+    "activate",
+    "component",
+    "current_component",
+    "emit",
+    "enabled",
+]
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-import shutil
+import asyncio
+import os
+import re
+import signal
 import subprocess
 import sys
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
 from time import perf_counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
-
-from .models import BuildKind, Component
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional
+
+from . import events, logarchive
+from .compilation import BytecodeIndex, FileCompileResult, PythonCompileEngine
+from .fsindex import FileSystemIndex
+from .models import BuildKind, Component, TimeoutSpec
+from .nodestore import NodeModulesStore
+from .shellcheck import ShellcheckLinter
 from .statuses import BuildStatus
+from .tools import resolve_command
+from .tracing import span
 
 
 @dataclass
@@ -19,8 +31,16 @@ class CommandResult:
     duration: float | None = None
 
 
+class TimedOutProcess(subprocess.CompletedProcess):
+    """A command stopped by its watchdog; ``reason`` says which limit it hit."""
+
+    def __init__(self, args: List[str], returncode: int, stdout: str, reason: str) -> None:
+        super().__init__(args, returncode, stdout, None)
+        self.reason = reason
+
+
 def command_exists(command: str) -> bool:
-    return shutil.which(command) is not None
+    return resolve_command(command) is not None
 
 
 def shlex_quote(arg: str) -> str:
@@ -35,46 +55,374 @@ def readable_cmd(cmd: Iterable[str]) -> str:
     return " ".join(shlex_quote(part) for part in cmd)
 
 
-def run_command(cmd: List[str], *, cwd: Optional[Path], dry_run: bool) -> subprocess.CompletedProcess:
+DEFAULT_TAIL_LINES = 50
+# Margen entre SIGTERM y SIGKILL al terminar un grupo de procesos.
+KILL_GRACE_SECONDS = 5.0
+MAX_LINE_LENGTH = 64 * 1024
+_READ_CHUNK = 64 * 1024
+
+_SAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass(frozen=True)
+class OutputPolicy:
+    """How much command output is kept in memory and where full logs go."""
+
+    tail_lines: int = DEFAULT_TAIL_LINES
+    log_dir: Path | None = None
+
+    def start_log(self, component: Component) -> Path | None:
+        """Returns a fresh per-component log path, or ``None`` without ``log_dir``."""
+        if self.log_dir is None:
+            return None
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        path = self.log_dir / f"{_SAFE_NAME.sub('_', component.name)}.log"
+        path.write_text("")
+        return path
+
+
+def run_command(
+    cmd: List[str],
+    *,
+    cwd: Optional[Path],
+    dry_run: bool,
+    log_path: Optional[Path] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    limits: TimeoutSpec | None = None,
+) -> subprocess.CompletedProcess:
+    """Synchronous wrapper over :func:`run_command_async`."""
+    return asyncio.run(
+        run_command_async(
+            cmd,
+            cwd=cwd,
+            dry_run=dry_run,
+            log_path=log_path,
+            tail_lines=tail_lines,
+            limits=limits,
+        )
+    )
+
+
+async def run_command_async(
+    cmd: List[str],
+    *,
+    cwd: Optional[Path],
+    dry_run: bool,
+    log_path: Optional[Path] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    limits: TimeoutSpec | None = None,
+) -> subprocess.CompletedProcess:
+    """Runs ``cmd`` streaming its output line by line as it is produced.
+
+    Only the last ``tail_lines`` lines are kept in memory and returned as
+    ``stdout``; the complete output is appended to ``log_path`` when given.
+    The command runs in its own process group.  When it exceeds
+    ``limits.timeout``, or prints nothing for ``limits.idle_timeout``
+    seconds, the whole group is terminated and a :class:`TimedOutProcess`
+    is returned; the group is also killed if the caller is cancelled.
+    """
+    command = readable_cmd(cmd)
     display_cwd = f" (cwd={cwd})" if cwd else ""
-    print(f"    → {readable_cmd(cmd)}{display_cwd}")
+    print(f"    → {command}{display_cwd}")
+    if events.enabled():
+        events.emit(
+            events.CommandStarted(
+                events.current_component(), command, str(cwd) if cwd else None
+            )
+        )
     if dry_run:
         return subprocess.CompletedProcess(cmd, 0, "", "")
 
-    result = subprocess.run(
-        cmd,
-        cwd=str(cwd) if cwd else None,
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-
-    if result.stdout:
-        for line in result.stdout.splitlines():
-            print(f"      {line}")
-    if result.returncode != 0:
+    started = perf_counter()
+    with span(command, "subprocess", cwd=str(cwd) if cwd else None) as trace_args:
+        result = await _stream_process(cmd, cwd, log_path, tail_lines, limits)
+        trace_args["exit_code"] = result.returncode
+        timed_out = isinstance(result, TimedOutProcess)
+        if timed_out:
+            trace_args["timed_out"] = result.reason
+    if events.enabled():
+        events.emit(
+            events.CommandFinished(
+                events.current_component(),
+                command,
+                result.returncode,
+                perf_counter() - started,
+                timed_out,
+            )
+        )
+    if timed_out:
+        print(f"      ⏱ {result.reason}; se terminó su grupo de procesos")
+    elif result.returncode != 0:
         print(f"      ✖ Command exited with code {result.returncode}")
     return result
 
 
+async def _stream_process(
+    cmd: List[str],
+    cwd: Optional[Path],
+    log_path: Optional[Path],
+    tail_lines: int,
+    limits: TimeoutSpec | None = None,
+) -> subprocess.CompletedProcess:
+    tail: Deque[str] = deque(maxlen=max(0, tail_lines))
+    log_file = log_path.open("a", encoding="utf-8") if log_path else None
+    component = events.current_component()
+    segment = logarchive.open_segment(component, readable_cmd(cmd))
+    try:
+        if log_file is not None:
+            display_cwd = f" (cwd={cwd})" if cwd else ""
+            log_file.write(f"$ {readable_cmd(cmd)}{display_cwd}\n")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=str(cwd) if cwd else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                # Grupo propio: al cortar el comando se terminan también sus hijos.
+                start_new_session=True,
+            )
+        except OSError as exc:
+            message = f"{type(exc).__name__}: {exc}"
+            print(f"      ✖ {message}")
+            if log_file is not None:
+                log_file.write(f"{message}\n")
+            if segment is not None:
+                segment.write(message)
+                segment.close(127)
+            return subprocess.CompletedProcess(cmd, 127, message, None)
+
+        assert process.stdout is not None
+        stdout = process.stdout
+        streaming = events.enabled()
+        loop = asyncio.get_running_loop()
+        last_output = loop.time()
+
+        async def pump() -> int:
+            nonlocal last_output
+            async for line in _read_lines(stdout):
+                last_output = loop.time()
+                if log_file is not None:
+                    log_file.write(f"{line}\n")
+                if segment is not None:
+                    segment.write(line)
+                tail.append(line)
+                print(f"      {line}")
+                if streaming:
+                    events.emit(events.CommandOutput(component, line))
+            return await process.wait()
+
+        reading = asyncio.ensure_future(pump())
+        try:
+            reason = await _supervise(reading, limits, lambda: last_output)
+            if reason is not None:
+                await _terminate_group(process)
+                # Un proceso que escapó del grupo puede mantener abierta la tubería.
+                done, _ = await asyncio.wait({reading}, timeout=KILL_GRACE_SECONDS)
+                if not done:
+                    reading.cancel()
+            returncode = await reading if reason is None else await process.wait()
+        except BaseException:
+            _signal_group(process, signal.SIGKILL)
+            reading.cancel()
+            raise
+        if log_file is not None:
+            if reason is not None:
+                log_file.write(f"[{reason}]\n")
+            log_file.write(f"[exit {returncode}]\n")
+        if segment is not None:
+            if reason is not None:
+                segment.write(f"[{reason}]")
+            segment.close(returncode, timed_out=reason is not None)
+    finally:
+        if log_file is not None:
+            log_file.close()
+        if segment is not None:
+            # Interrumpido: el segmento queda en el índice sin código de salida.
+            segment.close(None)
+    if reason is not None:
+        return TimedOutProcess(cmd, returncode, "\n".join(tail), reason)
+    return subprocess.CompletedProcess(cmd, returncode, "\n".join(tail), None)
+
+
+async def _supervise(
+    task: "asyncio.Future[int]", limits: TimeoutSpec | None, last_output: Callable[[], float]
+) -> Optional[str]:
+    """Waits for ``task``; returns why it must be cut short when a limit is exceeded."""
+    if not limits:
+        await asyncio.wait({task})
+        return None
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    while True:
+        deadlines = []
+        if limits.timeout is not None:
+            deadlines.append(started + limits.timeout)
+        if limits.idle_timeout is not None:
+            deadlines.append(last_output() + limits.idle_timeout)
+        done, _ = await asyncio.wait({task}, timeout=max(0.0, min(deadlines) - loop.time()))
+        if done:
+            return None
+        now = loop.time()
+        if limits.timeout is not None and now >= started + limits.timeout:
+            return f"superó el límite de {limits.timeout:g}s"
+        if limits.idle_timeout is not None and now >= last_output() + limits.idle_timeout:
+            return f"sin salida durante {limits.idle_timeout:g}s"
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except OSError:
+        # El grupo ya no existe.
+        pass
+
+
+async def _terminate_group(process: asyncio.subprocess.Process) -> None:
+    """SIGTERM to the command's process group, then SIGKILL after a grace period."""
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    # Los hijos que ignoraron SIGTERM siguen en el grupo aunque el líder haya salido.
+    _signal_group(process, signal.SIGKILL)
+
+
+async def _read_lines(stream: asyncio.StreamReader) -> AsyncIterator[str]:
+    # Se lee por bloques para no depender del límite de línea de StreamReader;
+    # las líneas más largas que MAX_LINE_LENGTH se parten.
+    pending = b""
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace")
+        while len(pending) >= MAX_LINE_LENGTH:
+            yield pending[:MAX_LINE_LENGTH].decode("utf-8", errors="replace")
+            pending = pending[MAX_LINE_LENGTH:]
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+
+
+def failure_details(result: subprocess.CompletedProcess, headline: Optional[str] = None) -> Optional[str]:
+    """Builds ``BuildRecord.details`` for a failed command from its output tail."""
+    parts = [part for part in (headline, result.stdout) if part]
+    return "\n".join(parts) or None
+
+
+def command_failure(
+    result: subprocess.CompletedProcess, duration: float | None, headline: Optional[str] = None
+) -> CommandResult:
+    """``CommandResult`` for a failed command; ``TIMED_OUT`` when its watchdog stopped it."""
+    if isinstance(result, TimedOutProcess):
+        headline = f"{readable_cmd(result.args)}: {result.reason}"
+        return CommandResult(BuildStatus.TIMED_OUT, failure_details(result, headline), duration)
+    return CommandResult(BuildStatus.FAILED, failure_details(result, headline), duration)
+
+
+PYTHON_MODES = ("pool", "incremental", "subprocess")
+
+
 class PythonBuilder:
+    """Compiles Python components to bytecode.
+
+    ``pool`` mode compiles every file on the shared :class:`PythonCompileEngine`;
+    ``incremental`` does the same for files changed since the last run,
+    according to a :class:`BytecodeIndex`, writing checked-hash pycs;
+    ``subprocess`` mode keeps the original one-interpreter-per-component path.
+    """
+
+    def __init__(
+        self,
+        mode: str = "pool",
+        engine: PythonCompileEngine | None = None,
+        index: BytecodeIndex | None = None,
+        output: OutputPolicy | None = None,
+        fs: FileSystemIndex | None = None,
+    ) -> None:
+        if mode not in PYTHON_MODES:
+            raise ValueError(f"Modo de compilación Python desconocido: {mode}")
+        self._mode = mode
+        self._engine = engine
+        self._index = index
+        self._output = output or OutputPolicy()
+        self._fs = fs or FileSystemIndex()
+
     def build(self, component: Component, *, dry_run: bool) -> CommandResult:
-        if not component.path.exists():
+        return asyncio.run(self.build_async(component, dry_run=dry_run))
+
+    async def build_async(self, component: Component, *, dry_run: bool) -> CommandResult:
+        if not self._fs.exists(component.path):
             message = f"Ruta {component.path} no encontrada."
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.MISSING, message)
 
-        if component.path.is_file():
-            python_files = [component.path] if component.path.suffix == ".py" else []
-        else:
-            python_files = list(component.path.rglob("*.py"))
+        python_files = sorted(self._fs.iter_files(component.path, suffix=".py"))
 
         if not python_files:
             message = "No se encontraron archivos Python para compilar."
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.SKIPPED, message)
 
-        if component.path.is_file():
+        if self._mode != "subprocess" and self._engine is not None:
+            try:
+                if self._mode == "incremental" and self._index is not None:
+                    return await asyncio.to_thread(
+                        self._build_incremental, python_files, dry_run=dry_run
+                    )
+                return await asyncio.to_thread(self._build_in_pool, python_files, dry_run=dry_run)
+            except (OSError, NotImplementedError, BrokenProcessPool) as exc:
+                print(f"  ⚠️  Pool de compilación no disponible ({exc}); se usa un subproceso.")
+        return await self._build_in_subprocess(component, dry_run=dry_run)
+
+    def _build_in_pool(self, python_files: List[Path], *, dry_run: bool) -> CommandResult:
+        print(f"    → py_compile [pool] {len(python_files)} archivo(s)")
+        if dry_run:
+            return CommandResult(BuildStatus.BUILT)
+
+        assert self._engine is not None
+        started = perf_counter()
+        with span("py_compile", "compile", mode="pool", files=len(python_files)):
+            results = self._engine.compile(python_files)
+        duration = perf_counter() - started
+        return self._pool_result(results, duration)
+
+    def _build_incremental(self, python_files: List[Path], *, dry_run: bool) -> CommandResult:
+        assert self._engine is not None and self._index is not None
+        started = perf_counter()
+        stale, reused, pending = self._index.partition(python_files)
+        summary = f"{len(stale)} compilado(s), {reused} reutilizado(s)"
+        print(f"    → py_compile [incremental] {summary}")
+        if dry_run:
+            return CommandResult(BuildStatus.BUILT, summary)
+
+        with span("py_compile", "compile", mode="incremental", files=len(stale), reused=reused):
+            results = self._engine.compile(stale, checked_hash=True)
+        self._index.update(results, pending)
+        duration = perf_counter() - started
+        return self._pool_result(results, duration, summary)
+
+    @staticmethod
+    def _pool_result(
+        results: List[FileCompileResult], duration: float, summary: Optional[str] = None
+    ) -> CommandResult:
+        failures = [result for result in results if not result.ok]
+        if not failures:
+            return CommandResult(BuildStatus.BUILT, summary, duration)
+
+        lines: List[str] = [summary] if summary else []
+        for failure in failures:
+            lines.append(f"{failure.path}: {failure.error}")
+            print(f"      ✖ {failure.path}")
+            for line in (failure.error or "").splitlines():
+                print(f"        {line}")
+        return CommandResult(BuildStatus.FAILED, "\n".join(lines), duration)
+
+    async def _build_in_subprocess(self, component: Component, *, dry_run: bool) -> CommandResult:
+        if self._fs.is_file(component.path):
             cmd = [sys.executable, "-m", "py_compile", str(component.path)]
             cwd = component.path.parent
         else:
@@ -82,16 +430,45 @@ class PythonBuilder:
             cwd = None
 
         started = perf_counter()
-        result = run_command(cmd, cwd=cwd, dry_run=dry_run)
+        result = await run_command_async(
+            cmd,
+            cwd=cwd,
+            dry_run=dry_run,
+            log_path=None if dry_run else self._output.start_log(component),
+            tail_lines=self._output.tail_lines,
+            limits=component.command_limits(),
+        )
         duration = perf_counter() - started
-        status = BuildStatus.BUILT if result.returncode == 0 else BuildStatus.FAILED
-        return CommandResult(status, duration=duration)
+        if result.returncode != 0:
+            return command_failure(result, duration)
+        return CommandResult(BuildStatus.BUILT, duration=duration)
 
 
 class NodeBuilder:
+    """Builds Node projects.
+
+    Without explicit ``commands`` the project is installed and then built
+    with ``npm run build``.  When a :class:`NodeModulesStore` is available and
+    the project has a lockfile, ``node_modules`` is reused or restored from
+    the store and ``npm ci`` only runs on a miss.
+    """
+
+    def __init__(
+        self,
+        output: OutputPolicy | None = None,
+        fs: FileSystemIndex | None = None,
+        store: NodeModulesStore | None = None,
+    ) -> None:
+        self._output = output or OutputPolicy()
+        self._fs = fs or FileSystemIndex()
+        self._store = store
+
     def build(self, component: Component, *, dry_run: bool) -> CommandResult:
+        return asyncio.run(self.build_async(component, dry_run=dry_run))
+
+    async def build_async(self, component: Component, *, dry_run: bool) -> CommandResult:
         package_json = component.path / "package.json"
-        if not component.path.exists() or not package_json.exists():
+        if not self._fs.exists(component.path) or not self._fs.exists(package_json):
             message = f"package.json no encontrado en {component.path}"
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.MISSING, message)
@@ -101,67 +478,171 @@ class NodeBuilder:
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.SKIPPED, message)
 
-        commands = component.normalized_commands() or [["npm", "install"], ["npm", "run", "build"]]
-        status = BuildStatus.BUILT
+        commands = component.normalized_commands()
+        # El build implícito no tiene límites propios en el manifiesto.
+        implicit = not commands
+        log_path = None if dry_run else self._output.start_log(component)
         elapsed = 0.0
-        for cmd in commands:
+        if implicit:
+            started = perf_counter()
+            install = await self._install(component, dry_run=dry_run, log_path=log_path)
+            elapsed += perf_counter() - started
+            if install is not None and install.returncode != 0:
+                return command_failure(install, elapsed)
+            commands = [["npm", "run", "build"]]
+
+        for position, cmd in enumerate(commands):
             started = perf_counter()
-            result = run_command(cmd, cwd=component.path, dry_run=dry_run)
+            result = await run_command_async(
+                cmd,
+                cwd=component.path,
+                dry_run=dry_run,
+                log_path=log_path,
+                tail_lines=self._output.tail_lines,
+                limits=component.command_limits(None if implicit else position),
+            )
             elapsed += perf_counter() - started
             if result.returncode != 0:
-                status = BuildStatus.FAILED
-                break
-        return CommandResult(status, duration=elapsed if elapsed > 0 else None)
+                return command_failure(result, elapsed)
+        return CommandResult(BuildStatus.BUILT, duration=elapsed if elapsed > 0 else None)
+
+    async def _install(
+        self, component: Component, *, dry_run: bool, log_path: Optional[Path]
+    ) -> Optional[subprocess.CompletedProcess]:
+        """Installs dependencies; returns ``None`` when ``node_modules`` was reused."""
+        key = None
+        if self._store is not None:
+            key = await asyncio.to_thread(self._store.key, component.path)
+        if key is None:
+            cmd = ["npm", "install"]
+        elif self._store.is_current(component.path, key):
+            print(f"    ≡ node_modules al día para el lockfile ({key[:12]})")
+            return None
+        elif not dry_run and await asyncio.to_thread(self._store.restore, component.path, key):
+            print(f"    ↺ node_modules restaurado desde el almacén ({key[:12]})")
+            return None
+        else:
+            cmd = ["npm", "ci"]
+
+        result = await run_command_async(
+            cmd,
+            cwd=component.path,
+            dry_run=dry_run,
+            log_path=log_path,
+            tail_lines=self._output.tail_lines,
+            limits=component.command_limits(),
+        )
+        if key is not None and result.returncode == 0 and not dry_run:
+            await asyncio.to_thread(self._store.save, component.path, key)
+        return result
 
 
 class ShellBuilder:
+    def __init__(
+        self,
+        output: OutputPolicy | None = None,
+        fs: FileSystemIndex | None = None,
+        linter: ShellcheckLinter | None = None,
+    ) -> None:
+        self._output = output or OutputPolicy()
+        self._fs = fs or FileSystemIndex()
+        self._linter = linter
+
     def build(self, component: Component, *, dry_run: bool) -> CommandResult:
-        if not component.path.exists():
+        return asyncio.run(self.build_async(component, dry_run=dry_run))
+
+    async def build_async(self, component: Component, *, dry_run: bool) -> CommandResult:
+        if not self._fs.exists(component.path):
             message = f"script {component.path} no encontrado"
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.MISSING, message)
 
-        if not component.path.is_file():
+        if not self._fs.is_file(component.path):
             message = f"Se esperaba un archivo ejecutable y se encontró {component.path}."
             print(f"  ⚠️  {component.name}: {message}")
             return CommandResult(BuildStatus.FAILED, message)
 
         if not dry_run:
-            current_mode = component.path.stat().st_mode
-            component.path.chmod(current_mode | 0o111)
+            stat = self._fs.stat(component.path)
+            current_mode = stat.st_mode if stat is not None else component.path.stat().st_mode
+            # Un chmod innecesario genera eventos que relanzarían el modo --watch.
+            if current_mode & 0o111 != 0o111:
+                component.path.chmod(current_mode | 0o111)
 
+        log_path = None if dry_run else self._output.start_log(component)
         elapsed = 0.0
-        if command_exists("shellcheck"):
+        if self._linter is not None and not dry_run and self._linter.available():
+            started = perf_counter()
+            lint = await self._linter.check(component.path)
+            elapsed += perf_counter() - started
+            print(f"    → shellcheck [lote]{' (caché)' if lint.cached else ''}")
+            if not lint.clean:
+                details = lint.details()
+                if log_path is not None and details:
+                    with log_path.open("a", encoding="utf-8") as log_file:
+                        log_file.write(details + "\n")
+                return CommandResult(BuildStatus.FAILED, details, elapsed)
+        elif command_exists("shellcheck"):
             started = perf_counter()
-            result = run_command(["shellcheck", str(component.path)], cwd=None, dry_run=dry_run)
+            result = await run_command_async(
+                ["shellcheck", str(component.path)],
+                cwd=None,
+                dry_run=dry_run,
+                log_path=log_path,
+                tail_lines=self._output.tail_lines,
+                limits=component.command_limits(),
+            )
             elapsed += perf_counter() - started
             if result.returncode != 0:
-                return CommandResult(BuildStatus.FAILED, "shellcheck falló", elapsed)
+                return command_failure(result, elapsed, "shellcheck falló")
 
-        for cmd in component.normalized_commands():
+        for position, cmd in enumerate(component.normalized_commands()):
             started = perf_counter()
-            result = run_command(cmd, cwd=component.path.parent, dry_run=dry_run)
+            result = await run_command_async(
+                cmd,
+                cwd=component.path.parent,
+                dry_run=dry_run,
+                log_path=log_path,
+                tail_lines=self._output.tail_lines,
+                limits=component.command_limits(position),
+            )
             elapsed += perf_counter() - started
             if result.returncode != 0:
-                return CommandResult(BuildStatus.FAILED, duration=elapsed)
+                return command_failure(result, elapsed)
 
         return CommandResult(BuildStatus.BUILT, duration=elapsed if elapsed > 0 else None)
 
 
-def builder_registry() -> Dict[BuildKind, object]:
+def builder_registry(
+    *,
+    python_mode: str = "pool",
+    python_engine: PythonCompileEngine | None = None,
+    python_index: BytecodeIndex | None = None,
+    output: OutputPolicy | None = None,
+    fs: FileSystemIndex | None = None,
+    node_store: NodeModulesStore | None = None,
+    shell_linter: ShellcheckLinter | None = None,
+) -> Dict[BuildKind, object]:
     return {
-        BuildKind.PYTHON: PythonBuilder(),
-        BuildKind.NODE: NodeBuilder(),
-        BuildKind.SHELL: ShellBuilder(),
+        BuildKind.PYTHON: PythonBuilder(python_mode, python_engine, python_index, output, fs),
+        BuildKind.NODE: NodeBuilder(output, fs, node_store),
+        BuildKind.SHELL: ShellBuilder(output, fs, shell_linter),
     }
 
 
 __all__ = [
     "CommandResult",
+    "DEFAULT_TAIL_LINES",
+    "OutputPolicy",
+    "PYTHON_MODES",
     "PythonBuilder",
     "NodeBuilder",
     "ShellBuilder",
+    "TimedOutProcess",
     "builder_registry",
     "command_exists",
+    "command_failure",
+    "failure_details",
     "run_command",
+    "run_command_async",
 ]
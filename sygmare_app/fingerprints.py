@@ -0,0 +1,213 @@
+"""Huellas de contenido para compilaciones incrementales."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .fsindex import FileSystemIndex
+from .models import BuildKind, Component
+from .state import dump_json, load_json
+from .tools import resolve_command
+
+IGNORED_DIRS = frozenset({"__pycache__", "node_modules", ".git", ".sygmare"})
+
+_KIND_TOOLS: Dict[BuildKind, Tuple[str, ...]] = {
+    BuildKind.PYTHON: (),
+    BuildKind.NODE: ("node", "npm"),
+    BuildKind.SHELL: ("shellcheck",),
+}
+
+_CHUNK_SIZE = 1 << 20
+
+
+def _ignored(path: Path) -> bool:
+    return path.name in IGNORED_DIRS
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _owning_root(path: str, roots: Set[str]) -> Optional[str]:
+    """The entry of ``roots`` that is ``path`` or one of its ancestors, if any."""
+    if not roots:
+        return None
+    current = path
+    while True:
+        if current in roots:
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class FingerprintStore:
+    """Persists the last successful fingerprint of every component.
+
+    File digests are cached by ``(size, mtime_ns)`` so that an unchanged tree
+    is fingerprinted with one ``stat`` per file and no reads.  When saving,
+    digests under a component root scanned since the store was opened are
+    kept only for the files that scan found, and the digests of components
+    dropped with :meth:`forget` are removed; the rest of the cache is left
+    alone, so partial runs do not evict other components.
+    """
+
+    FILENAME = "fingerprints.json"
+
+    def __init__(self, state_dir: Path, fs: FileSystemIndex | None = None) -> None:
+        self._path = state_dir / self.FILENAME
+        self._fs = fs or FileSystemIndex()
+        data = load_json(self._path, {})
+        self._components: Dict[str, str] = dict(data.get("components", {}))
+        self._files: Dict[str, List] = dict(data.get("files", {}))
+        self._tools: Dict[str, List] = dict(data.get("tools", {}))
+        self._roots: Dict[str, str] = dict(data.get("roots", {}))
+        self._seen: Set[str] = set()
+        self._walked: Set[str] = set()
+        self._forgotten: Set[str] = set()
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def stored(self, name: str) -> Optional[str]:
+        return self._components.get(name)
+
+    def is_current(self, component: Component, fingerprint: str) -> bool:
+        return self._components.get(component.name) == fingerprint
+
+    def record(self, component: Component, fingerprint: str) -> None:
+        with self._lock:
+            if self._components.get(component.name) != fingerprint:
+                self._components[component.name] = fingerprint
+                self._dirty = True
+
+    def forget(self, known: Iterable[str]) -> None:
+        """Drops the state of components whose name is not in ``known``."""
+        names = set(known)
+        with self._lock:
+            for name in (self._components.keys() | self._roots.keys()) - names:
+                self._components.pop(name, None)
+                root = self._roots.pop(name, None)
+                if root is not None:
+                    self._forgotten.add(root)
+                self._dirty = True
+
+    def compute(self, component: Component, dependencies: Mapping[str, Optional[str]]) -> str:
+        digest = hashlib.sha256()
+        header = {
+            "name": component.name,
+            "kind": component.kind.value,
+            "commands": [list(cmd) for cmd in component.build_commands],
+            "quality": repr(component.quality),
+            "tools": self._tool_versions(component.kind),
+            "dependencies": sorted(
+                (name, dependencies.get(name) or "") for name in component.dependencies
+            ),
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode())
+        root = str(component.path)
+        with self._lock:
+            if self._roots.get(component.name) != root:
+                self._roots[component.name] = root
+                self._dirty = True
+        for relative, digest_hex in sorted(self._file_digests(component.path)):
+            digest.update(f"\0{relative}\0{digest_hex}".encode())
+        return digest.hexdigest()
+
+    def save(self) -> None:
+        with self._lock:
+            # Una raíz olvidada que sigue perteneciendo a otro componente se conserva.
+            pruned = self._walked | (self._forgotten - set(self._roots.values()))
+            for absolute in [key for key in self._files if key not in self._seen]:
+                if _owning_root(absolute, pruned) is not None:
+                    del self._files[absolute]
+                    self._dirty = True
+            if not self._dirty:
+                return
+            payload = {
+                "components": self._components,
+                "files": self._files,
+                "tools": self._tools,
+                "roots": self._roots,
+            }
+            dump_json(self._path, payload)
+            self._dirty = False
+
+    def _file_digests(self, root: Path) -> Iterable[Tuple[str, str]]:
+        base = root if self._fs.is_dir(root) else root.parent
+        results = []
+        seen: List[str] = []
+        for path, stat in self._fs.walk_stats(root, prune=_ignored):
+            absolute = str(path)
+            relative = os.path.relpath(absolute, base)
+            key = (stat.st_size, stat.st_mtime_ns)
+            seen.append(absolute)
+            cached = self._files.get(absolute)
+            if cached is not None and (cached[0], cached[1]) == key:
+                results.append((relative, cached[2]))
+                continue
+            try:
+                digest_hex = _hash_file(absolute)
+            except OSError:
+                continue
+            with self._lock:
+                self._files[absolute] = [key[0], key[1], digest_hex]
+                self._dirty = True
+            results.append((relative, digest_hex))
+        with self._lock:
+            self._seen.update(seen)
+            self._walked.add(str(root))
+        return results
+
+    def _tool_versions(self, kind: BuildKind) -> Dict[str, str]:
+        versions = {"python": sys.version}
+        for tool in _KIND_TOOLS.get(kind, ()):
+            versions[tool] = self._tool_version(tool)
+        return versions
+
+    def _tool_version(self, tool: str) -> str:
+        version = self._versions.get(tool)
+        if version is None:
+            version = self._versions[tool] = self._resolve_tool_version(tool)
+        return version
+
+    def _resolve_tool_version(self, tool: str) -> str:
+        resolved = resolve_command(tool)
+        if resolved is None:
+            return "missing"
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            return "missing"
+        key = [stat.st_size, stat.st_mtime_ns]
+        cached = self._tools.get(resolved)
+        if cached is not None and cached[:2] == key:
+            return cached[2]
+        try:
+            output = subprocess.run(
+                [resolved, "--version"],
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                check=False,
+            ).stdout.strip()
+        except OSError:
+            output = "unknown"
+        with self._lock:
+            self._tools[resolved] = key + [output]
+            self._dirty = True
+        return output
+
+
+__all__ = ["FingerprintStore", "IGNORED_DIRS"]
@@ -0,0 +1,175 @@
+"""Índice de sistema de archivos compartido por una ejecución."""
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+Prune = Callable[[Path], bool]
+
+# Nombres que no aparecen en el listado del directorio padre.
+_UNLISTED = frozenset({"", os.curdir, os.pardir})
+
+
+class FileSystemIndex:
+    """Caches ``os.scandir`` listings and ``stat`` results for one run.
+
+    Every directory is listed at most once and every entry is stat-ed at most
+    once, no matter how many stages (discovery, quality gates, builders,
+    fingerprints) ask about it.  ``counters`` records the underlying calls.
+    Call :meth:`invalidate` after something writes inside a tree.
+    """
+
+    def __init__(self) -> None:
+        self._listings: Dict[str, Dict[str, os.DirEntry]] = {}
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        self._lock = threading.RLock()
+        self.counters: Counter[str] = Counter()
+
+    def listdir(self, path: Path) -> Dict[str, os.DirEntry]:
+        key = os.path.normpath(path)
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing is not None:
+                return listing
+            self.counters["scandir"] += 1
+            try:
+                with os.scandir(key) as entries:
+                    listing = {entry.name: entry for entry in entries}
+            except OSError:
+                listing = {}
+            self._listings[key] = listing
+            return listing
+
+    def listed_directories(self) -> List[Path]:
+        with self._lock:
+            return [Path(key) for key in self._listings]
+
+    def entry(self, path: Path) -> Optional[os.DirEntry]:
+        key = os.path.normpath(path)
+        parent, name = os.path.split(key)
+        if name in _UNLISTED:
+            return None
+        return self.listdir(Path(parent)).get(name)
+
+    def stat(self, path: Path) -> Optional[os.stat_result]:
+        key = os.path.normpath(path)
+        with self._lock:
+            if key in self._stats:
+                return self._stats[key]
+            entry = self.entry(path)
+            result: Optional[os.stat_result] = None
+            if entry is not None:
+                self.counters["stat"] += 1
+                try:
+                    result = entry.stat()
+                except OSError:
+                    result = None
+            elif os.path.basename(key) in _UNLISTED:
+                # Raíces, "." y "..": se consultan directamente.
+                self.counters["stat"] += 1
+                try:
+                    result = os.stat(key)
+                except OSError:
+                    result = None
+            self._stats[key] = result
+            return result
+
+    def exists(self, path: Path) -> bool:
+        entry = self.entry(path)
+        if entry is None:
+            return self.stat(path) is not None
+        return not entry.is_symlink() or self.stat(path) is not None
+
+    def is_dir(self, path: Path) -> bool:
+        entry = self.entry(path)
+        if entry is None:
+            return self.stat(path) is not None
+        return entry.is_dir()
+
+    def is_file(self, path: Path) -> bool:
+        entry = self.entry(path)
+        return entry is not None and entry.is_file()
+
+    def size(self, path: Path) -> Optional[int]:
+        stat = self.stat(path)
+        return stat.st_size if stat is not None else None
+
+    def is_empty_dir(self, path: Path) -> bool:
+        return self.is_dir(path) and not self.listdir(path)
+
+    def iter_files(
+        self,
+        root: Path,
+        *,
+        suffix: Optional[str] = None,
+        name: Optional[str] = None,
+        prune: Optional[Prune] = None,
+    ) -> Iterator[Path]:
+        """Yields files under ``root`` (or ``root`` itself if it is a file).
+
+        Directories for which ``prune`` returns true are not descended into.
+        """
+        for path, _ in self._walk(root, suffix=suffix, name=name, prune=prune, with_stat=False):
+            yield path
+
+    def walk_stats(
+        self, root: Path, *, prune: Optional[Prune] = None
+    ) -> Iterator[Tuple[Path, os.stat_result]]:
+        for path, stat in self._walk(root, suffix=None, name=None, prune=prune, with_stat=True):
+            if stat is not None:
+                yield path, stat
+
+    def invalidate(self, path: Path) -> None:
+        """Forgets everything cached for ``path``, its subtree and its parent listing."""
+        key = os.path.normpath(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        parent = os.path.dirname(key) or os.curdir
+        with self._lock:
+            for cache in (self._listings, self._stats):
+                for cached in [k for k in cache if k == key or k.startswith(prefix)]:
+                    del cache[cached]
+            self._listings.pop(parent, None)
+
+    def clear(self) -> None:
+        """Forgets every cached listing and stat."""
+        with self._lock:
+            self._listings.clear()
+            self._stats.clear()
+
+    def _walk(
+        self,
+        root: Path,
+        *,
+        suffix: Optional[str],
+        name: Optional[str],
+        prune: Optional[Prune],
+        with_stat: bool,
+    ) -> Iterator[Tuple[Path, Optional[os.stat_result]]]:
+        def matches(filename: str) -> bool:
+            if name is not None and filename != name:
+                return False
+            return suffix is None or filename.endswith(suffix)
+
+        if self.is_file(root):
+            if matches(root.name):
+                yield root, self.stat(root) if with_stat else None
+            return
+        if not self.is_dir(root):
+            return
+
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            for entry_name, entry in sorted(self.listdir(current).items(), reverse=True):
+                child = current / entry_name
+                if entry.is_dir(follow_symlinks=False):
+                    if prune is None or not prune(child):
+                        stack.append(child)
+                elif entry.is_file() and matches(entry_name):
+                    yield child, self.stat(child) if with_stat else None
+
+
+__all__ = ["FileSystemIndex", "Prune"]
@@ -0,0 +1,184 @@
+"""Historial persistente de builds en SQLite."""
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .models import BuildRecord
+from .statuses import BuildStatus
+
+# Número de builds recientes que se consideran por componente.
+DEFAULT_WINDOW = 20
+# Filas que se conservan por componente y estado; el resto se borra tras cada ejecución.
+DEFAULT_RETENTION = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    component TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL,
+    fingerprint TEXT,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_component ON builds(component, status, id);
+"""
+
+
+@dataclass(frozen=True)
+class ComponentTrend:
+    name: str
+    runs: int
+    last: float
+    median: float
+    p90: float
+    p95: float
+    change: Optional[float]
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    if len(ordered) == 1:
+        return ordered[0]
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class BuildHistory:
+    """Stores every ``BuildRecord`` of a run in ``history.sqlite3``.
+
+    Only ``built`` records feed duration statistics: up-to-date and failed
+    builds say little about how long a real build takes.  Each run keeps
+    the latest ``retention`` rows per component and status, so the file
+    stops growing while the statistics window stays full.
+    """
+
+    FILENAME = "history.sqlite3"
+
+    def __init__(
+        self, state_dir: Path, window: int = DEFAULT_WINDOW, retention: int = DEFAULT_RETENTION
+    ) -> None:
+        self._path = state_dir / self.FILENAME
+        self._window = window
+        self._retention = max(retention, window)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=10)
+        try:
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def record(self, records: Sequence[BuildRecord], started_at: float) -> None:
+        finished_at = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (started_at, finished_at) VALUES (?, ?)",
+                (started_at, finished_at),
+            )
+            connection.executemany(
+                "INSERT INTO builds (run_id, component, status, duration, fingerprint, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        cursor.lastrowid,
+                        record.component.name,
+                        record.status.value,
+                        record.duration,
+                        record.fingerprint,
+                        finished_at,
+                    )
+                    for record in records
+                ],
+            )
+            self._prune(connection)
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            """
+            DELETE FROM builds WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY component, status ORDER BY id DESC
+                    ) AS position
+                    FROM builds
+                )
+                WHERE position > ?
+            )
+            """,
+            (self._retention,),
+        )
+        connection.execute(
+            "DELETE FROM runs WHERE NOT EXISTS (SELECT 1 FROM builds WHERE builds.run_id = runs.id)"
+        )
+
+    def durations(self) -> Dict[str, List[float]]:
+        """Returns the most recent built durations per component, oldest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                """
+                SELECT component, duration FROM (
+                    SELECT component, duration, id,
+                           ROW_NUMBER() OVER (PARTITION BY component ORDER BY id DESC) AS position
+                    FROM builds
+                    WHERE status = ? AND duration IS NOT NULL
+                )
+                WHERE position <= ?
+                ORDER BY component, id
+                """,
+                (BuildStatus.BUILT.value, self._window),
+            ).fetchall()
+        result: Dict[str, List[float]] = {}
+        for component, duration in rows:
+            result.setdefault(component, []).append(duration)
+        return result
+
+    def median_durations(self) -> Dict[str, float]:
+        try:
+            samples = self.durations()
+        except (OSError, sqlite3.Error):
+            return {}
+        return {name: statistics.median(values) for name, values in samples.items()}
+
+    def trends(self) -> List[ComponentTrend]:
+        trends: List[ComponentTrend] = []
+        for name, values in sorted(self.durations().items()):
+            ordered = sorted(values)
+            change: Optional[float] = None
+            half = len(values) // 2
+            if half:
+                previous = statistics.mean(values[:half])
+                recent = statistics.mean(values[-half:])
+                if previous > 0:
+                    change = (recent - previous) / previous
+            trends.append(
+                ComponentTrend(
+                    name=name,
+                    runs=len(values),
+                    last=values[-1],
+                    median=statistics.median(values),
+                    p90=_percentile(ordered, 0.9),
+                    p95=_percentile(ordered, 0.95),
+                    change=change,
+                )
+            )
+        return trends
+
+
+__all__ = ["BuildHistory", "ComponentTrend", "DEFAULT_RETENTION", "DEFAULT_WINDOW"]
@@ -0,0 +1,130 @@
+"""Reglas de exclusión con sintaxis de ``.gitignore`` para el descubrimiento."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Optional, Pattern, Tuple
+
+DEFAULT_EXCLUDES: Tuple[str, ...] = (
+    "node_modules/",
+    ".git/",
+    ".hg/",
+    ".svn/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".nox/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".sygmare/",
+)
+
+
+def _translate(pattern: str) -> str:
+    parts: list[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("/**", index) and index + 3 == len(pattern):
+            parts.append("/.*")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    base: PurePosixPath
+    regex: Pattern[str]
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+    @classmethod
+    def parse(cls, line: str, base: PurePosixPath) -> Optional["IgnoreRule"]:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            return None
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        anchored = "/" in line
+        line = line.lstrip("/")
+        return cls(base, re.compile(f"{_translate(line)}$"), negate, dir_only, anchored)
+
+    def matches(self, path: PurePosixPath, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        try:
+            relative = path.relative_to(self.base)
+        except ValueError:
+            return False
+        target = relative.as_posix() if self.anchored else relative.name
+        return self.regex.match(target) is not None
+
+
+class IgnoreRules:
+    """Ordered, immutable set of ignore rules; the last matching rule wins."""
+
+    def __init__(self, rules: Tuple[IgnoreRule, ...] = ()) -> None:
+        self._rules = rules
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str], base: Path) -> "IgnoreRules":
+        return cls().extended(patterns, base)
+
+    def extended(self, lines: Iterable[str], base: Path) -> "IgnoreRules":
+        posix_base = PurePosixPath(base.as_posix())
+        parsed = tuple(
+            rule for rule in (IgnoreRule.parse(line, posix_base) for line in lines) if rule
+        )
+        if not parsed:
+            return self
+        return IgnoreRules(self._rules + parsed)
+
+    def ignored(self, path: Path, *, is_dir: bool) -> bool:
+        return self.matches(path, is_dir=is_dir)
+
+    def matches(self, path: Path, *, is_dir: bool) -> bool:
+        posix_path = PurePosixPath(path.as_posix())
+        result = False
+        for rule in self._rules:
+            if rule.matches(posix_path, is_dir):
+                result = not rule.negate
+        return result
+
+
+__all__ = ["DEFAULT_EXCLUDES", "IgnoreRule", "IgnoreRules"]
@@ -0,0 +1,375 @@
+"""Archivo comprimido e indexado de la salida de cada ejecución."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .state import DEFAULT_STATE_DIRNAME
+
+ARCHIVE_DIRNAME = "logs"
+INDEX_NAME = "index.jsonl"
+DEFAULT_MAX_AGE_DAYS = 14.0
+DEFAULT_MAX_SIZE_MB = 256
+# Nivel de compresión: la salida de compilación comprime bien incluso con niveles bajos.
+COMPRESSION_LEVEL = 6
+# wbits para que zlib produzca y lea miembros gzip completos.
+_GZIP_WBITS = 31
+
+_SAFE_NAME = re.compile(r"[^\w.-]+")
+_active: ContextVar[Optional["RunLog"]] = ContextVar("sygmare_run_log", default=None)
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One command's output: a gzip member at ``offset`` of ``file`` in the run."""
+
+    run: str
+    component: str
+    command: str
+    file: str
+    offset: int
+    length: int
+    exit_code: Optional[int]
+    started: float
+    duration: float
+    timed_out: bool = False
+
+
+class SegmentWriter:
+    """Compresses one command's output into its own gzip member."""
+
+    def __init__(self, run: "RunLog", component: str, command: str, path: Path) -> None:
+        self._run = run
+        self._component = component
+        self._command = command
+        self._path = path
+        self._handle = path.open("ab")
+        self._offset = self._handle.tell()
+        self._compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+        self._started = time.time()
+        self._clock = time.perf_counter()
+
+    def write(self, line: str) -> None:
+        data = self._compressor.compress(line.encode("utf-8", errors="replace") + b"\n")
+        if data:
+            self._handle.write(data)
+
+    def close(self, exit_code: Optional[int], *, timed_out: bool = False) -> None:
+        if self._handle.closed:
+            return
+        self._handle.write(self._compressor.flush())
+        length = self._handle.tell() - self._offset
+        self._handle.close()
+        self._run._record(
+            Segment(
+                self._run.run_id,
+                self._component,
+                self._command,
+                self._path.name,
+                self._offset,
+                length,
+                exit_code,
+                self._started,
+                time.perf_counter() - self._clock,
+                timed_out,
+            )
+        )
+
+
+class RunLog:
+    """Archive being written for one run: one ``.log.gz`` per component plus the index.
+
+    Every command is appended to its component's file as a separate gzip
+    member, so a single command can be read back by seeking to its offset.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.run_id = directory.name
+        self._lock = threading.Lock()
+        self._files: Dict[str, str] = {}
+        self._index = (directory / INDEX_NAME).open("a", encoding="utf-8")
+
+    def open_segment(self, component: Optional[str], command: str) -> SegmentWriter:
+        name = component or "-"
+        with self._lock:
+            filename = self._files.get(name)
+            if filename is None:
+                # Nombres distintos pueden coincidir una vez saneados.
+                stem = _SAFE_NAME.sub("_", name) or "_"
+                taken = set(self._files.values())
+                filename = f"{stem}.log.gz"
+                suffix = 1
+                while filename in taken:
+                    suffix += 1
+                    filename = f"{stem}.{suffix}.log.gz"
+                self._files[name] = filename
+        return SegmentWriter(self, name, command, self.directory / filename)
+
+    def close(self) -> None:
+        with self._lock:
+            self._index.close()
+
+    def _record(self, segment: Segment) -> None:
+        line = json.dumps(asdict(segment), ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if not self._index.closed:
+                self._index.write(line + "\n")
+                self._index.flush()
+
+
+class LogArchive:
+    """Run archives under ``root``, one directory per run named after its start time."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def start_run(self) -> RunLog:
+        self.root.mkdir(parents=True, exist_ok=True)
+        base = time.strftime("%Y%m%d-%H%M%S")
+        run_id = base
+        suffix = 1
+        while True:
+            try:
+                (self.root / run_id).mkdir()
+                break
+            except FileExistsError:
+                suffix += 1
+                run_id = f"{base}-{suffix}"
+        return RunLog(self.root / run_id)
+
+    def runs(self) -> List[Path]:
+        """Run directories, oldest first (ids sort chronologically)."""
+        try:
+            return sorted(entry for entry in self.root.iterdir() if entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+    def resolve(self, run: str) -> Optional[Path]:
+        """Directory for ``run``: an id, an unambiguous id prefix, or ``last``."""
+        runs = self.runs()
+        if run == "last":
+            return runs[-1] if runs else None
+        exact = [entry for entry in runs if entry.name == run]
+        if exact:
+            return exact[0]
+        matches = [entry for entry in runs if entry.name.startswith(run)]
+        return matches[0] if len(matches) == 1 else None
+
+    @staticmethod
+    def segments(run_dir: Path) -> List[Segment]:
+        segments: List[Segment] = []
+        try:
+            lines = (run_dir / INDEX_NAME).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return segments
+        for line in lines:
+            try:
+                segments.append(Segment(**json.loads(line)))
+            except (TypeError, ValueError):
+                # Línea truncada por una ejecución interrumpida.
+                continue
+        return segments
+
+    @staticmethod
+    def read(run_dir: Path, segment: Segment) -> str:
+        """Decompresses only ``segment``'s member of its component file."""
+        with (run_dir / segment.file).open("rb") as handle:
+            handle.seek(segment.offset)
+            data = handle.read(segment.length)
+        return zlib.decompress(data, _GZIP_WBITS).decode("utf-8", errors="replace")
+
+    def prune(
+        self,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        max_size_mb: int = DEFAULT_MAX_SIZE_MB,
+        *,
+        keep: Iterable[str] = (),
+    ) -> int:
+        """Deletes runs older than ``max_age_days``, then the oldest until under ``max_size_mb``."""
+        kept = set(keep)
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        remaining: List[Tuple[Path, int]] = []
+        for run_dir in self.runs():
+            if run_dir.name not in kept and run_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(run_dir, ignore_errors=True)
+                removed += 1
+            else:
+                remaining.append((run_dir, _directory_size(run_dir)))
+        budget = max_size_mb * 1024 * 1024
+        total = sum(size for _, size in remaining)
+        for run_dir, size in remaining:
+            if total <= budget:
+                break
+            if run_dir.name in kept:
+                continue
+            shutil.rmtree(run_dir, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+def _directory_size(directory: Path) -> int:
+    total = 0
+    for entry in os.scandir(directory):
+        try:
+            total += entry.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+@contextmanager
+def activate(run_log: Optional[RunLog]) -> Iterator[None]:
+    token = _active.set(run_log)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def open_segment(component: Optional[str], command: str) -> Optional[SegmentWriter]:
+    """Writer for ``command``'s output in the active run, if any is being archived."""
+    run_log = _active.get()
+    if run_log is None:
+        return None
+    try:
+        return run_log.open_segment(component, command)
+    except OSError:
+        return None
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m sygmare_app logs",
+        description=(
+            "Consulta la salida archivada de ejecuciones anteriores. Sin argumentos "
+            "lista las ejecuciones; con una ejecución lista sus comandos; con una "
+            "ejecución y un componente muestra la salida de sus comandos."
+        ),
+    )
+    parser.add_argument("run", nargs="?", help="Identificador de la ejecución, o 'last'.")
+    parser.add_argument("component", nargs="?", help="Nombre del componente.")
+    parser.add_argument(
+        "--command",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Muestra solo el N-ésimo comando del componente (empezando en 1).",
+    )
+    parser.add_argument(
+        "--tail",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Muestra solo las últimas N líneas de cada comando.",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=None,
+        help="Directorio de estado cuyo archivo de registros se consulta.",
+    )
+    return parser
+
+
+def _list_runs(archive: LogArchive) -> int:
+    runs = archive.runs()
+    if not runs:
+        print("No hay ejecuciones archivadas.")
+        return 0
+    print(f"{'Ejecución':<22}{'Comandos':>9}{'Fallidos':>9}{'Tamaño':>10}")
+    for run_dir in runs:
+        segments = archive.segments(run_dir)
+        failed = sum(1 for segment in segments if segment.exit_code != 0)
+        size = _directory_size(run_dir) / 1024
+        print(f"{run_dir.name:<22}{len(segments):>9}{failed:>9}{size:>8.1f}KB")
+    return 0
+
+
+def _list_segments(run_dir: Path, segments: List[Segment]) -> int:
+    print(f"Ejecución {run_dir.name}:")
+    positions: Dict[str, int] = {}
+    for segment in segments:
+        positions[segment.component] = positions.get(segment.component, 0) + 1
+        status = "⏱" if segment.timed_out else "✔" if segment.exit_code == 0 else "✖"
+        print(
+            f"  {status} {segment.component} #{positions[segment.component]} "
+            f"(exit {segment.exit_code}, {segment.duration:.2f}s): {segment.command}"
+        )
+    return 0
+
+
+def run_logs(argv: Optional[Iterable[str]] = None) -> int:
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    state_dir = args.state_dir or Path(__file__).resolve().parent.parent / DEFAULT_STATE_DIRNAME
+    archive = LogArchive(state_dir / ARCHIVE_DIRNAME)
+    if args.run is None:
+        return _list_runs(archive)
+
+    run_dir = archive.resolve(args.run)
+    if run_dir is None:
+        print(f"✖ No se encontró la ejecución {args.run!r}.", file=sys.stderr)
+        return 1
+    segments = archive.segments(run_dir)
+    if args.component is None:
+        return _list_segments(run_dir, segments)
+
+    names = list(dict.fromkeys(segment.component for segment in segments))
+    if args.component not in names:
+        matches = [name for name in names if args.component in name]
+        if len(matches) != 1:
+            print(
+                f"✖ El componente {args.component!r} no aparece en {run_dir.name} "
+                f"o es ambiguo.",
+                file=sys.stderr,
+            )
+            return 1
+        args.component = matches[0]
+    selected = [segment for segment in segments if segment.component == args.component]
+    if args.command is not None:
+        if not 1 <= args.command <= len(selected):
+            parser.error(f"--command debe estar entre 1 y {len(selected)}")
+        selected = [selected[args.command - 1]]
+
+    for segment in selected:
+        print(f"$ {segment.command}")
+        try:
+            lines = archive.read(run_dir, segment).splitlines()
+        except (OSError, zlib.error) as exc:
+            print(f"✖ No se pudo leer el registro: {exc}", file=sys.stderr)
+            return 1
+        if args.tail is not None:
+            lines = lines[-args.tail :] if args.tail > 0 else []
+        for line in lines:
+            print(line)
+        print(f"[exit {segment.exit_code}]")
+    return 0
+
+
+__all__ = [
+    "ARCHIVE_DIRNAME",
+    "DEFAULT_MAX_AGE_DAYS",
+    "DEFAULT_MAX_SIZE_MB",
+    "LogArchive",
+    "RunLog",
+    "Segment",
+    "SegmentWriter",
+    "activate",
+    "open_segment",
+    "run_logs",
+]
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+import math
 from pathlib import Path
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from .models import BuildKind, Component, Manifest, QualitySpec
+from .fsindex import FileSystemIndex
+from .ignore import DEFAULT_EXCLUDES, IgnoreRules
+from .models import BuildKind, Component, Manifest, QualitySpec, ResourceSpec, TimeoutSpec
 
 
 @dataclass(frozen=True)
@@ -20,10 +23,32 @@ class DiscoveredComponent:
 
 
 class ManifestLoader:
-    def __init__(self, repo_root: Path) -> None:
+    def __init__(
+        self,
+        repo_root: Path,
+        fs: FileSystemIndex | None = None,
+        excludes: Sequence[str] = (),
+    ) -> None:
         self._repo_root = repo_root
+        self._fs = fs or FileSystemIndex()
+        self._excludes = tuple(excludes)
+        self._root_rules: IgnoreRules | None = None
+        self._inputs: List[Path] = []
+
+    def inputs(self) -> List[Path]:
+        """Files and directories whose state determined the last loaded manifest."""
+        return list(dict.fromkeys(self._inputs))
+
+    def ignore_rules(self) -> IgnoreRules:
+        """Default excludes, the root ``.gitignore`` and the configured excludes."""
+        if self._root_rules is None:
+            rules = IgnoreRules.from_patterns(DEFAULT_EXCLUDES, self._repo_root)
+            rules = rules.extended(self._read_gitignore(self._repo_root), self._repo_root)
+            self._root_rules = rules.extended(self._excludes, self._repo_root)
+        return self._root_rules
 
     def load(self, manifest_path: Path | None) -> Manifest:
+        self._inputs = [manifest_path] if manifest_path else []
         if manifest_path and manifest_path.exists():
             data = json.loads(manifest_path.read_text())
             components = [self._from_dict(item, manifest_path.parent) for item in data]
@@ -32,6 +57,11 @@ class ManifestLoader:
 
     def default_manifest(self) -> Manifest:
         discovered = list(self._discover_components())
+        self._inputs.extend(
+            directory
+            for directory in self._fs.listed_directories()
+            if directory == self._repo_root or self._repo_root in directory.parents
+        )
         components = [
             Component(
                 name=item.name,
@@ -52,11 +82,14 @@ class ManifestLoader:
         yield from self._discover_shell_scripts()
 
     def _discover_python_packages(self) -> Iterable[DiscoveredComponent]:
-        for path in sorted(self._repo_root.iterdir()):
-            if not path.is_dir() or path.name.startswith('.'):
+        rules = self.ignore_rules()
+        for name, entry in sorted(self._fs.listdir(self._repo_root).items()):
+            if not entry.is_dir() or name.startswith('.'):
+                continue
+            path = self._repo_root / name
+            if rules.ignored(path, is_dir=True):
                 continue
-            init_file = path / "__init__.py"
-            if not init_file.exists():
+            if not self._fs.exists(path / "__init__.py"):
                 continue
             yield DiscoveredComponent(
                 name=f"Paquete Python::{path.name}",
@@ -69,10 +102,12 @@ class ManifestLoader:
             )
 
     def _discover_python_modules(self) -> Iterable[DiscoveredComponent]:
-        for path in sorted(self._repo_root.glob("*.py")):
-            if path.name.startswith("_"):
+        rules = self.ignore_rules()
+        for name in sorted(self._fs.listdir(self._repo_root)):
+            if not name.endswith(".py") or name.startswith(("_", ".")):
                 continue
-            if path.name == "__init__.py":
+            path = self._repo_root / name
+            if rules.ignored(path, is_dir=False):
                 continue
             yield DiscoveredComponent(
                 name=f"Módulo Python::{path.stem}",
@@ -85,10 +120,7 @@ class ManifestLoader:
             )
 
     def _discover_node_projects(self) -> Iterable[DiscoveredComponent]:
-        for package_json in sorted(self._repo_root.glob("**/package.json")):
-            project_dir = package_json.parent
-            if project_dir == self._repo_root or project_dir.name.startswith('.'):
-                continue
+        for project_dir in self._find_node_projects():
             yield DiscoveredComponent(
                 name=f"Proyecto Node::{project_dir.name}",
                 path=project_dir,
@@ -99,10 +131,83 @@ class ManifestLoader:
                 ),
             )
 
+    def _find_node_projects(self) -> List[Path]:
+        """Walks the repository pruning ignored directories while descending.
+
+        The walk stops at the first ``package.json`` of a subtree unless it
+        declares ``workspaces``; in that case only matching members are kept.
+        """
+        projects: List[Path] = []
+        root_workspaces = self._workspace_rules(self._repo_root)
+        stack: List[Tuple[Path, IgnoreRules, Optional[IgnoreRules]]] = [
+            (self._repo_root, self.ignore_rules(), root_workspaces)
+        ]
+        while stack:
+            directory, rules, workspaces = stack.pop()
+            listing = self._fs.listdir(directory)
+            if directory != self._repo_root:
+                if "pyvenv.cfg" in listing:
+                    continue
+                if ".gitignore" in listing:
+                    rules = rules.extended(self._read_gitignore(directory), directory)
+                if "package.json" in listing and not listing["package.json"].is_dir():
+                    member = workspaces is None or workspaces.matches(directory, is_dir=True)
+                    if member:
+                        projects.append(directory)
+                    nested = self._workspace_rules(directory) if member else None
+                    if nested is None:
+                        continue
+                    workspaces = nested
+            for name, entry in listing.items():
+                if name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+                    continue
+                child = directory / name
+                if not rules.ignored(child, is_dir=True):
+                    stack.append((child, rules, workspaces))
+        return sorted(projects)
+
+    def _workspace_rules(self, project_dir: Path) -> Optional[IgnoreRules]:
+        package_json = project_dir / "package.json"
+        if not self._fs.is_file(package_json):
+            return None
+        self._inputs.append(package_json)
+        try:
+            data = json.loads(package_json.read_text())
+        except (OSError, ValueError):
+            return None
+        workspaces = data.get("workspaces") if isinstance(data, dict) else None
+        if isinstance(workspaces, dict):
+            workspaces = workspaces.get("packages")
+        if not workspaces or not isinstance(workspaces, list):
+            return None
+        patterns = [
+            f"!/{item[1:].lstrip('/')}" if item.startswith("!") else f"/{item.removeprefix('./')}"
+            for item in workspaces
+            if isinstance(item, str)
+        ]
+        return IgnoreRules.from_patterns(patterns, project_dir)
+
+    def _read_gitignore(self, directory: Path) -> List[str]:
+        gitignore = directory / ".gitignore"
+        if not self._fs.is_file(gitignore):
+            return []
+        self._inputs.append(gitignore)
+        try:
+            return gitignore.read_text(errors="replace").splitlines()
+        except OSError:
+            return []
+
     def _discover_shell_scripts(self) -> Iterable[DiscoveredComponent]:
+        rules = self.ignore_rules()
         candidates: List[Path] = []
-        candidates.extend(sorted(self._repo_root.glob("*.sh")))
-        candidates.extend(sorted(self._repo_root.glob("scripts/*.sh")))
+        for directory in (self._repo_root, self._repo_root / "scripts"):
+            candidates.extend(
+                directory / name
+                for name in self._fs.listdir(directory)
+                if name.endswith(".sh")
+                and not name.startswith(".")
+                and not rules.ignored(directory / name, is_dir=False)
+            )
         for path in sorted(set(candidates)):
             yield DiscoveredComponent(
                 name=f"Script Shell::{path.stem}",
@@ -119,7 +224,22 @@ class ManifestLoader:
         if not path:
             raise ValueError("Cada componente necesita un campo 'path'.")
 
-        commands = item.get("commands") or []
+        commands: List[Sequence[str]] = []
+        command_timeouts: List[Optional[TimeoutSpec]] = []
+        # Cada comando es una lista de argumentos o un objeto con 'command' y límites propios.
+        for entry in item.get("commands") or []:
+            if isinstance(entry, dict):
+                command = entry.get("command")
+                if not isinstance(command, list) or not command:
+                    raise ValueError(
+                        f"Comando inválido para {item['name']}: cada objeto de 'commands' "
+                        "necesita un campo 'command' con la lista de argumentos."
+                    )
+                commands.append(command)
+                command_timeouts.append(self._timeouts_from(entry, item["name"]))
+            else:
+                commands.append(entry)
+                command_timeouts.append(None)
         dependencies = item.get("dependencies") or []
         kind = BuildKind(item.get("kind", "python"))
 
@@ -132,6 +252,21 @@ class ManifestLoader:
                 description=quality_data.get("description"),
             )
 
+        resources = None
+        resources_data = item.get("resources")
+        if resources_data is not None:
+            resources = ResourceSpec(
+                cpu=float(resources_data.get("cpu", 1.0)),
+                memory_mb=int(resources_data.get("memory_mb", 0)),
+            )
+            # NaN e infinito pasarían una simple comparación y anularían el presupuesto.
+            valid_cpu = math.isfinite(resources.cpu) and resources.cpu > 0
+            if not valid_cpu or resources.memory_mb < 0:
+                raise ValueError(
+                    f"Recursos inválidos para {item['name']}: 'cpu' debe ser un número finito "
+                    "positivo y 'memory_mb' no negativo."
+                )
+
         return Component(
             name=item["name"],
             path=(base / path) if not Path(path).is_absolute() else Path(path),
@@ -139,7 +274,26 @@ class ManifestLoader:
             build_commands=tuple(tuple(cmd) for cmd in commands),
             dependencies=tuple(dependencies),
             quality=quality_spec,
+            resources=resources,
+            timeouts=self._timeouts_from(item, item["name"]),
+            command_timeouts=tuple(command_timeouts) if any(command_timeouts) else (),
         )
 
+    @staticmethod
+    def _timeouts_from(data: dict, name: str) -> Optional[TimeoutSpec]:
+        limits = []
+        for key in ("timeout", "idle_timeout"):
+            value = data.get(key)
+            if value is not None:
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                    raise ValueError(
+                        f"Límite inválido para {name}: {key!r} debe ser un número de "
+                        "segundos positivo."
+                    )
+                value = float(value)
+            limits.append(value)
+        spec = TimeoutSpec(*limits)
+        return spec if spec else None
+
 
 __all__ = ["ManifestLoader"]
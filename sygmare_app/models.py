@@ -28,6 +28,25 @@ class QualitySpec:
         return [base_path / rel for rel in self.required_paths]
 
 
+@dataclass(frozen=True)
+class ResourceSpec:
+    """CPU and memory a component is expected to use while it builds."""
+
+    cpu: float = 1.0
+    memory_mb: int = 0
+
+
+@dataclass(frozen=True)
+class TimeoutSpec:
+    """Wall-clock and output-idle limits in seconds; ``None`` means no limit."""
+
+    timeout: Optional[float] = None
+    idle_timeout: Optional[float] = None
+
+    def __bool__(self) -> bool:
+        return self.timeout is not None or self.idle_timeout is not None
+
+
 @dataclass(frozen=True)
 class Component:
     """Represents a buildable unit in the ecosystem."""
@@ -38,10 +57,27 @@ class Component:
     build_commands: Sequence[Sequence[str]] = ()
     dependencies: Sequence[str] = ()
     quality: Optional[QualitySpec] = None
+    resources: Optional[ResourceSpec] = None
+    timeouts: Optional[TimeoutSpec] = None
+    command_timeouts: Sequence[Optional[TimeoutSpec]] = ()
 
     def normalized_commands(self) -> List[List[str]]:
         return [list(cmd) for cmd in self.build_commands]
 
+    def command_limits(self, index: Optional[int] = None) -> TimeoutSpec:
+        """Limits for build command ``index``, or for an implicit command when ``None``.
+
+        The component's ``timeout`` bounds the whole build, not each command;
+        its ``idle_timeout`` applies to every command that does not set one.
+        """
+        spec = None
+        if index is not None and index < len(self.command_timeouts):
+            spec = self.command_timeouts[index]
+        idle_timeout = spec.idle_timeout if spec is not None else None
+        if idle_timeout is None and self.timeouts is not None:
+            idle_timeout = self.timeouts.idle_timeout
+        return TimeoutSpec(spec.timeout if spec is not None else None, idle_timeout)
+
 
 @dataclass(frozen=True)
 class Manifest:
@@ -57,6 +93,7 @@ class BuildRecord:
     status: BuildStatus
     details: Optional[str] = None
     duration: float | None = None
+    fingerprint: Optional[str] = None
 
 
 class BuildError(RuntimeError):
@@ -0,0 +1,189 @@
+"""Almacén de ``node_modules`` direccionado por el contenido del lockfile."""
+from __future__ import annotations
+
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no POSIX
+    fcntl = None  # type: ignore[assignment]
+
+from .state import write_atomic
+from .tools import resolve_command
+
+LOCKFILES = ("package-lock.json", "npm-shrinkwrap.json")
+MARKER = ".sygmare-store-key"
+DEFAULT_MAX_AGE_DAYS = 30.0
+DEFAULT_MAX_ENTRIES = 20
+# ioctl FICLONE de Linux: copia por referencia (btrfs, XFS, ...).
+_FICLONE = 0x40049409
+
+
+def _clone_or_copy(src: str, dst: str) -> None:
+    """Copies ``src`` to ``dst``, as a copy-on-write reflink when the filesystem allows it."""
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as source, open(dst, "wb") as target:
+                fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+class NodeModulesStore:
+    """Keeps installed ``node_modules`` trees keyed by lockfile and toolchain.
+
+    Entries live in ``root/<key>/node_modules``.  Files are copied in and
+    out of the store, as reflinks where the filesystem supports them, so
+    a project that rewrites its ``node_modules`` (postinstall scripts,
+    ``npm rebuild``) never changes the stored entry.  Entries unused for
+    a while are removed by :meth:`prune`.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._toolchain: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def key(self, project_dir: Path) -> Optional[str]:
+        for name in LOCKFILES:
+            lockfile = project_dir / name
+            try:
+                content = lockfile.read_bytes()
+            except OSError:
+                continue
+            digest = hashlib.sha256(content)
+            digest.update(b"\0" + self.toolchain().encode())
+            return digest.hexdigest()
+        return None
+
+    def toolchain(self) -> str:
+        with self._lock:
+            if self._toolchain is None:
+                parts = [platform.system(), platform.machine()]
+                for tool in ("node", "npm"):
+                    parts.append(f"{tool}={self._version(tool)}")
+                self._toolchain = " ".join(parts)
+            return self._toolchain
+
+    def is_current(self, project_dir: Path, key: str) -> bool:
+        try:
+            current = (project_dir / "node_modules" / MARKER).read_text().strip() == key
+        except OSError:
+            return False
+        if current:
+            self._touch(key)
+        return current
+
+    def restore(self, project_dir: Path, key: str) -> bool:
+        source = self._root / key / "node_modules"
+        if not source.is_dir():
+            return False
+        target = project_dir / "node_modules"
+        staging = project_dir / f".node_modules.{uuid.uuid4().hex}"
+        try:
+            shutil.copytree(source, staging, symlinks=True, copy_function=_clone_or_copy)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        self._discard(target)
+        os.replace(staging, target)
+        self._mark(target, key)
+        self._touch(key)
+        return True
+
+    def save(self, project_dir: Path, key: str) -> None:
+        source = project_dir / "node_modules"
+        if not source.is_dir():
+            return
+        self._mark(source, key)
+        entry = self._root / key
+        if (entry / "node_modules").is_dir():
+            self._touch(key)
+            return
+        staging = self._root / f".{key}.{uuid.uuid4().hex}"
+        try:
+            shutil.copytree(
+                source, staging / "node_modules", symlinks=True, copy_function=_clone_or_copy
+            )
+            os.rename(staging, entry)
+        except OSError:
+            # Otro proceso ganó la carrera o el disco no lo permite: la
+            # entrada existente (si la hay) sigue siendo válida.
+            pass
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def prune(
+        self,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> int:
+        """Removes entries unused for ``max_age_days``, then the least recently used
+        beyond ``max_entries``; returns how many were removed."""
+        try:
+            entries = [
+                entry
+                for entry in self._root.iterdir()
+                if entry.is_dir() and not entry.name.startswith(".")
+            ]
+        except FileNotFoundError:
+            return 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for position, entry in enumerate(entries):
+            if position >= max_entries or entry.stat().st_mtime < cutoff:
+                self._discard(entry)
+                removed += 1
+        return removed
+
+    def _touch(self, key: str) -> None:
+        # El mtime de la entrada registra su último uso para prune().
+        try:
+            os.utime(self._root / key)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _mark(node_modules: Path, key: str) -> None:
+        write_atomic(node_modules / MARKER, key.encode())
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        if not path.exists() and not path.is_symlink():
+            return
+        trash = path.with_name(f".{path.name}.old.{uuid.uuid4().hex}")
+        os.replace(path, trash)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    @staticmethod
+    def _version(tool: str) -> str:
+        resolved = resolve_command(tool)
+        if resolved is None:
+            return "missing"
+        try:
+            return subprocess.run(
+                [resolved, "--version"],
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            ).stdout.strip()
+        except OSError:
+            return "unknown"
+
+
+__all__ = ["DEFAULT_MAX_AGE_DAYS", "DEFAULT_MAX_ENTRIES", "LOCKFILES", "NodeModulesStore"]
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from collections import Counter
+from contextlib import nullcontext
 from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from pathlib import Path
 from time import perf_counter
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from .executors import CommandResult, builder_registry
-from .models import BuildError, BuildRecord, Component
-from .quality import StrictQualityInspector
+from . import events, logarchive, tracing
+from .compilation import BytecodeIndex, PythonCompileEngine
+from .console import grouped_output, routed_stdout
+from .executors import DEFAULT_TAIL_LINES, CommandResult, OutputPolicy, builder_registry
+from .fingerprints import FingerprintStore
+from .fsindex import FileSystemIndex
+from .models import BuildError, BuildKind, BuildRecord, Component
+from .nodestore import NodeModulesStore
+from .quality import QualityCache, QualityReport, StrictQualityInspector
+from .remote import RemoteWorkers
+from .resources import ResourceBudget, physical_memory_mb
+from .shellcheck import ShellcheckLinter
 from .statuses import BuildStatus
 
 
@@ -14,69 +29,419 @@ from .statuses import BuildStatus
 class OrchestratorConfig:
     dry_run: bool = False
     stop_on_failure: bool = False
+    jobs: int | None = None
+    state_dir: Path | None = None
+    force: bool = False
+    python_mode: str = "pool"
+    log_dir: Path | None = None
+    tail_lines: int = DEFAULT_TAIL_LINES
+    node_cache: bool = True
+    cpu_budget: float | None = None
+    memory_budget_mb: int | None = None
+    workers: Tuple[str, ...] = ()
+    worker_secret: str | None = None
+    log_archive: bool = True
+    log_max_age_days: float = logarchive.DEFAULT_MAX_AGE_DAYS
+    log_max_size_mb: int = logarchive.DEFAULT_MAX_SIZE_MB
 
+    def resolved_jobs(self) -> int:
+        return max(1, self.jobs or os.cpu_count() or 1)
 
-class Orchestrator:
-    def __init__(self, config: OrchestratorConfig | None = None) -> None:
+    def resolved_cpu_budget(self) -> float:
+        return self.cpu_budget or float(self.resolved_jobs())
+
+    def resolved_memory_budget(self) -> int | None:
+        return self.memory_budget_mb or physical_memory_mb()
+
+
+class AsyncOrchestrator:
+    """asyncio scheduler: components run as tasks bounded by a semaphore.
+
+    Subprocesses are awaited on the event loop, so hundreds of components can
+    wait on child processes without a thread each.
+    """
+
+    def __init__(
+        self, config: OrchestratorConfig | None = None, fs: FileSystemIndex | None = None
+    ) -> None:
         self.config = config or OrchestratorConfig()
-        self._quality = StrictQualityInspector()
-        self._builders = builder_registry()
-
-    def build(self, components: Iterable[Component]) -> List[BuildRecord]:
-        records: List[BuildRecord] = []
-        for component in components:
-            component_started = perf_counter()
-            print(f"▶ {component.name}")
-            report = self._quality.evaluate(component)
-            if not report.passed:
-                details = report.formatted()
-                print("  ✖ Calidad no superada:")
-                for line in details.splitlines():
-                    print(f"    {line}")
-                duration = perf_counter() - component_started
-                records.append(
-                    BuildRecord(
-                        component,
-                        BuildStatus.QUALITY_FAILED,
-                        details,
-                        duration,
-                    )
-                )
-                if self.config.stop_on_failure:
-                    raise BuildError(f"Calidad fallida para {component.name}")
-                print()
-                continue
-
-            builder = self._builders.get(component.kind)
-            if builder is None:
-                message = f"Tipo de componente no soportado: {component.kind}"
-                print(f"  ⚠️  {message}")
-                duration = perf_counter() - component_started
-                records.append(
-                    BuildRecord(component, BuildStatus.SKIPPED, message, duration)
-                )
-                print()
-                continue
-
-            build_started = perf_counter()
-            result: CommandResult = builder.build(component, dry_run=self.config.dry_run)
-            build_duration = perf_counter() - build_started
-            total_duration = perf_counter() - component_started
-            result_duration = result.duration if result.duration is not None else build_duration
-            print(f"  → Resultado: {result.status.value} ({result_duration:.2f}s)\n")
-            records.append(
-                BuildRecord(
-                    component,
-                    result.status,
-                    result.details,
-                    total_duration,
-                )
+        self.fs = fs or FileSystemIndex()
+        self._quality = StrictQualityInspector(
+            self.fs, QualityCache(self.config.state_dir) if self.config.state_dir else None
+        )
+        self._quality_reports: Dict[str, QualityReport] = {}
+        self._python_engine = PythonCompileEngine(self.config.resolved_jobs())
+        self._shell_linter = ShellcheckLinter(self.config.state_dir, self.config.resolved_jobs())
+        self._python_index: BytecodeIndex | None = None
+        self._node_store: NodeModulesStore | None = None
+        if self.config.state_dir is not None:
+            self._python_index = BytecodeIndex(self.config.state_dir)
+            if self.config.node_cache:
+                self._node_store = NodeModulesStore(self.config.state_dir / "node_modules")
+        self._builders = builder_registry(
+            python_mode=self.config.python_mode,
+            python_engine=self._python_engine,
+            python_index=self._python_index,
+            output=OutputPolicy(self.config.tail_lines, self.config.log_dir),
+            fs=self.fs,
+            node_store=self._node_store,
+            shell_linter=self._shell_linter,
+        )
+        self._store: FingerprintStore | None = None
+        self._fingerprints: Dict[str, str] = {}
+        self._remote: RemoteWorkers | None = None
+        self._totals: Counter[BuildStatus] = Counter()
+        self.last_run_id: Optional[str] = None
+
+    async def build(
+        self, components: Iterable[Component], *, known: Optional[Iterable[str]] = None
+    ) -> List[BuildRecord]:
+        """Builds ``components`` releasing each one as soon as its dependencies finish.
+
+        Up to ``config.jobs`` components run at the same time.  Records are
+        returned in the order of ``components`` regardless of completion order.
+        ``known`` lists every component of the manifest; the stored state of
+        any other component is dropped.
+        """
+        plan = list(components)
+        jobs = min(self.config.resolved_jobs(), max(1, len(plan)))
+        index = {component.name: position for position, component in enumerate(plan)}
+
+        sorter: TopologicalSorter[str] = TopologicalSorter()
+        for component in plan:
+            sorter.add(component.name, *(dep for dep in component.dependencies if dep in index))
+        sorter.prepare()
+
+        if self.config.state_dir is not None:
+            self._store = FingerprintStore(self.config.state_dir, self.fs)
+            if known is not None:
+                self._store.forget(known)
+        self._fingerprints = {}
+
+        if self.config.workers:
+            self._remote = RemoteWorkers(self.config.workers, secret=self.config.worker_secret)
+            await self._remote.start()
+
+        run_started = perf_counter()
+        self._totals = Counter()
+        events.emit(events.RunStarted(len(plan), jobs, self.config.dry_run))
+        # Los procesos de shellcheck comparten el límite de trabajos con los builds.
+        slots = asyncio.Semaphore(jobs)
+        # Fase de calidad previa: en paralelo y casi sin E/S para lo que no cambió.
+        # shellcheck analiza a la vez todos los scripts en unos pocos procesos.
+        with tracing.span("quality_phase", "quality", components=len(plan)):
+            self._quality_reports, _ = await asyncio.gather(
+                asyncio.to_thread(self._quality.evaluate_all, plan, self.config.resolved_jobs()),
+                self._prepare_shellcheck(plan, slots),
+            )
+        records: Dict[str, BuildRecord] = {}
+        archive, run_log = self._start_run_log()
+        try:
+            with routed_stdout() if jobs > 1 else nullcontext(), logarchive.activate(run_log):
+                failure = await self._schedule(plan, index, sorter, jobs, slots, records)
+        finally:
+            if archive is not None and run_log is not None:
+                run_log.close()
+                await asyncio.to_thread(self._prune_logs, archive, run_log.run_id)
+            if self._remote is not None:
+                await self._remote.close()
+                self._remote = None
+            self._quality_reports = {}
+            self._quality.save()
+            self._shell_linter.save()
+            totals = {status.value: self._totals[status] for status in BuildStatus}
+            events.emit(events.RunFinished(totals, perf_counter() - run_started))
+
+        if not self.config.dry_run:
+            if self._store is not None:
+                self._store.save()
+            self.save_index()
+            if self._node_store is not None:
+                try:
+                    await asyncio.to_thread(self._node_store.prune)
+                except OSError:
+                    # Limpieza oportunista: se reintenta en la siguiente ejecución.
+                    pass
+        if failure is not None:
+            raise failure
+        return [records[component.name] for component in plan if component.name in records]
+
+    def _start_run_log(
+        self,
+    ) -> Tuple[Optional[logarchive.LogArchive], Optional[logarchive.RunLog]]:
+        self.last_run_id = None
+        if self.config.dry_run or not self.config.log_archive or self.config.state_dir is None:
+            return None, None
+        archive = logarchive.LogArchive(self.config.state_dir / logarchive.ARCHIVE_DIRNAME)
+        try:
+            run_log = archive.start_run()
+        except OSError as exc:
+            print(f"⚠ No se pudo crear el archivo de registros: {exc}")
+            return None, None
+        self.last_run_id = run_log.run_id
+        return archive, run_log
+
+    def _prune_logs(self, archive: logarchive.LogArchive, current: str) -> None:
+        try:
+            archive.prune(
+                self.config.log_max_age_days, self.config.log_max_size_mb, keep=(current,)
+            )
+        except OSError:
+            # Limpieza oportunista: se reintenta en la siguiente ejecución.
+            pass
+
+    async def _prepare_shellcheck(self, plan: List[Component], slots: asyncio.Semaphore) -> None:
+        if self.config.dry_run:
+            return
+        scripts = [
+            component.path
+            for component in plan
+            if component.kind is BuildKind.SHELL and self.fs.is_file(component.path)
+        ]
+        await self._shell_linter.prepare(scripts, slots)
+
+    async def _schedule(
+        self,
+        plan: List[Component],
+        index: Dict[str, int],
+        sorter: TopologicalSorter[str],
+        jobs: int,
+        semaphore: asyncio.Semaphore,
+        records: Dict[str, BuildRecord],
+    ) -> BuildError | None:
+        budget = ResourceBudget(
+            self.config.resolved_cpu_budget(), self.config.resolved_memory_budget()
+        )
+        lanes = list(range(1, jobs + 1))
+        started: Set[str] = set()
+        running: Dict[asyncio.Task[BuildRecord], str] = {}
+        failure: BuildError | None = None
+        halted = asyncio.Event()
+
+        async def run(component: Component) -> BuildRecord:
+            # Primero el turno y después el presupuesto: reservar sin turno dejaría
+            # recursos retenidos por componentes que aún no pueden empezar.
+            async with semaphore, budget.reserve(component):
+                # El turno liberado por el componente que falló puede llegar antes
+                # de que el bucle principal vea el fallo.
+                if halted.is_set():
+                    raise asyncio.CancelledError
+                started.add(component.name)
+                lane_id = lanes.pop(0)
+                try:
+                    with tracing.lane(lane_id):
+                        record = await self._build_isolated(component, jobs > 1)
+                finally:
+                    lanes.append(lane_id)
+                    lanes.sort()
+                if self._stop_error(record) is not None:
+                    halted.set()
+                return record
+
+        while failure is None and sorter.is_active():
+            for name in sorted(sorter.get_ready(), key=index.__getitem__):
+                running[asyncio.create_task(run(plan[index[name]]))] = name
+            if not running:
+                break
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(finished, key=lambda item: index[running[item]]):
+                name = running.pop(task)
+                if task.cancelled():
+                    continue
+                record = task.result()
+                records[name] = record
+                sorter.done(name)
+                if failure is None:
+                    failure = self._stop_error(record)
+
+        # Lo que aún no empezó se cancela; lo que está en curso termina antes
+        # de propagar el fallo.
+        for task, name in running.items():
+            if name not in started:
+                task.cancel()
+        if running:
+            await asyncio.wait(running)
+            for task, name in running.items():
+                if not task.cancelled():
+                    records[name] = task.result()
+        return failure
+
+    async def _build_isolated(self, component: Component, grouped: bool) -> BuildRecord:
+        with grouped_output() if grouped else nullcontext(), events.component(component.name):
+            with tracing.span(component.name, "component", kind=component.kind.value) as args:
+                record = await self._build_component(component)
+                args["status"] = record.status.value
+        # Los totales se actualizan a medida que termina cada componente.
+        self._totals[record.status] += 1
+        events.emit(
+            events.ComponentFinished(
+                component.name,
+                record.status.value,
+                record.duration,
+                record.details,
+                record.fingerprint,
+            )
+        )
+        return record
+
+    def _stop_error(self, record: BuildRecord) -> BuildError | None:
+        if not self.config.stop_on_failure:
+            return None
+        if record.status == BuildStatus.QUALITY_FAILED:
+            return BuildError(f"Calidad fallida para {record.component.name}")
+        if record.status == BuildStatus.FAILED:
+            return BuildError(f"Fallo de compilación en {record.component.name}")
+        if record.status == BuildStatus.TIMED_OUT:
+            return BuildError(f"Tiempo agotado en {record.component.name}")
+        return None
+
+    async def _build_component(self, component: Component) -> BuildRecord:
+        component_started = perf_counter()
+        print(f"▶ {component.name}")
+        events.emit(events.ComponentStarted(component.name, component.kind.value))
+        with tracing.span("fingerprint", "fingerprint"):
+            fingerprint = await asyncio.to_thread(self._fingerprint, component)
+        if (
+            fingerprint is not None
+            and not self.config.force
+            and self._store is not None
+            and self._store.is_current(component, fingerprint)
+        ):
+            print("  ≡ Sin cambios desde la última compilación.\n")
+            duration = perf_counter() - component_started
+            return BuildRecord(component, BuildStatus.UP_TO_DATE, None, duration, fingerprint)
+
+        report = self._quality_reports.pop(component.name, None)
+        if report is None or (not report.passed and component.dependencies):
+            # El fallo puede deberse a algo que generan las dependencias, que
+            # ya se han construido: se vuelve a evaluar.
+            with tracing.span("quality", "quality") as trace_args:
+                report = await asyncio.to_thread(self._quality.evaluate, component)
+                trace_args["passed"] = report.passed
+        details = None if report.passed else report.formatted()
+        events.emit(events.QualityFinished(component.name, report.passed, details))
+        if details is not None:
+            print("  ✖ Calidad no superada:")
+            for line in details.splitlines():
+                print(f"    {line}")
+            print()
+            duration = perf_counter() - component_started
+            return BuildRecord(
+                component, BuildStatus.QUALITY_FAILED, details, duration, fingerprint
             )
 
-            if result.status == BuildStatus.FAILED and self.config.stop_on_failure:
-                raise BuildError(f"Fallo de compilación en {component.name}")
+        if self._remote is None and component.kind not in self._builders:
+            message = f"Tipo de componente no soportado: {component.kind}"
+            print(f"  ⚠️  {message}")
+            print()
+            duration = perf_counter() - component_started
+            return BuildRecord(component, BuildStatus.SKIPPED, message, duration, fingerprint)
+
+        build_started = perf_counter()
+        with tracing.span(f"build:{component.kind.value}", "builder") as trace_args:
+            if self._remote is not None:
+                result = await self._remote.build(component, dry_run=self.config.dry_run)
+                trace_args["worker"] = True
+            else:
+                result = await self.execute(component)
+            trace_args["status"] = result.status.value
+        build_duration = perf_counter() - build_started
+        total_duration = perf_counter() - component_started
+        result_duration = result.duration if result.duration is not None else build_duration
+        print(f"  → Resultado: {result.status.value} ({result_duration:.2f}s)\n")
+        if not self.config.dry_run:
+            self.fs.invalidate(component.path)
+        if result.status == BuildStatus.BUILT and not self.config.dry_run:
+            fingerprint = await asyncio.to_thread(self._record_fingerprint, component)
+        return BuildRecord(component, result.status, result.details, total_duration, fingerprint)
+
+    async def execute(self, component: Component, *, dry_run: bool | None = None) -> CommandResult:
+        """Runs the local builder for ``component``, without fingerprints or quality gates.
+
+        The component's ``timeout`` bounds the whole build; when exceeded the
+        build is cancelled and reported as ``TIMED_OUT``.
+        """
+        builder = self._builders.get(component.kind)
+        if builder is None:
+            message = f"Tipo de componente no soportado: {component.kind}"
+            print(f"  ⚠️  {message}")
+            return CommandResult(BuildStatus.SKIPPED, message)
+        if dry_run is None:
+            dry_run = self.config.dry_run
+        limits = component.timeouts
+        if dry_run or limits is None or limits.timeout is None:
+            return await builder.build_async(component, dry_run=dry_run)
+        try:
+            # Al cancelarse, los comandos en curso terminan su grupo de procesos.
+            return await asyncio.wait_for(
+                builder.build_async(component, dry_run=dry_run), limits.timeout
+            )
+        except asyncio.TimeoutError:
+            message = f"El build superó el límite de {limits.timeout:g}s"
+            print(f"  ⏱ {message}")
+            return CommandResult(BuildStatus.TIMED_OUT, message, limits.timeout)
+
+    def save_index(self) -> None:
+        """Persists the bytecode index used by the incremental Python builder."""
+        if self._python_index is not None:
+            self._python_index.save()
+
+    def shutdown(self) -> None:
+        """Stops the shared compile pool and persists the bytecode index."""
+        self._python_engine.shutdown()
+        self.save_index()
+
+    def _dependency_fingerprints(self, component: Component) -> Dict[str, Optional[str]]:
+        assert self._store is not None
+        return {
+            dep: self._fingerprints.get(dep) or self._store.stored(dep)
+            for dep in component.dependencies
+        }
+
+    def _fingerprint(self, component: Component) -> Optional[str]:
+        if self._store is None:
+            return None
+        fingerprint = self._store.compute(component, self._dependency_fingerprints(component))
+        self._fingerprints[component.name] = fingerprint
+        return fingerprint
+
+    def _record_fingerprint(self, component: Component) -> Optional[str]:
+        # La huella se recalcula tras compilar para absorber lo que el propio
+        # build haya escrito dentro del componente.
+        fingerprint = self._fingerprint(component)
+        if fingerprint is not None and self._store is not None:
+            self._store.record(component, fingerprint)
+        return fingerprint
+
+
+class Orchestrator:
+    """Synchronous facade over :class:`AsyncOrchestrator`."""
+
+    def __init__(
+        self, config: OrchestratorConfig | None = None, fs: FileSystemIndex | None = None
+    ) -> None:
+        self._async = AsyncOrchestrator(config, fs)
+
+    @property
+    def config(self) -> OrchestratorConfig:
+        return self._async.config
+
+    @property
+    def fs(self) -> FileSystemIndex:
+        return self._async.fs
+
+    @property
+    def last_run_id(self) -> Optional[str]:
+        """Archive id of the last build's command output, if it was archived."""
+        return self._async.last_run_id
+
+    def build(
+        self, components: Iterable[Component], *, known: Optional[Iterable[str]] = None
+    ) -> List[BuildRecord]:
+        return asyncio.run(self._async.build(components, known=known))
 
-        return records
+    def shutdown(self) -> None:
+        self._async.shutdown()
 
 
-__all__ = ["Orchestrator", "OrchestratorConfig"]
+__all__ = ["AsyncOrchestrator", "Orchestrator", "OrchestratorConfig"]
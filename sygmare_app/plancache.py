@@ -0,0 +1,205 @@
+"""Caché en disco del manifiesto validado y del plan ordenado."""
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .ignore import DEFAULT_EXCLUDES
+from .models import BuildKind, Component, Manifest, QualitySpec, ResourceSpec, TimeoutSpec
+from .state import write_atomic
+
+CACHE_VERSION = 3
+
+# (ruta, tipo, tamaño, mtime_ns, huella): tipo "f" para archivos, "d" para
+# directorios y "-" para rutas ausentes.
+InputSignature = Tuple[str, str, int, int, str]
+
+# Entradas que los propios builds crean o modifican y que no influyen en el
+# autodescubrimiento.
+_VOLATILE_NAMES = frozenset(pattern.rstrip("/") for pattern in DEFAULT_EXCLUDES)
+
+FRESH, REVALIDATED, STALE = "fresh", "revalidated", "stale"
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def _listing_digest(path: str) -> str:
+    with os.scandir(path) as entries:
+        names = sorted(
+            f"{entry.name}/" if entry.is_dir() else entry.name
+            for entry in entries
+            if entry.name not in _VOLATILE_NAMES
+        )
+    return hashlib.sha256("\0".join(names).encode()).hexdigest()
+
+
+def _signature(path: Path) -> InputSignature:
+    key = str(path)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return (key, "-", 0, 0, "")
+    if os.path.isdir(key):
+        return (key, "d", 0, stat.st_mtime_ns, _listing_digest(key))
+    return (key, "f", stat.st_size, stat.st_mtime_ns, _file_digest(key))
+
+
+def _check(signature: InputSignature) -> str:
+    key, kind, size, mtime_ns, digest = signature
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return FRESH if kind == "-" else STALE
+    if kind == "-":
+        return STALE
+    if stat.st_mtime_ns == mtime_ns and (kind == "d" or stat.st_size == size):
+        return FRESH
+    # El mtime cambió (p. ej. tras un checkout o una compilación): el
+    # contenido del archivo o la lista de entradas del directorio decide.
+    try:
+        if kind == "d":
+            current = _listing_digest(key) if os.path.isdir(key) else ""
+        else:
+            current = _file_digest(key) if stat.st_size == size else ""
+    except OSError:
+        return STALE
+    return REVALIDATED if current == digest else STALE
+
+
+def _quality_to_tuple(spec: Optional[QualitySpec]) -> Optional[tuple]:
+    if spec is None:
+        return None
+    return (tuple(spec.required_paths), spec.forbid_empty, spec.description)
+
+
+def _quality_from_tuple(data: Optional[tuple]) -> Optional[QualitySpec]:
+    if data is None:
+        return None
+    required_paths, forbid_empty, description = data
+    return QualitySpec(tuple(required_paths), forbid_empty, description)
+
+
+def _resources_to_tuple(spec: Optional[ResourceSpec]) -> Optional[tuple]:
+    if spec is None:
+        return None
+    return (spec.cpu, spec.memory_mb)
+
+
+def _resources_from_tuple(data: Optional[tuple]) -> Optional[ResourceSpec]:
+    if data is None:
+        return None
+    cpu, memory_mb = data
+    return ResourceSpec(cpu, memory_mb)
+
+
+def _timeouts_to_tuple(spec: Optional[TimeoutSpec]) -> Optional[tuple]:
+    if spec is None:
+        return None
+    return (spec.timeout, spec.idle_timeout)
+
+
+def _timeouts_from_tuple(data: Optional[tuple]) -> Optional[TimeoutSpec]:
+    if data is None:
+        return None
+    timeout, idle_timeout = data
+    return TimeoutSpec(timeout, idle_timeout)
+
+
+def component_to_tuple(component: Component) -> tuple:
+    return (
+        component.name,
+        str(component.path),
+        component.kind.value,
+        tuple(tuple(cmd) for cmd in component.build_commands),
+        tuple(component.dependencies),
+        _quality_to_tuple(component.quality),
+        _resources_to_tuple(component.resources),
+        _timeouts_to_tuple(component.timeouts),
+        tuple(_timeouts_to_tuple(spec) for spec in component.command_timeouts),
+    )
+
+
+def component_from_tuple(data: tuple) -> Component:
+    name, path, kind, commands, dependencies, quality, resources, timeouts, command_timeouts = data
+    return Component(
+        name=name,
+        path=Path(path),
+        kind=BuildKind(kind),
+        build_commands=tuple(tuple(cmd) for cmd in commands),
+        dependencies=tuple(dependencies),
+        quality=_quality_from_tuple(quality),
+        resources=_resources_from_tuple(resources),
+        timeouts=_timeouts_from_tuple(timeouts),
+        command_timeouts=tuple(_timeouts_from_tuple(spec) for spec in command_timeouts),
+    )
+
+
+class PlanCache:
+    """Stores the manifest and plan as marshalled plain tuples.
+
+    An entry is valid while its ``key`` (repository, manifest path, excludes)
+    matches and every recorded input is unchanged.  Inputs are checked by
+    mtime first; when it moved, files are compared by content hash and
+    directories by their list of entry names.  The last entry loaded or
+    stored is also kept in memory, so a long-lived process only re-checks
+    the inputs.
+    """
+
+    FILENAME = "plan.cache"
+
+    def __init__(self, state_dir: Path, key: Sequence[str]) -> None:
+        self._path = state_dir / self.FILENAME
+        self._key = tuple(key)
+        self._warm: Optional[Tuple[tuple, Manifest, List[Component]]] = None
+
+    def load(self) -> Optional[Tuple[Manifest, List[Component]]]:
+        if self._warm is not None:
+            inputs, manifest, plan = self._warm
+            if all(_check(signature) == FRESH for signature in inputs):
+                return manifest, list(plan)
+            self._warm = None
+        try:
+            payload = marshal.loads(self._path.read_bytes())
+            version, key, inputs, components, order = payload
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != CACHE_VERSION or tuple(key) != self._key:
+            return None
+        states = [_check(signature) for signature in inputs]
+        if STALE in states:
+            return None
+        try:
+            manifest = Manifest([component_from_tuple(item) for item in components])
+            by_name = manifest.by_name()
+            plan = [by_name[name] for name in order]
+        except (KeyError, TypeError, ValueError):
+            return None
+        if REVALIDATED in states:
+            self.store(manifest, plan, [Path(signature[0]) for signature in inputs])
+        else:
+            self._warm = (tuple(inputs), manifest, list(plan))
+        return manifest, plan
+
+    def store(self, manifest: Manifest, plan: Sequence[Component], inputs: Sequence[Path]) -> None:
+        signatures = tuple(_signature(path) for path in inputs)
+        self._warm = (signatures, manifest, list(plan))
+        payload = (
+            CACHE_VERSION,
+            self._key,
+            signatures,
+            tuple(component_to_tuple(component) for component in manifest.components),
+            tuple(component.name for component in plan),
+        )
+        try:
+            write_atomic(self._path, marshal.dumps(payload))
+        except OSError:
+            pass
+
+
+__all__ = ["CACHE_VERSION", "PlanCache", "component_from_tuple", "component_to_tuple"]
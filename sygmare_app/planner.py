@@ -1,21 +1,88 @@
 from __future__ import annotations
 
+import os
+from collections import deque
 from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set
 
 from .models import BuildError, Component, Manifest
 
 
+class DependencyGraph:
+    """Adjacency index of a manifest: dependencies and dependents by name.
+
+    Built once in O(V+E); closures are breadth-first walks that only touch
+    the components they return.  Unknown dependency names are ignored here;
+    :class:`StrictPlanner` reports them.
+    """
+
+    def __init__(self, components: Iterable[Component]) -> None:
+        self._components: Dict[str, Component] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        for component in components:
+            self._components[component.name] = component
+            self._dependents.setdefault(component.name, [])
+        for component in self._components.values():
+            for dep in component.dependencies:
+                if dep in self._dependents:
+                    self._dependents[dep].append(component.name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._components
+
+    def dependencies_closure(self, names: Iterable[str]) -> Set[str]:
+        """``names`` plus everything they transitively depend on."""
+        return self._closure(names, lambda name: self._components[name].dependencies)
+
+    def dependents_closure(self, names: Iterable[str]) -> Set[str]:
+        """``names`` plus everything that transitively depends on them."""
+        return self._closure(names, self._dependents.__getitem__)
+
+    def _closure(
+        self, names: Iterable[str], edges: Callable[[str], Iterable[str]]
+    ) -> Set[str]:
+        seen = {name for name in names if name in self._components}
+        queue = deque(seen)
+        while queue:
+            for neighbour in edges(queue.popleft()):
+                if neighbour in self._components and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return seen
+
+
 class StrictPlanner:
     """Determines the build order using strict dependency validation."""
 
     def __init__(self, manifest: Manifest) -> None:
         self._manifest = manifest
+        self._graph: Optional[DependencyGraph] = None
+
+    @property
+    def graph(self) -> DependencyGraph:
+        if self._graph is None:
+            self._graph = DependencyGraph(self._manifest.components)
+        return self._graph
 
-    def plan(self) -> list[Component]:
+    def plan(self, targets: Optional[Iterable[str]] = None) -> list[Component]:
+        """Orders the whole manifest, or only ``targets`` and their dependencies.
+
+        With targets, components outside that closure are neither validated
+        nor sorted.
+        """
         name_map = self._manifest.by_name()
-        sorter = TopologicalSorter()
+        components: Sequence[Component] = self._manifest.components
+        if targets is not None:
+            targets = list(targets)
+            unknown = [name for name in targets if name not in name_map]
+            if unknown:
+                raise BuildError(f"Componentes desconocidos: {', '.join(unknown)}")
+            selected = self.graph.dependencies_closure(targets)
+            components = [component for component in components if component.name in selected]
 
-        for component in self._manifest.components:
+        sorter = TopologicalSorter()
+        for component in components:
             missing = [dep for dep in component.dependencies if dep not in name_map]
             if missing:
                 raise BuildError(
@@ -30,5 +97,72 @@ class StrictPlanner:
 
         return [name_map[name] for name in ordered_names if name in name_map]
 
+    def dependents_of(self, names: Iterable[str]) -> list[Component]:
+        """``names`` and their transitive dependents, in manifest order."""
+        names = list(names)
+        unknown = [name for name in names if name not in self.graph]
+        if unknown:
+            raise BuildError(f"Componentes desconocidos: {', '.join(unknown)}")
+        selected = self.graph.dependents_closure(names)
+        return [component for component in self._manifest.components if component.name in selected]
+
+
+def restrict(plan: Sequence[Component], names: Set[str]) -> list[Component]:
+    """Keeps the components of an already ordered ``plan`` whose name is in ``names``."""
+    return [component for component in plan if component.name in names]
+
+
+def prioritize(plan: Sequence[Component], durations: Mapping[str, float]) -> list[Component]:
+    """Reorders a valid plan by dependency depth, longest expected build first.
+
+    Components without history keep their relative position after those with
+    it inside the same depth level.  The result is still a topological order.
+    """
+    depth: Dict[str, int] = {}
+    for component in plan:
+        depth[component.name] = 1 + max(
+            (depth[dep] for dep in component.dependencies if dep in depth), default=-1
+        )
+    position = {component.name: index for index, component in enumerate(plan)}
+    return sorted(
+        plan,
+        key=lambda component: (
+            depth[component.name],
+            -durations.get(component.name, 0.0),
+            position[component.name],
+        ),
+    )
+
+
+def components_for_paths(plan: Sequence[Component], paths: Iterable[Path]) -> Set[str]:
+    """Names of the components whose ``path`` is, or contains, any of ``paths``."""
+    roots = [(component.name, os.path.realpath(component.path)) for component in plan]
+    owners: Set[str] = set()
+    for path in paths:
+        changed = os.path.realpath(path)
+        for name, root in roots:
+            if changed == root or changed.startswith(root.rstrip(os.sep) + os.sep):
+                owners.add(name)
+    return owners
+
+
+def with_dependents(plan: Sequence[Component], names: Iterable[str]) -> List[Component]:
+    """Returns ``names`` plus everything that transitively depends on them, in plan order."""
+    selected = set(names)
+    result: List[Component] = []
+    # El plan ya está en orden topológico: basta con una pasada.
+    for component in plan:
+        if component.name in selected or any(dep in selected for dep in component.dependencies):
+            selected.add(component.name)
+            result.append(component)
+    return result
+
 
-__all__ = ["StrictPlanner"]
+__all__ = [
+    "DependencyGraph",
+    "StrictPlanner",
+    "components_for_paths",
+    "prioritize",
+    "restrict",
+    "with_dependents",
+]
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import contextvars
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+from . import tracing
+from .fsindex import FileSystemIndex
 from .models import BuildKind, Component
+from .state import dump_json, load_json
 
 
 @dataclass
@@ -33,51 +41,170 @@ class QualityReport:
         return "\n".join(f"[{f.level.upper()}] {f.message}" for f in self.findings)
 
 
+# (ruta, mtime_ns, tamaño) de cada entrada consultada; -1 si no existe.
+EntrySignature = Tuple[str, int, int]
+
+
+def _definition_key(component: Component) -> str:
+    """Digest of everything in the manifest entry that the checks depend on."""
+    payload = repr((component.kind.value, str(component.path), component.quality))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class QualityCache:
+    """Remembers passing reports together with the entries they looked at.
+
+    A cached report stays valid while the component definition and the
+    ``(mtime_ns, size)`` of every consulted entry are unchanged.  Failing
+    reports are never cached: they are cheap to recompute and may depend on
+    outputs of other builds.
+    """
+
+    FILENAME = "quality.json"
+
+    def __init__(self, state_dir: Path) -> None:
+        self._path = state_dir / self.FILENAME
+        self._entries: Dict[str, dict] = dict(load_json(self._path, {}).get("components", {}))
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def lookup(self, component: Component, fs: FileSystemIndex) -> Optional[QualityReport]:
+        with self._lock:
+            entry = self._entries.get(component.name)
+        if entry is None or entry.get("key") != _definition_key(component):
+            return None
+        paths = [Path(path) for path, _, _ in entry["signature"]]
+        if _signature(fs, paths) != [tuple(item) for item in entry["signature"]]:
+            return None
+        report = QualityReport(component)
+        report.findings = [QualityFinding(level, message) for level, message in entry["findings"]]
+        return report
+
+    def store(
+        self, component: Component, report: QualityReport, signature: List[EntrySignature]
+    ) -> None:
+        entry = {
+            "key": _definition_key(component),
+            "signature": [list(item) for item in signature],
+            "findings": [[finding.level, finding.message] for finding in report.findings],
+        }
+        with self._lock:
+            if self._entries.get(component.name) != entry:
+                self._entries[component.name] = entry
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            dump_json(self._path, {"components": self._entries})
+            self._dirty = False
+
+
+def _signature(fs: FileSystemIndex, paths: Iterable[Path]) -> List[EntrySignature]:
+    result: List[EntrySignature] = []
+    for path in paths:
+        stat = fs.stat(path)
+        if stat is None:
+            result.append((str(path), -1, -1))
+        else:
+            result.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return result
+
+
 class StrictQualityInspector:
     """Strict validation stage prior to orchestration."""
 
+    def __init__(
+        self, fs: FileSystemIndex | None = None, cache: QualityCache | None = None
+    ) -> None:
+        self._fs = fs or FileSystemIndex()
+        self._cache = cache
+
     def evaluate(self, component: Component) -> QualityReport:
+        if self._cache is not None:
+            cached = self._cache.lookup(component, self._fs)
+            if cached is not None:
+                return cached
+        report, consulted = self._inspect(component)
+        if self._cache is not None and report.passed:
+            self._cache.store(component, report, _signature(self._fs, consulted))
+        return report
+
+    def evaluate_all(
+        self, components: Sequence[Component], jobs: int
+    ) -> Dict[str, QualityReport]:
+        """Evaluates ``components`` on a thread pool; the checks are I/O bound.
+
+        Each evaluation is traced as its own span on the active tracer.
+        """
+        # Los hilos del pool no heredan el contexto: la traza activa se pasa a mano.
+        context = contextvars.copy_context()
+
+        def evaluate(component: Component) -> QualityReport:
+            return context.copy().run(self._evaluate_traced, component)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="quality") as pool:
+            reports = pool.map(evaluate, components)
+            return {component.name: report for component, report in zip(components, reports)}
+
+    def _evaluate_traced(self, component: Component) -> QualityReport:
+        with tracing.span(component.name, "quality") as trace_args:
+            report = self.evaluate(component)
+            trace_args["passed"] = report.passed
+        return report
+
+    def save(self) -> None:
+        if self._cache is not None:
+            self._cache.save()
+
+    def _inspect(self, component: Component) -> Tuple[QualityReport, List[Path]]:
         report = QualityReport(component)
         path = component.path
+        fs = self._fs
+        consulted = [path]
 
-        if not path.exists():
+        if not fs.exists(path):
             report.add_error(f"La ruta {path} no existe.")
-            return report
+            return report, consulted
 
-        target_for_spec = path if path.is_dir() else path.parent
+        is_dir = fs.is_dir(path)
+        is_file = fs.is_file(path)
+        target_for_spec = path if is_dir else path.parent
 
         if component.kind == BuildKind.PYTHON:
-            if path.is_file():
-                python_files = [path] if path.suffix == ".py" else []
-            else:
-                python_files = list(path.rglob("*.py"))
+            # La caché se invalida si cambia cualquiera de los archivos Python.
+            python_files = list(fs.iter_files(path, suffix=".py"))
             if not python_files:
                 report.add_error("No se detectaron archivos Python.")
+            consulted.extend(python_files)
         elif component.kind == BuildKind.NODE:
-            package_json = path / "package.json"
-            if not package_json.exists():
+            consulted.append(path / "package.json")
+            if not fs.exists(path / "package.json"):
                 report.add_error("Falta package.json para construir el proyecto Node.")
         elif component.kind == BuildKind.SHELL:
-            if not path.is_file():
+            if not is_file:
                 report.add_error("El componente shell debe apuntar a un archivo ejecutable.")
-            elif path.stat().st_size == 0:
+            elif fs.size(path) == 0:
                 report.add_error("El script shell está vacío.")
 
         spec = component.quality
         if spec:
             for required in spec.materialized_paths(target_for_spec):
-                if not required.exists():
+                consulted.append(required)
+                if not fs.exists(required):
                     report.add_error(f"Falta recurso requerido: {required}.")
             if spec.forbid_empty and component.kind != BuildKind.SHELL:
-                if path.is_dir() and not any(path.iterdir()):
+                if is_dir and fs.is_empty_dir(path):
                     report.add_error("El directorio del componente está vacío.")
-if path.is_file() and path.stat().st_size == 0:
+                if is_file and fs.size(path) == 0:
                     report.add_error("El archivo del componente está vacío.")
 
-        return report
+        return report, consulted
 
 
 __all__ = [
+    "QualityCache",
     "QualityFinding",
     "QualityReport",
     "StrictQualityInspector",
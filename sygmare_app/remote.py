@@ -0,0 +1,326 @@
+"""Protocolo coordinador/worker y cliente para ejecutar builds en workers remotos."""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import socket
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .executors import CommandResult
+from .models import BuildError, Component
+from .plancache import component_from_tuple, component_to_tuple
+from .statuses import BuildStatus
+
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 5.0
+# Límite de una línea del protocolo; la salida se envía línea a línea.
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+SECRET_ENV = "SYGMARE_WORKER_SECRET"
+
+Message = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Address:
+    """``unix:/ruta/al/socket`` or ``host:port`` (``:port`` listens on localhost)."""
+
+    host: Optional[str] = None
+    port: Optional[int] = None
+    path: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "Address":
+        if text.startswith("unix:"):
+            return cls(path=text[len("unix:") :])
+        host, separator, port = text.rpartition(":")
+        if not separator or not port.isdigit():
+            raise ValueError(f"Dirección inválida: {text!r} (use host:puerto o unix:/ruta).")
+        return cls(host=host or "127.0.0.1", port=int(port))
+
+    def __str__(self) -> str:
+        return f"unix:{self.path}" if self.path else f"{self.host}:{self.port}"
+
+    @property
+    def is_local(self) -> bool:
+        """Whether only this host can reach the address (Unix socket or loopback)."""
+        if self.path:
+            return True
+        if self.host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(self.host or "").is_loopback
+        except ValueError:
+            return False
+
+    async def connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self.path:
+            return await asyncio.open_unix_connection(self.path, limit=MAX_MESSAGE_SIZE)
+        return await asyncio.open_connection(self.host, self.port, limit=MAX_MESSAGE_SIZE)
+
+    async def serve(self, handler) -> asyncio.AbstractServer:
+        if self.path:
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # El socket nace con modo 0600: nadie más puede conectarse ni un instante.
+            previous = os.umask(0o077)
+            try:
+                listener.bind(self.path)
+                os.chmod(self.path, 0o600)
+            except OSError:
+                listener.close()
+                raise
+            finally:
+                os.umask(previous)
+            return await asyncio.start_unix_server(handler, sock=listener, limit=MAX_MESSAGE_SIZE)
+        return await asyncio.start_server(handler, self.host, self.port, limit=MAX_MESSAGE_SIZE)
+
+
+def load_secret(path: Optional[Path] = None) -> Optional[str]:
+    """Shared worker secret read from ``path``, or from ``$SYGMARE_WORKER_SECRET``."""
+    if path is not None:
+        return path.read_text(encoding="utf-8").strip() or None
+    return os.environ.get(SECRET_ENV) or None
+
+
+def sign(secret: str, challenge: str) -> str:
+    """Proof of knowing ``secret``; the secret itself never crosses the socket."""
+    return hmac.new(secret.encode(), challenge.encode(), hashlib.sha256).hexdigest()
+
+
+def encode(message: Message) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+async def receive(reader: asyncio.StreamReader) -> Optional[Message]:
+    """Reads one message; ``None`` when the peer closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def component_payload(component: Component) -> list:
+    # Los workers no comparten el directorio de trabajo del coordinador.
+    absolute = dataclasses.replace(component, path=component.path.absolute())
+    return list(component_to_tuple(absolute))
+
+
+def component_from_payload(payload: list) -> Component:
+    return component_from_tuple(tuple(payload))
+
+
+class WorkerLost(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class _WorkerLink:
+    address: Address
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    name: str
+    slots: int
+    busy: int = 0
+    alive: bool = True
+    pending: Dict[int, "asyncio.Queue[Tuple[str, Any]]"] = field(default_factory=dict)
+    task: Optional["asyncio.Task[None]"] = None
+
+
+class RemoteWorkers:
+    """Coordinator side: hands components to connected workers.
+
+    Every worker announces how many builds it runs at once.  A worker that
+    closes the connection or misses heartbeats for ``heartbeat_timeout``
+    seconds is dropped and its in-flight components are reassigned to the
+    remaining workers.  Quality gates and fingerprints stay on the
+    coordinator, so workers must see the same paths (same host or a shared
+    filesystem).  Workers started with a secret challenge the coordinator,
+    which answers with ``secret``.
+    """
+
+    def __init__(
+        self,
+        addresses: Sequence[str],
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+        secret: Optional[str] = None,
+    ) -> None:
+        self._addresses = [Address.parse(address) for address in addresses]
+        self._heartbeat_timeout = heartbeat_timeout
+        self._secret = secret
+        self._links: List[_WorkerLink] = []
+        self._ids = itertools.count(1)
+        self._condition = asyncio.Condition()
+
+    async def start(self) -> None:
+        for address in self._addresses:
+            try:
+                reader, writer = await asyncio.wait_for(address.connect(), CONNECT_TIMEOUT)
+                hello = await asyncio.wait_for(receive(reader), CONNECT_TIMEOUT)
+                if hello and hello.get("type") == "hello" and hello.get("challenge"):
+                    if not await self._authenticate(reader, writer, str(hello["challenge"])):
+                        print(
+                            f"⚠️  El worker {address} rechazó la autenticación "
+                            f"(revise {SECRET_ENV}).",
+                            file=sys.stderr,
+                        )
+                        writer.close()
+                        continue
+            except (OSError, asyncio.TimeoutError, ValueError) as exc:
+                print(f"⚠️  No se pudo conectar con el worker {address}: {exc}", file=sys.stderr)
+                continue
+            if not hello or hello.get("type") != "hello":
+                print(f"⚠️  El worker {address} no respondió al saludo.", file=sys.stderr)
+                writer.close()
+                continue
+            link = _WorkerLink(
+                address,
+                reader,
+                writer,
+                name=str(hello.get("name") or address),
+                slots=max(1, int(hello.get("slots", 1))),
+            )
+            link.task = asyncio.create_task(self._read(link))
+            self._links.append(link)
+        if not self._links:
+            raise BuildError("Ningún worker remoto disponible.")
+
+    async def _authenticate(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, challenge: str
+    ) -> bool:
+        if self._secret is None:
+            return False
+        writer.write(encode({"type": "auth", "digest": sign(self._secret, challenge)}))
+        await writer.drain()
+        reply = await asyncio.wait_for(receive(reader), CONNECT_TIMEOUT)
+        return bool(reply) and reply.get("type") == "welcome"
+
+    async def close(self) -> None:
+        for link in self._links:
+            link.alive = False
+            if link.task is not None:
+                link.task.cancel()
+            link.writer.close()
+        for link in self._links:
+            if link.task is not None:
+                await asyncio.gather(link.task, return_exceptions=True)
+        self._links = []
+
+    async def build(self, component: Component, *, dry_run: bool) -> CommandResult:
+        while True:
+            link = await self._acquire()
+            if link is None:
+                message = "No quedan workers remotos disponibles."
+                print(f"  ✖ {message}")
+                return CommandResult(BuildStatus.FAILED, message)
+            try:
+                return await self._run(link, component, dry_run)
+            except WorkerLost:
+                print(f"  ↻ Se perdió el worker {link.name}; reasignando {component.name}.")
+            finally:
+                async with self._condition:
+                    link.busy -= 1
+                    self._condition.notify_all()
+
+    async def _acquire(self) -> Optional[_WorkerLink]:
+        def available() -> bool:
+            return not any(link.alive for link in self._links) or self._free() is not None
+
+        async with self._condition:
+            await self._condition.wait_for(available)
+            link = self._free()
+            if link is not None:
+                link.busy += 1
+            return link
+
+    def _free(self) -> Optional[_WorkerLink]:
+        candidates = [link for link in self._links if link.alive and link.busy < link.slots]
+        return min(candidates, key=lambda link: link.busy / link.slots, default=None)
+
+    async def _run(self, link: _WorkerLink, component: Component, dry_run: bool) -> CommandResult:
+        request_id = next(self._ids)
+        queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue()
+        link.pending[request_id] = queue
+        try:
+            link.writer.write(
+                encode(
+                    {
+                        "type": "build",
+                        "id": request_id,
+                        "component": component_payload(component),
+                        "dry_run": dry_run,
+                    }
+                )
+            )
+            await link.writer.drain()
+        except (OSError, RuntimeError):
+            link.pending.pop(request_id, None)
+            await self._drop(link)
+            raise WorkerLost(link.name)
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "output":
+                    sys.stdout.write(payload)
+                elif kind == "result":
+                    return CommandResult(
+                        BuildStatus(payload["status"]),
+                        payload.get("details"),
+                        payload.get("duration"),
+                    )
+                else:
+                    raise WorkerLost(link.name)
+        finally:
+            link.pending.pop(request_id, None)
+
+    async def _read(self, link: _WorkerLink) -> None:
+        try:
+            while True:
+                message = await asyncio.wait_for(receive(link.reader), self._heartbeat_timeout)
+                if message is None:
+                    break
+                queue = link.pending.get(message.get("id"))
+                kind = message.get("type")
+                if queue is None:
+                    continue
+                if kind == "output":
+                    queue.put_nowait(("output", message.get("text", "")))
+                elif kind == "result":
+                    queue.put_nowait(("result", message))
+        except (OSError, asyncio.TimeoutError, ValueError):
+            pass
+        await self._drop(link)
+
+    async def _drop(self, link: _WorkerLink) -> None:
+        if not link.alive:
+            return
+        link.alive = False
+        link.writer.close()
+        for queue in link.pending.values():
+            queue.put_nowait(("lost", None))
+        async with self._condition:
+            self._condition.notify_all()
+
+
+__all__ = [
+    "Address",
+    "HEARTBEAT_INTERVAL",
+    "HEARTBEAT_TIMEOUT",
+    "RemoteWorkers",
+    "SECRET_ENV",
+    "WorkerLost",
+    "component_from_payload",
+    "component_payload",
+    "encode",
+    "load_secret",
+    "receive",
+    "sign",
+]
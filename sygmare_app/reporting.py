@@ -3,8 +3,10 @@ from __future__ import annotations
 import json
 from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable, Sequence
+from typing import Any, Iterable, Optional, Sequence
 
+from .critical_path import CriticalPathAnalysis
+from .history import ComponentTrend
 from .models import BuildRecord
 from .statuses import BuildStatus
 
@@ -12,12 +14,20 @@ from .statuses import BuildStatus
 @dataclass(frozen=True)
 class Totals:
     counts: dict[BuildStatus, int]
+    timed_out_seconds: float = 0.0
 
     @classmethod
     def from_records(cls, records: Iterable[BuildRecord]) -> "Totals":
+        records = list(records)
         counter = Counter(record.status for record in records)
         counts = {status: counter.get(status, 0) for status in BuildStatus}
-        return cls(counts)
+        # Tiempo que consumieron los builds cortados por un límite antes de cortarse.
+        lost = sum(
+            record.duration or 0.0
+            for record in records
+            if record.status == BuildStatus.TIMED_OUT
+        )
+        return cls(counts, lost)
 
     def to_dict(self) -> dict[str, int]:
         return {status.value: count for status, count in self.counts.items()}
@@ -45,11 +55,104 @@ def render_table(records: Sequence[BuildRecord]) -> str:
         lines.append(
             f"  {status.icon()} {status.label():<16}: {totals.counts[status]}"
         )
+    if totals.counts[BuildStatus.TIMED_OUT]:
+        lines.append(f"Tiempo perdido por límites de tiempo: {totals.timed_out_seconds:.2f}s")
     return "\n".join(lines)
 
 
-def render_json(records: Sequence[BuildRecord]) -> str:
-    payload = {
+def render_critical_path_table(analysis: CriticalPathAnalysis) -> str:
+    lines: list[str] = []
+    lines.append("Ruta crítica:")
+    lines.append(f"  {' → '.join(analysis.critical_path) or '-'}")
+    lines.append(
+        f"  Tiempo mínimo con paralelismo ilimitado: {analysis.minimum_wall_time:.2f}s "
+        f"(trabajo total {analysis.total_work:.2f}s, paralelismo máximo "
+        f"{analysis.max_parallelism:.1f}x)"
+    )
+    lines.append("")
+    lines.append(f"{'Duración':>10}{'Inicio':>10}{'Holgura':>10}  Nombre")
+    lines.append(f"{'-' * 10}{'-' * 10}{'-' * 10}  {'-' * 40}")
+    ranked = sorted(analysis.nodes, key=lambda node: (node.slack, -node.duration))
+    for node in ranked:
+        marker = "★" if node.critical else " "
+        lines.append(
+            f"{node.duration:>9.2f}s{node.earliest_start:>9.2f}s{node.slack:>9.2f}s  "
+            f"{marker} {node.name}"
+        )
+    return "\n".join(lines)
+
+
+def critical_path_to_dict(analysis: CriticalPathAnalysis) -> dict[str, Any]:
+    return {
+        "path": list(analysis.critical_path),
+        "minimum_wall_time": analysis.minimum_wall_time,
+        "total_work": analysis.total_work,
+        "max_parallelism": analysis.max_parallelism,
+        "components": [
+            {
+                "name": node.name,
+                "duration": node.duration,
+                "earliest_start": node.earliest_start,
+                "earliest_finish": node.earliest_finish,
+                "latest_start": node.latest_start,
+                "latest_finish": node.latest_finish,
+                "slack": node.slack,
+                "critical": node.critical,
+            }
+            for node in analysis.nodes
+        ],
+    }
+
+
+def render_critical_path_json(analysis: CriticalPathAnalysis) -> str:
+    return json.dumps(critical_path_to_dict(analysis), indent=2, ensure_ascii=False)
+
+
+def _format_change(change: Optional[float]) -> str:
+    if change is None:
+        return "-"
+    arrow = "↑" if change > 0.05 else "↓" if change < -0.05 else "→"
+    return f"{arrow} {change:+.0%}"
+
+
+def render_history_table(trends: Sequence[ComponentTrend]) -> str:
+    if not trends:
+        return "Sin historial de builds todavía."
+    lines: list[str] = []
+    lines.append("Historial de duraciones (builds completados):")
+    lines.append(
+        f"{'Builds':>7}{'Última':>10}{'Mediana':>10}{'p90':>10}{'p95':>10}{'Tendencia':>12}  Nombre"
+    )
+    lines.append(f"{'-' * 59}  {'-' * 40}")
+    for trend in trends:
+        lines.append(
+            f"{trend.runs:>7}{trend.last:>9.2f}s{trend.median:>9.2f}s{trend.p90:>9.2f}s"
+            f"{trend.p95:>9.2f}s{_format_change(trend.change):>12}  {trend.name}"
+        )
+    return "\n".join(lines)
+
+
+def render_history_json(trends: Sequence[ComponentTrend]) -> str:
+    payload = [
+        {
+            "name": trend.name,
+            "runs": trend.runs,
+            "last": trend.last,
+            "median": trend.median,
+            "p90": trend.p90,
+            "p95": trend.p95,
+            "change": trend.change,
+        }
+        for trend in trends
+    ]
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def render_json(
+    records: Sequence[BuildRecord], critical_path: Optional[CriticalPathAnalysis] = None
+) -> str:
+    totals = Totals.from_records(records)
+    payload: dict[str, Any] = {
         "records": [
             {
                 "name": record.component.name,
@@ -62,9 +165,21 @@ def render_json(records: Sequence[BuildRecord]) -> str:
             }
             for record in records
         ],
-        "totals": Totals.from_records(records).to_dict(),
+        "totals": totals.to_dict(),
+        "timed_out_seconds": totals.timed_out_seconds,
     }
+    if critical_path is not None:
+        payload["critical_path"] = critical_path_to_dict(critical_path)
     return json.dumps(payload, indent=2, ensure_ascii=False)
 
 
-__all__ = ["Totals", "render_table", "render_json"]
+__all__ = [
+    "Totals",
+    "critical_path_to_dict",
+    "render_critical_path_json",
+    "render_critical_path_table",
+    "render_history_json",
+    "render_history_table",
+    "render_json",
+    "render_table",
+]
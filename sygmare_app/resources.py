@@ -0,0 +1,73 @@
+"""Presupuesto global de CPU y memoria para admitir compilaciones."""
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+from .models import Component, ResourceSpec
+
+DEFAULT_RESOURCES = ResourceSpec()
+
+
+def physical_memory_mb() -> Optional[int]:
+    """Total physical memory, or ``None`` when the platform does not report it."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class ResourceBudget:
+    """Admits components while their CPU and memory reservations fit the totals.
+
+    Components without ``resources`` reserve one CPU and no memory.  A
+    reservation larger than the whole budget is clamped to it, so the
+    component can still run once everything else has finished.  Smaller
+    components that fit are admitted ahead of a waiting large one to keep
+    the machine busy.
+    """
+
+    def __init__(self, cpu: float, memory_mb: Optional[int] = None) -> None:
+        self._cpu = cpu
+        self._memory_mb = memory_mb
+        self._used_cpu = 0.0
+        self._used_memory_mb = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def demand(self, component: Component) -> Tuple[float, int]:
+        spec = component.resources or DEFAULT_RESOURCES
+        cpu = min(spec.cpu, self._cpu)
+        memory_mb = spec.memory_mb
+        if self._memory_mb is not None:
+            memory_mb = min(memory_mb, self._memory_mb)
+        return cpu, memory_mb
+
+    def _fits(self, cpu: float, memory_mb: int) -> bool:
+        if self._used_cpu + cpu > self._cpu + 1e-9:
+            return False
+        if self._memory_mb is not None and self._used_memory_mb + memory_mb > self._memory_mb:
+            return False
+        return True
+
+    @asynccontextmanager
+    async def reserve(self, component: Component) -> AsyncIterator[None]:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        cpu, memory_mb = self.demand(component)
+        async with condition:
+            await condition.wait_for(lambda: self._fits(cpu, memory_mb))
+            self._used_cpu += cpu
+            self._used_memory_mb += memory_mb
+        try:
+            yield
+        finally:
+            async with condition:
+                self._used_cpu -= cpu
+                self._used_memory_mb -= memory_mb
+                condition.notify_all()
+
+
+__all__ = ["DEFAULT_RESOURCES", "ResourceBudget", "physical_memory_mb"]
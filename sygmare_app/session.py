@@ -0,0 +1,112 @@
+"""Estado reutilizable entre ejecuciones de un mismo proceso (p. ej. el daemon)."""
+from __future__ import annotations
+
+import dataclasses
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .fsindex import FileSystemIndex
+from .manifest import ManifestLoader
+from .models import Component
+from .orchestrator import Orchestrator, OrchestratorConfig
+from .plancache import PlanCache
+from .planner import components_for_paths
+from .watch import IgnorePredicate, Watcher, open_watcher
+
+
+class Session:
+    """Filesystem index, manifest loaders, plan caches and orchestrators.
+
+    A one-shot CLI run uses a fresh session.  The daemon keeps one per
+    working directory and, with ``track_changes``, watches the manifest's
+    components: :meth:`refresh` drops what changed on disk from the index
+    before the next build.
+    """
+
+    def __init__(self, *, track_changes: bool = False) -> None:
+        self.fs = FileSystemIndex()
+        self._track_changes = track_changes
+        self._loaders: Dict[Tuple[Path, Tuple[str, ...]], ManifestLoader] = {}
+        self._plan_caches: Dict[Tuple[Path, Tuple[str, ...]], PlanCache] = {}
+        self._orchestrators: Dict[tuple, Orchestrator] = {}
+        self._watcher: Optional[Watcher] = None
+        self._watched: frozenset[Path] = frozenset()
+        self._components: List[Component] = []
+
+    def loader(self, repo_root: Path, excludes: Sequence[str]) -> ManifestLoader:
+        key = (repo_root, tuple(excludes))
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = self._loaders[key] = ManifestLoader(repo_root, self.fs, excludes)
+        return loader
+
+    def plan_cache(self, state_dir: Path, key: Sequence[str]) -> PlanCache:
+        cache_key = (state_dir, tuple(key))
+        cache = self._plan_caches.get(cache_key)
+        if cache is None:
+            cache = self._plan_caches[cache_key] = PlanCache(state_dir, key)
+        return cache
+
+    def orchestrator(self, config: OrchestratorConfig) -> Orchestrator:
+        key = dataclasses.astuple(config)
+        orchestrator = self._orchestrators.get(key)
+        if orchestrator is None:
+            orchestrator = self._orchestrators[key] = Orchestrator(config, self.fs)
+        return orchestrator
+
+    def track(self, components: Iterable[Component], ignored: IgnorePredicate) -> None:
+        """Watches ``components`` for changes made after this call."""
+        if not self._track_changes:
+            return
+        self._components = list(components)
+        roots = frozenset(Path(component.path).absolute() for component in self._components)
+        if roots == self._watched and self._watcher is not None:
+            return
+        self.close()
+        try:
+            self._watcher = open_watcher(roots, ignored)
+            self._watched = roots
+        except OSError:
+            self._watcher = None
+        # Lo que cambió antes de empezar a observar no generará eventos.
+        self.fs.clear()
+
+    def refresh(self) -> None:
+        """Forgets cached filesystem state for the components changed since the last call.
+
+        Changes elsewhere are ignored: the plan cache validates the manifest
+        inputs on its own and discovery starts from a clean index.  The
+        index counters restart so that they describe a single run.
+        """
+        if not self._track_changes:
+            return
+        self.fs.counters.clear()
+        if self._watcher is None:
+            self.fs.clear()
+            return
+        changed: Set[Path] = set()
+        while True:
+            burst = self._watcher.poll(0)
+            if not burst:
+                break
+            changed |= burst
+        owners = components_for_paths(self._components, changed)
+        for component in self._components:
+            if component.name in owners:
+                self.fs.invalidate(component.path)
+
+    def close(self) -> None:
+        """Stops watching; the session can still be used."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+        self._watched = frozenset()
+
+    def shutdown(self) -> None:
+        self.close()
+        for orchestrator in self._orchestrators.values():
+            orchestrator.shutdown()
+        self._orchestrators.clear()
+
+
+__all__ = ["Session"]
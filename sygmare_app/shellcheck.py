@@ -0,0 +1,269 @@
+"""Análisis con shellcheck por lotes, con caché de los scripts limpios."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .state import dump_json, load_json
+from .tools import resolve_command
+from .tracing import span
+
+# Archivos por invocación: acota la longitud de la línea de órdenes.
+MAX_BATCH = 200
+# Por debajo de este tamaño no compensa repartir un lote entre procesos.
+MIN_BATCH = 20
+# Archivos de configuración que shellcheck busca junto al script y en sus padres.
+_RC_NAMES = (".shellcheckrc", "shellcheckrc")
+
+
+@dataclass(frozen=True)
+class LintResult:
+    """Outcome for one script: clean, findings, or a shellcheck error."""
+
+    findings: Tuple[str, ...] = ()
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def clean(self) -> bool:
+        return not self.findings and self.error is None
+
+    def details(self) -> Optional[str]:
+        lines = [*self.findings, *([self.error] if self.error else [])]
+        return "\n".join(["shellcheck falló", *lines]) if lines else None
+
+
+def _format_finding(path: str, comment: dict) -> str:
+    return (
+        f"{path}:{comment.get('line', '?')}:{comment.get('column', '?')}: "
+        f"{comment.get('level', 'error')} SC{comment.get('code', '?')}: "
+        f"{comment.get('message', '')}"
+    )
+
+
+def _nearest_rc(directory: str) -> Optional[str]:
+    current = directory
+    while True:
+        for name in _RC_NAMES:
+            candidate = os.path.join(current, name)
+            if os.path.isfile(candidate):
+                return candidate
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _digest(path: str) -> Optional[str]:
+    """Hash of the script together with the ``.shellcheckrc`` that applies to it."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+        rc = _nearest_rc(os.path.dirname(path))
+        if rc is not None:
+            with open(rc, "rb") as handle:
+                digest.update(b"\0" + handle.read())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class ShellcheckLinter:
+    """Checks many scripts per ``shellcheck --format json`` call.
+
+    :meth:`prepare` lints a whole set of scripts in a few processes and keeps
+    the per-script results for :meth:`check`, which re-lints a script whose
+    content changed in between.  Scripts whose content hash
+    was clean before, with the same shellcheck binary and configuration, are
+    not checked again.  The last clean hash of each script persists in
+    ``shellcheck.json`` under ``state_dir``; linting a script again replaces
+    its entry, so runs over part of the scripts leave the others alone.
+    """
+
+    FILENAME = "shellcheck.json"
+
+    def __init__(self, state_dir: Path | None = None, jobs: int = 1) -> None:
+        self._path = state_dir / self.FILENAME if state_dir is not None else None
+        self._jobs = max(1, jobs)
+        self._results: Dict[str, Tuple[Optional[str], LintResult]] = {}
+        self._clean: Dict[str, str] = {}
+        self._tool: Optional[str] = None
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return resolve_command("shellcheck") is not None
+
+    async def prepare(
+        self, scripts: Iterable[Path], slots: Optional[asyncio.Semaphore] = None
+    ) -> None:
+        """Lints ``scripts`` up front, splitting them over up to ``jobs`` processes.
+
+        Each process holds one of ``slots``, if given, so that the batches
+        share the caller's limit on concurrent work.  Results left over from
+        a previous :meth:`prepare` are discarded and a new run starts.
+        """
+        self._results = {}
+        keys = list(dict.fromkeys(os.path.abspath(path) for path in scripts))
+        await self._lint(keys, slots)
+
+    async def check(self, script: Path) -> LintResult:
+        """Result for ``script``, linting it on its own if it was not prepared or changed."""
+        key = os.path.abspath(script)
+        prepared = self._results.pop(key, None)
+        if prepared is not None:
+            digest, result = prepared
+            if digest is not None and await asyncio.to_thread(_digest, key) == digest:
+                return result
+        await self._lint([key])
+        _, result = self._results.pop(key, (None, LintResult()))
+        return result
+
+    async def _lint(
+        self, scripts: List[str], slots: Optional[asyncio.Semaphore] = None
+    ) -> None:
+        if not scripts or not self.available():
+            return
+        self._load()
+        digests = await asyncio.to_thread(lambda: {key: _digest(key) for key in scripts})
+        to_check: List[str] = []
+        for key in scripts:
+            digest = digests[key]
+            if digest is not None and self._clean.get(key) == digest:
+                self._results[key] = (digest, LintResult(cached=True))
+            else:
+                to_check.append(key)
+        if not to_check:
+            return
+
+        with span("shellcheck_batch", "builder", files=len(to_check)):
+            batches = self._split(to_check)
+            outcomes = await asyncio.gather(*(self._run_in(slots, batch) for batch in batches))
+        for outcome in outcomes:
+            for key, result in outcome.items():
+                digest = digests.get(key)
+                self._results[key] = (digest, result)
+                with self._lock:
+                    if result.clean and digest is not None:
+                        self._dirty |= self._clean.get(key) != digest
+                        self._clean[key] = digest
+                    elif self._clean.pop(key, None) is not None:
+                        self._dirty = True
+
+    def save(self) -> None:
+        if self._path is None or not self._dirty:
+            return
+        with self._lock:
+            payload = {"tool": self._tool, "clean": dict(sorted(self._clean.items()))}
+            self._dirty = False
+        try:
+            dump_json(self._path, payload)
+        except OSError:
+            pass
+
+    def _load(self) -> None:
+        tool = self._tool_key()
+        if self._loaded and tool == self._tool:
+            return
+        self._loaded = True
+        self._tool = tool
+        data = load_json(self._path, {}) if self._path is not None else {}
+        # Otra versión de shellcheck puede encontrar problemas nuevos.
+        clean = data.get("clean") if data.get("tool") == tool else None
+        self._clean = dict(clean) if isinstance(clean, dict) else {}
+
+    @staticmethod
+    def _tool_key() -> Optional[str]:
+        """Identifies the shellcheck binary and the configuration shared by every script."""
+        resolved = resolve_command("shellcheck")
+        if resolved is None:
+            return None
+        try:
+            stat = os.stat(resolved)
+            binary = f"{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            binary = resolved
+        config = hashlib.sha256(os.environ.get("SHELLCHECK_OPTS", "").encode())
+        # Configuración de usuario, que se aplica cuando el script no tiene una propia.
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        user_files = (os.path.join(config_home, "shellcheckrc"), os.path.expanduser("~/.shellcheckrc"))
+        for rc in user_files:
+            try:
+                with open(rc, "rb") as handle:
+                    config.update(b"\0" + handle.read())
+            except OSError:
+                config.update(b"\0")
+        return f"{binary}:{config.hexdigest()[:16]}"
+
+    def _split(self, scripts: Sequence[str]) -> List[List[str]]:
+        processes = max(1, min(self._jobs, len(scripts) // MIN_BATCH or 1))
+        size = min(MAX_BATCH, -(-len(scripts) // processes))
+        return [list(scripts[start : start + size]) for start in range(0, len(scripts), size)]
+
+    async def _run_in(
+        self, slots: Optional[asyncio.Semaphore], batch: List[str]
+    ) -> Dict[str, LintResult]:
+        if slots is None:
+            return await self._run(batch)
+        async with slots:
+            return await self._run(batch)
+
+    async def _run(self, batch: List[str]) -> Dict[str, LintResult]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "shellcheck",
+                "--format",
+                "json",
+                *batch,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate()
+        except OSError as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            return {key: LintResult(error=error) for key in batch}
+
+        # 0: sin hallazgos; 1: hay hallazgos. Cualquier otro código es un error.
+        try:
+            comments = json.loads(stdout or b"[]") if process.returncode in (0, 1) else None
+        except ValueError:
+            comments = None
+        if not isinstance(comments, list):
+            if len(batch) > 1:
+                return await self._run_each(batch)
+            message = stderr.decode("utf-8", errors="replace").strip()
+            error = message or f"shellcheck terminó con código {process.returncode}"
+            return {key: LintResult(error=error) for key in batch}
+
+        findings: Dict[str, List[str]] = {key: [] for key in batch}
+        for comment in comments:
+            key = comment.get("file") if isinstance(comment, dict) else None
+            if key in findings:
+                findings[key].append(_format_finding(key, comment))
+        if process.returncode == 1 and not any(findings.values()):
+            if len(batch) > 1:
+                return await self._run_each(batch)
+            # Hallazgos que no se pudieron atribuir: no se da nada por limpio.
+            error = "shellcheck informó hallazgos sin archivo reconocible"
+            return {key: LintResult(error=error) for key in batch}
+        return {key: LintResult(tuple(lines)) for key, lines in findings.items()}
+
+    async def _run_each(self, batch: List[str]) -> Dict[str, LintResult]:
+        # Un script problemático no debe hacer fallar al resto del lote.
+        results: Dict[str, LintResult] = {}
+        for key in batch:
+            results.update(await self._run([key]))
+        return results
+
+
+__all__ = ["LintResult", "ShellcheckLinter"]
@@ -0,0 +1,40 @@
+"""Utilidades para el directorio de estado local de Sygmare."""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+DEFAULT_STATE_DIRNAME = ".sygmare"
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes ``data`` to ``path`` through a temporary file and an atomic rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_json(path: Path, default: Any) -> Any:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def dump_json(path: Path, payload: Any) -> None:
+    write_atomic(path, json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
+
+
+__all__ = ["DEFAULT_STATE_DIRNAME", "dump_json", "load_json", "write_atomic"]
@@ -3,26 +3,32 @@ from enum import Enum
 
 class BuildStatus(str, Enum):
     BUILT = "built"
+    UP_TO_DATE = "up_to_date"
     SKIPPED = "skipped"
     MISSING = "missing"
     FAILED = "failed"
+    TIMED_OUT = "timed_out"
     QUALITY_FAILED = "quality_failed"
 
     def icon(self) -> str:
         return {
             BuildStatus.BUILT: "✔",
+            BuildStatus.UP_TO_DATE: "≡",
             BuildStatus.SKIPPED: "➖",
             BuildStatus.MISSING: "✖",
             BuildStatus.FAILED: "✖",
+            BuildStatus.TIMED_OUT: "⏱",
             BuildStatus.QUALITY_FAILED: "✖",
         }[self]
 
     def label(self) -> str:
         return {
             BuildStatus.BUILT: "Construido",
+            BuildStatus.UP_TO_DATE: "Sin cambios",
             BuildStatus.SKIPPED: "Omitido",
             BuildStatus.MISSING: "No encontrado",
             BuildStatus.FAILED: "Falló",
+            BuildStatus.TIMED_OUT: "Tiempo agotado",
             BuildStatus.QUALITY_FAILED: "Calidad fallida",
         }[self]
 
@@ -0,0 +1,28 @@
+"""Resolución de herramientas externas en el ``PATH``."""
+from __future__ import annotations
+
+import os
+import shutil
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def _which(command: str, search_path: Optional[str]) -> Optional[str]:
+    return shutil.which(command, path=search_path)
+
+
+def resolve_command(command: str) -> Optional[str]:
+    """``shutil.which`` memoized per ``PATH`` value.
+
+    A long-lived daemon resolves each tool once; call
+    :func:`forget_commands` after installing or removing tools.
+    """
+    return _which(command, os.environ.get("PATH"))
+
+
+def forget_commands() -> None:
+    _which.cache_clear()
+
+
+__all__ = ["forget_commands", "resolve_command"]
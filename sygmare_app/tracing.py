@@ -0,0 +1,117 @@
+"""Exportación de trazas en formato Chrome trace-event (Perfetto, chrome://tracing)."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: ContextVar[Optional["Tracer"]] = ContextVar("sygmare_tracer", default=None)
+_lane: ContextVar[Optional[int]] = ContextVar("sygmare_trace_lane", default=None)
+
+
+class Tracer:
+    """Collects complete ("X") events with microsecond timestamps."""
+
+    def __init__(self) -> None:
+        self._origin = perf_counter_ns()
+        self._events: List[Dict[str, Any]] = []
+        self._lanes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def now_us(self) -> float:
+        return (perf_counter_ns() - self._origin) / 1000
+
+    def add(self, name: str, category: str, start_us: float, args: Dict[str, Any]) -> None:
+        lane = _lane.get()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": max(0.0, self.now_us() - start_us),
+            "pid": self._pid,
+            "tid": lane if lane is not None else threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            if lane is None and event["tid"] not in self._lanes:
+                self._lanes[event["tid"]] = threading.current_thread().name
+
+    def name_lane(self, lane: int, name: str) -> None:
+        with self._lock:
+            self._lanes[lane] = name
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in sorted(self._lanes.items())
+            ]
+            events = sorted(self._events, key=lambda event: event["ts"])
+        process = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": self._pid,
+            "tid": 0,
+            "args": {"name": "sygmare"},
+        }
+        return {"traceEvents": [process, *metadata, *events], "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False))
+
+
+@contextmanager
+def activate(tracer: Optional[Tracer]) -> Iterator[None]:
+    token = _active.set(tracer)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def lane(lane_id: int) -> Iterator[None]:
+    """Attributes spans in the current context to worker ``lane_id``."""
+    tracer = _active.get()
+    if tracer is not None:
+        tracer.name_lane(lane_id, f"worker-{lane_id}")
+    token = _lane.set(lane_id)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+@contextmanager
+def span(name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+    """Records a span on the active tracer; a no-op when tracing is off.
+
+    The yielded dict can be updated with arguments known only at the end.
+    """
+    tracer = _active.get()
+    if tracer is None:
+        yield args
+        return
+    started = tracer.now_us()
+    try:
+        yield args
+    finally:
+        tracer.add(name, category, started, args)
+
+
+__all__ = ["Tracer", "activate", "lane", "span"]
@@ -0,0 +1,43 @@
+"""Consultas a git para seleccionar componentes afectados."""
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import List
+
+from .executors import command_exists
+from .models import BuildError
+
+
+def _git(args: List[str], cwd: Path) -> str:
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+    except OSError as exc:
+        raise BuildError(f"No se pudo ejecutar git: {exc}") from exc
+    if completed.returncode != 0:
+        message = completed.stderr.strip() or f"código {completed.returncode}"
+        raise BuildError(f"git {' '.join(args)} falló: {message}")
+    return completed.stdout
+
+
+def changed_files(ref: str, cwd: Path) -> List[Path]:
+    """Absolute paths that differ between ``ref`` and the working tree.
+
+    Renames are reported as a deletion plus an addition so both the old and
+    the new owner are considered affected.
+    """
+    if not command_exists("git"):
+        raise BuildError("git no está disponible en el PATH.")
+    toplevel = Path(_git(["rev-parse", "--show-toplevel"], cwd).strip())
+    output = _git(["diff", "--name-only", "--no-renames", "-z", ref, "--"], toplevel)
+    return [toplevel / name for name in output.split("\0") if name]
+
+
+__all__ = ["changed_files"]
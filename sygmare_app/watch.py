@@ -0,0 +1,310 @@
+"""Observación de cambios en disco para el modo ``--watch``."""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from stat import S_ISDIR
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .ignore import DEFAULT_EXCLUDES, IgnoreRules
+
+# Recibe la ruta y si es un directorio; devuelve True si debe ignorarse.
+IgnorePredicate = Callable[[Path, bool], bool]
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.5
+
+_DEFAULT_NAMES = frozenset(pattern.rstrip("/") for pattern in DEFAULT_EXCLUDES)
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+def _default_ignored(path: Path, is_dir: bool) -> bool:
+    return is_dir and path.name in _DEFAULT_NAMES
+
+
+def ignore_predicate(rules: IgnoreRules, excluded: Iterable[Path] = ()) -> IgnorePredicate:
+    """Combines ignore ``rules`` with paths that must never trigger a rebuild.
+
+    ``excluded`` holds the state and log directories: writing to them is a
+    side effect of the build itself.
+    """
+    skipped = [Path(os.path.abspath(path)) for path in excluded]
+
+    def ignored(path: Path, is_dir: bool) -> bool:
+        if any(path == skip or skip in path.parents for skip in skipped):
+            return True
+        return _default_ignored(path, is_dir) or rules.matches(path, is_dir=is_dir)
+
+    return ignored
+
+
+def _collapse(roots: Iterable[Path]) -> List[Path]:
+    """Absolute roots without those already contained in another root."""
+    result: List[Path] = []
+    for root in sorted({Path(os.path.abspath(root)) for root in roots}):
+        if not any(kept in root.parents for kept in result if kept.is_dir()):
+            result.append(root)
+    return result
+
+
+Signature = Tuple[int, int]
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    """``(mtime_ns, size)`` of a file, ``None`` for directories and missing paths."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return None if S_ISDIR(stat.st_mode) else (stat.st_mtime_ns, stat.st_size)
+
+
+def signatures(
+    roots: Iterable[Path], ignored: IgnorePredicate = _default_ignored
+) -> Dict[str, Signature]:
+    """``(mtime_ns, size)`` of every non-ignored file under ``roots``."""
+    snapshot: Dict[str, Signature] = {}
+    for root in _collapse(roots):
+        try:
+            stat = os.stat(root)
+        except OSError:
+            continue
+        if not os.path.isdir(root):
+            snapshot[str(root)] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        stack = [str(root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if ignored(Path(entry.path), is_dir):
+                            continue
+                        if is_dir:
+                            stack.append(entry.path)
+                            continue
+                        try:
+                            entry_stat = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[entry.path] = (entry_stat.st_mtime_ns, entry_stat.st_size)
+            except OSError:
+                continue
+    return snapshot
+
+
+class PollingWatcher:
+    """Detects changes by comparing ``(mtime_ns, size)`` snapshots of the roots."""
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        ignored: IgnorePredicate = _default_ignored,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        self._roots = _collapse(roots)
+        self._ignored = ignored
+        self._interval = interval
+        self._snapshot = signatures(self._roots, self._ignored)
+
+    def poll(self, timeout: float) -> Set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            current = signatures(self._roots, self._ignored)
+            changed = {
+                Path(path)
+                for path in current.keys() | self._snapshot.keys()
+                if current.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = current
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self._interval, remaining))
+
+    def close(self) -> None:
+        self._snapshot = {}
+
+
+class InotifyWatcher:
+    """Linux ``inotify`` watcher, accessed through ``ctypes``.
+
+    Every non-ignored directory under the roots gets its own watch; new
+    directories are added as they appear.  File roots are watched through
+    their parent directory.
+    """
+
+    def __init__(self, roots: Iterable[Path], ignored: IgnorePredicate = _default_ignored) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._fd = fd
+        self._ignored = ignored
+        self._watches: Dict[int, Path] = {}
+        self._roots = _collapse(roots)
+        self._files = {root for root in self._roots if not root.is_dir()}
+        for root in self._roots:
+            if root in self._files:
+                self._watch(root.parent)
+            else:
+                self._watch_tree(root)
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == 28:  # ENOSPC: se agotó fs.inotify.max_user_watches
+                raise OSError(error, "inotify_add_watch", str(directory))
+            return
+        self._watches[wd] = directory
+
+    def _watch_tree(self, root: Path) -> None:
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            self._watch(current)
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        path = Path(entry.path)
+                        if entry.is_dir(follow_symlinks=False) and not self._ignored(path, True):
+                            stack.append(path)
+            except OSError:
+                continue
+
+    def _relevant(self, path: Path) -> bool:
+        if path in self._files:
+            return True
+        return any(
+            root == path or root in path.parents for root in self._roots if root not in self._files
+        )
+
+    def poll(self, timeout: float) -> Set[Path]:
+        changed: Set[Path] = set()
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return changed
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                # Se perdieron eventos: se consideran modificadas todas las raíces.
+                changed.update(self._roots)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            path = directory / os.fsdecode(raw_name) if raw_name else directory
+            is_dir = bool(mask & _IN_ISDIR)
+            if self._ignored(path, is_dir) or not self._relevant(path):
+                continue
+            if is_dir and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+Watcher = PollingWatcher | InotifyWatcher
+
+
+def open_watcher(
+    roots: Iterable[Path], ignored: IgnorePredicate = _default_ignored, *, polling: bool = False
+) -> Watcher:
+    """Returns an inotify watcher on Linux, or a stat-polling one elsewhere."""
+    roots = list(roots)
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, ignored)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, ignored)
+
+
+def changes_since(watcher: Watcher, before: Dict[str, Signature]) -> List[Path]:
+    """Pending changes on ``watcher`` whose file differs from its signature in ``before``.
+
+    Taking ``before`` right before a build tells the build's own side effects
+    (a ``chmod``, a temporary file created and removed) apart from edits saved
+    while it ran.  Everything pending is consumed either way.
+    """
+    pending: Set[Path] = set()
+    while True:
+        burst = watcher.poll(0)
+        if not burst:
+            break
+        pending |= burst
+    return sorted(path for path in pending if _signature(path) != before.get(str(path)))
+
+
+def wait_for_changes(watcher: Watcher, debounce: float = DEFAULT_DEBOUNCE) -> List[Path]:
+    """Blocks until something changes, then until ``debounce`` seconds pass quietly."""
+    changed: Set[Path] = set()
+    while not changed:
+        changed = watcher.poll(3600)
+    while True:
+        burst = watcher.poll(debounce)
+        if not burst:
+            return sorted(changed)
+        changed |= burst
+
+
+__all__ = [
+    "DEFAULT_DEBOUNCE",
+    "InotifyWatcher",
+    "PollingWatcher",
+    "Signature",
+    "Watcher",
+    "changes_since",
+    "ignore_predicate",
+    "open_watcher",
+    "signatures",
+    "wait_for_changes",
+]
@@ -0,0 +1,263 @@
+"""Proceso worker que ejecuta builds enviados por un coordinador remoto."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import os
+import secrets
+import signal
+import socket
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable, Optional, Set
+
+from .console import LineForwarder, captured_output, routed_stdout
+from .executors import DEFAULT_TAIL_LINES, PYTHON_MODES, CommandResult
+from .models import Component
+from .orchestrator import AsyncOrchestrator, OrchestratorConfig
+from .remote import (
+    CONNECT_TIMEOUT,
+    HEARTBEAT_INTERVAL,
+    SECRET_ENV,
+    Address,
+    component_from_payload,
+    encode,
+    load_secret,
+    receive,
+    sign,
+)
+from .state import DEFAULT_STATE_DIRNAME
+from .statuses import BuildStatus
+
+
+class _Channel:
+    """Writes messages on the event loop thread, in the order they were sent.
+
+    Builders may print from worker threads (``asyncio.to_thread``), so every
+    write is scheduled with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+        self._loop = asyncio.get_running_loop()
+
+    def send(self, message: dict) -> None:
+        data = encode(message)
+        self._loop.call_soon_threadsafe(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        if not self._writer.is_closing():
+            self._writer.write(data)
+
+
+class WorkerServer:
+    """Serves build requests with the local builder registry.
+
+    Up to ``slots`` builds run at the same time per worker, across all
+    connections; the coordinator learns the number from the initial
+    ``hello`` message.  With a ``secret`` the hello carries a challenge and
+    nothing is accepted until the peer answers it with :func:`sign`.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        config: OrchestratorConfig,
+        slots: int,
+        secret: Optional[str] = None,
+    ) -> None:
+        self._address = address
+        self._config = config
+        self._slots = slots
+        self._secret = secret
+        self._semaphore = asyncio.Semaphore(slots)
+        self._orchestrator = AsyncOrchestrator(config)
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def serve_forever(self) -> None:
+        if self._address.path and os.path.exists(self._address.path):
+            # Socket huérfano de un worker anterior que no terminó limpiamente.
+            os.unlink(self._address.path)
+        server = await self._address.serve(self._handle)
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, server.close)
+        print(f"Worker {self._name} escuchando en {self._address} ({self._slots} slot(s)).")
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._orchestrator.shutdown()
+            if self._address.path:
+                try:
+                    os.unlink(self._address.path)
+                except OSError:
+                    pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channel = _Channel(writer)
+        hello = {"type": "hello", "name": self._name, "slots": self._slots}
+        challenge = secrets.token_hex(16) if self._secret is not None else None
+        if challenge is not None:
+            hello["challenge"] = challenge
+        channel.send(hello)
+        if challenge is not None and not await self._authenticate(reader, channel, challenge):
+            print("✖ Conexión rechazada: autenticación inválida.", file=sys.stderr)
+            writer.close()
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(channel))
+        tasks: Set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                try:
+                    message = await receive(reader)
+                except (OSError, ValueError):
+                    break
+                if message is None:
+                    break
+                if message.get("type") == "build":
+                    task = asyncio.create_task(self._build(channel, message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            heartbeat.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(heartbeat, *tasks, return_exceptions=True)
+            writer.close()
+
+    async def _authenticate(
+        self, reader: asyncio.StreamReader, channel: _Channel, challenge: str
+    ) -> bool:
+        assert self._secret is not None
+        try:
+            message = await asyncio.wait_for(receive(reader), CONNECT_TIMEOUT)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return False
+        if not isinstance(message, dict) or message.get("type") != "auth":
+            return False
+        digest = str(message.get("digest", ""))
+        if not hmac.compare_digest(digest, sign(self._secret, challenge)):
+            channel.send({"type": "error", "message": "autenticación inválida"})
+            return False
+        channel.send({"type": "welcome"})
+        return True
+
+    async def _heartbeat(self, channel: _Channel) -> None:
+        while True:
+            channel.send({"type": "heartbeat"})
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def _build(self, channel: _Channel, message: dict) -> None:
+        request_id = message["id"]
+        component: Component = component_from_payload(message["component"])
+        forwarder = LineForwarder(
+            lambda text: channel.send({"type": "output", "id": request_id, "text": text})
+        )
+        # Los slots anunciados se respetan aquí aunque el coordinador envíe más.
+        async with self._semaphore:
+            started = perf_counter()
+            # El worker vive más que una ejecución: lo cacheado del componente
+            # puede haber cambiado desde el build anterior.
+            self._orchestrator.fs.invalidate(component.path)
+            with captured_output(forwarder):
+                try:
+                    result = await self._orchestrator.execute(
+                        component, dry_run=bool(message.get("dry_run"))
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    print(f"  ✖ Error en el worker: {exc}")
+                    result = CommandResult(BuildStatus.FAILED, str(exc))
+            forwarder.flush()
+            self._orchestrator.save_index()
+        duration = result.duration if result.duration is not None else perf_counter() - started
+        channel.send(
+            {
+                "type": "result",
+                "id": request_id,
+                "status": result.status.value,
+                "details": result.details,
+                "duration": duration,
+            }
+        )
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m sygmare_app worker",
+        description="Ejecuta builds enviados por un coordinador de Sygmare.",
+    )
+    parser.add_argument(
+        "--listen",
+        required=True,
+        metavar="DIRECCIÓN",
+        help="Dirección donde escuchar: host:puerto, :puerto o unix:/ruta/al/socket.",
+    )
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=None,
+        help="Builds simultáneos que acepta este worker (por defecto, el número de CPUs).",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=None,
+        help=f"Directorio de estado local (por defecto {DEFAULT_STATE_DIRNAME} en el directorio actual).",
+    )
+    parser.add_argument(
+        "--secret-file",
+        type=Path,
+        default=None,
+        metavar="ARCHIVO",
+        help=(
+            f"Secreto compartido con los coordinadores (por defecto, ${SECRET_ENV}). "
+            "Obligatorio para escuchar en direcciones que no sean locales."
+        ),
+    )
+    parser.add_argument("--python-mode", choices=PYTHON_MODES, default="pool")
+    parser.add_argument("--log-dir", type=Path, default=None)
+    parser.add_argument("--tail-lines", type=int, default=DEFAULT_TAIL_LINES)
+    parser.add_argument("--no-node-cache", action="store_true")
+    return parser
+
+
+def run_worker(argv: Optional[Iterable[str]] = None) -> int:
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    try:
+        address = Address.parse(args.listen)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        secret = load_secret(args.secret_file)
+    except OSError as exc:
+        parser.error(f"No se pudo leer {args.secret_file}: {exc}")
+    # Quien se conecta puede ejecutar comandos: fuera de este host, solo con secreto.
+    if secret is None and not address.is_local:
+        parser.error(
+            f"Escuchar en {address} sin secreto permitiría ejecutar comandos a cualquiera "
+            f"que alcance la dirección; use --secret-file o ${SECRET_ENV}."
+        )
+    slots = max(1, args.slots or os.cpu_count() or 1)
+    config = OrchestratorConfig(
+        jobs=slots,
+        state_dir=args.state_dir or Path.cwd() / DEFAULT_STATE_DIRNAME,
+        python_mode=args.python_mode,
+        log_dir=args.log_dir,
+        tail_lines=args.tail_lines,
+        node_cache=not args.no_node_cache,
+    )
+    server = WorkerServer(address, config, slots, secret)
+    with routed_stdout():
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+__all__ = ["WorkerServer", "run_worker"]
@@ -10,11 +10,7 @@ calidad y ejecución resiliente de comandos.
 
 from __future__ import annotations
 
-from sygmare_app.cli import run_cli
-
-
-def main() -> int:
-    return run_cli()
+from sygmare_app.client import main
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import json
+import subprocess
+
+import pytest
+
+from sygmare_app import cli
+from sygmare_app.cli import build_argument_parser, run_cli
+from sygmare_app.watch import wait_for_changes
+
+# lib <- app <- tool; other es independiente.
+MANIFEST = [
+    {"name": "lib", "path": "lib", "kind": "python"},
+    {"name": "app", "path": "app", "kind": "python", "dependencies": ["lib"]},
+    {"name": "tool", "path": "tool", "kind": "python", "dependencies": ["app"]},
+    {"name": "other", "path": "other", "kind": "python"},
+]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for component in MANIFEST:
+        (tmp_path / component["path"]).mkdir()
+        (tmp_path / component["path"] / "module.py").write_text("VALUE = 1\n")
+    (tmp_path / "manifest.json").write_text(json.dumps(MANIFEST))
+    return tmp_path
+
+
+def _planned(repo, capsys, *argv):
+    capsys.readouterr()
+    options = ["--manifest", str(repo / "manifest.json"), "--state-dir", str(repo / "state")]
+    # Un solo trabajo: el orden de la salida es el del plan.
+    code = run_cli([*options, "--dry-run", "--no-history", "--jobs", "1", *argv], use_daemon=False)
+    assert code == 0
+    output = capsys.readouterr().out
+    return [line[2:] for line in output.splitlines() if line.startswith("▶ ")]
+
+
+@pytest.mark.parametrize("option", ["--cpu-budget", "--memory-budget"])
+@pytest.mark.parametrize("value", ["0", "-2"])
+def test_budgets_must_be_positive(option, value):
+    with pytest.raises(SystemExit):
+        build_argument_parser().parse_args([option, value])
+
+
+def test_budgets_accept_positive_values():
+    args = build_argument_parser().parse_args(["--cpu-budget", "1.5", "--memory-budget", "512"])
+    assert (args.cpu_budget, args.memory_budget) == (1.5, 512)
+
+
+@pytest.mark.parametrize("cache", [[], ["--no-plan-cache"]])
+def test_only_plans_targets_with_their_dependencies(repo, capsys, cache):
+    assert _planned(repo, capsys) == ["lib", "other", "app", "tool"]
+    assert _planned(repo, capsys, "--only", "app", *cache) == ["lib", "app"]
+    assert _planned(repo, capsys, "--only", "tool", "--only", "oth", *cache) == [
+        "lib",
+        "other",
+        "app",
+        "tool",
+    ]
+
+
+@pytest.fixture
+def git_repo(repo):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("add", "manifest.json", "lib", "app", "tool", "other")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", "base")
+    return repo
+
+
+def test_since_selects_changed_components_and_their_dependents(git_repo, capsys):
+    assert _planned(git_repo, capsys, "--since", "HEAD") == []
+
+    (git_repo / "app" / "module.py").write_text("VALUE = 2\n")
+    assert _planned(git_repo, capsys, "--since", "HEAD") == ["app", "tool"]
+    # Combinado con --only, solo cuenta lo que está en el cierre de los objetivos.
+    assert _planned(git_repo, capsys, "--since", "HEAD", "--only", "app") == ["app"]
+    assert _planned(git_repo, capsys, "--since", "HEAD", "--only", "other") == []
+
+    (git_repo / "lib" / "module.py").write_text("VALUE = 3\n")
+    assert _planned(git_repo, capsys, "--since", "HEAD") == ["lib", "app", "tool"]
+
+
+def test_since_rebuilds_everything_when_the_manifest_changes(git_repo, capsys):
+    manifest = git_repo / "manifest.json"
+    manifest.write_text(manifest.read_text() + "\n")
+    assert _planned(git_repo, capsys, "--since", "HEAD") == ["lib", "other", "app", "tool"]
+
+
+def test_since_rejects_unknown_refs(git_repo, capsys):
+    with pytest.raises(SystemExit):
+        _planned(git_repo, capsys, "--since", "no-such-ref")
+
+
+@pytest.mark.parametrize("polling", [[], ["--watch-polling"]])
+def test_watch_rebuilds_edits_saved_during_a_build(repo, monkeypatch, polling):
+    builds = []
+    waits = []
+    open_watcher = cli.open_watcher
+
+    def opened(*args, **kwargs):
+        watcher = open_watcher(*args, **kwargs)
+        (repo / "app" / "module.py").write_text("VALUE = 20\n")
+        return watcher
+
+    def wait(watcher, debounce):
+        waits.append(debounce)
+        if len(waits) > 1:
+            raise KeyboardInterrupt
+        return wait_for_changes(watcher, debounce)
+
+    def build(args, orchestrator, plan, history, known=None):
+        builds.append([component.name for component in plan])
+        if len(builds) == 2:
+            # El build toca sus propios archivos y el usuario guarda otro.
+            (repo / "tool" / "module.py").chmod(0o755)
+            (repo / "other" / "module.py").write_text("VALUE = 30\n")
+        return 0
+
+    monkeypatch.setattr(cli, "open_watcher", opened)
+    monkeypatch.setattr(cli, "wait_for_changes", wait)
+    monkeypatch.setattr(cli, "_build_and_report", build)
+    options = ["--manifest", str(repo / "manifest.json"), "--state-dir", str(repo / "state")]
+    code = run_cli([*options, "--no-history", "--watch", *polling], use_daemon=False)
+
+    assert code == 0
+    assert builds == [["lib", "other", "app", "tool"], ["app", "tool"], ["other"]]
@@ -0,0 +1,81 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+
+from sygmare_app.compilation import BytecodeIndex, PythonCompileEngine, _pool_context
+
+
+def test_pool_does_not_fork():
+    assert _pool_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_pool_starts_while_other_threads_spawn_processes(tmp_path):
+    files = []
+    for index in range(20):
+        path = tmp_path / f"m{index}.py"
+        path.write_text(f"value = {index}\n")
+        files.append(path)
+    stop = threading.Event()
+
+    def spawn() -> None:
+        while not stop.is_set():
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+    spawners = [threading.Thread(target=spawn) for _ in range(4)]
+    for thread in spawners:
+        thread.start()
+    engine = PythonCompileEngine(4)
+    results = []
+    compiler = threading.Thread(target=lambda: results.extend(engine.compile(files)))
+    try:
+        compiler.start()
+        compiler.join(60)
+        assert not compiler.is_alive(), "el pool de compilación se quedó bloqueado"
+    finally:
+        stop.set()
+        for thread in spawners:
+            thread.join()
+        engine.shutdown()
+    assert [result.ok for result in results] == [True] * len(files)
+
+
+def _compile_stale(state_dir, engine, files):
+    index = BytecodeIndex(state_dir)
+    stale, reused, pending = index.partition(files)
+    index.update(engine.compile(stale), pending)
+    index.save()
+    return sorted(path.name for path in stale), reused
+
+
+def test_only_changed_sources_are_recompiled(tmp_path):
+    state = tmp_path / "state"
+    files = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.py"
+        path.write_text(f"{name} = 1\n")
+        files.append(path)
+    a, b, c = files
+    engine = PythonCompileEngine(2)
+    try:
+        assert _compile_stale(state, engine, files) == (["a.py", "b.py", "c.py"], 0)
+        assert _compile_stale(state, engine, files) == ([], 3)
+
+        b.write_text("b = 2  # cambio\n")
+        assert _compile_stale(state, engine, files) == (["b.py"], 2)
+
+        # Solo cambia el mtime (p. ej. un checkout nuevo): el hash evita recompilar.
+        stat = c.stat()
+        os.utime(c, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert _compile_stale(state, engine, files) == ([], 3)
+
+        os.unlink(importlib.util.cache_from_source(str(a)))
+        assert _compile_stale(state, engine, files) == (["a.py"], 2)
+
+        # Un archivo con errores no entra en el índice y se reintenta.
+        b.write_text("def broken(:\n")
+        assert _compile_stale(state, engine, files) == (["b.py"], 2)
+        assert _compile_stale(state, engine, files) == (["b.py"], 2)
+    finally:
+        engine.shutdown()
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from sygmare_app.critical_path import analyze_critical_path
+from sygmare_app.models import BuildKind, BuildRecord, Component
+from sygmare_app.statuses import BuildStatus
+
+
+def _record(name, duration, *deps):
+    component = Component(name, Path(name), BuildKind.PYTHON, dependencies=deps)
+    return BuildRecord(component, BuildStatus.BUILT, duration=duration)
+
+
+def test_known_graph():
+    #   a(3) ─┬─ b(2) ─┬─ d(1)        e(4)
+    #         └─ c(5) ─┘
+    analysis = analyze_critical_path(
+        [
+            _record("d", 1.0, "b", "c"),
+            _record("b", 2.0, "a"),
+            _record("c", 5.0, "a"),
+            _record("a", 3.0, "fuera-del-plan"),
+            _record("e", 4.0),
+        ]
+    )
+    assert analysis.critical_path == ["a", "c", "d"]
+    assert analysis.minimum_wall_time == 9.0
+    assert analysis.total_work == 15.0
+    assert analysis.max_parallelism == pytest.approx(15.0 / 9.0)
+
+    nodes = {node.name: node for node in analysis.nodes}
+    assert {name: node.slack for name, node in nodes.items()} == {
+        "a": 0.0,
+        "b": 3.0,
+        "c": 0.0,
+        "d": 0.0,
+        "e": 5.0,
+    }
+    assert [name for name, node in nodes.items() if node.critical] == ["d", "c", "a"]
+    assert (nodes["b"].earliest_start, nodes["b"].latest_start) == (3.0, 6.0)
+    assert (nodes["d"].earliest_finish, nodes["d"].latest_finish) == (9.0, 9.0)
+
+
+def test_missing_durations_count_as_zero():
+    analysis = analyze_critical_path([_record("a", None), _record("b", 2.0, "a")])
+    assert analysis.critical_path == ["a", "b"]
+    assert analysis.minimum_wall_time == 2.0
+
+
+def test_empty_run():
+    analysis = analyze_critical_path([])
+    assert analysis.critical_path == []
+    assert analysis.minimum_wall_time == 0.0
+    assert analysis.max_parallelism == 1.0
@@ -0,0 +1,133 @@
+import asyncio
+import signal
+import sys
+import time
+
+from sygmare_app import executors
+from sygmare_app.executors import (
+    MAX_LINE_LENGTH,
+    TimedOutProcess,
+    _supervise,
+    failure_details,
+    run_command,
+)
+from sygmare_app.models import TimeoutSpec
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_only_the_tail_is_kept_and_the_log_is_complete(tmp_path, capsys):
+    log = tmp_path / "build.log"
+    result = run_command(
+        _python("import sys; [print(i) for i in range(5000)]; sys.exit(2)"),
+        cwd=None,
+        dry_run=False,
+        log_path=log,
+        tail_lines=3,
+    )
+    assert result.returncode == 2
+    assert result.stdout == "4997\n4998\n4999"
+    lines = log.read_text().splitlines()
+    assert lines[1:5001] == [str(i) for i in range(5000)]
+    assert lines[-1] == "[exit 2]"
+    assert failure_details(result, "falló") == "falló\n4997\n4998\n4999"
+
+
+def test_long_lines_are_split(tmp_path, capsys):
+    result = run_command(
+        _python(f"print('x' * {MAX_LINE_LENGTH * 2 + 10})"),
+        cwd=None,
+        dry_run=False,
+        tail_lines=10,
+    )
+    assert [len(line) for line in result.stdout.split("\n")] == [MAX_LINE_LENGTH] * 2 + [10]
+
+
+def test_zero_tail_keeps_nothing(capsys):
+    result = run_command(_python("print('hola')"), cwd=None, dry_run=False, tail_lines=0)
+    assert result.returncode == 0
+    assert result.stdout == ""
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            # Un zombi ya no corre aunque nadie lo haya recogido.
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _gone(pid, within=2.0):
+    deadline = time.monotonic() + within
+    while _alive(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_supervise_reports_the_limit_that_was_hit():
+    async def supervise(seconds, limits):
+        task = asyncio.ensure_future(asyncio.sleep(seconds, 0))
+        # Sin salida desde el arranque.
+        started = asyncio.get_running_loop().time()
+        try:
+            return await _supervise(task, limits, lambda: started)
+        finally:
+            task.cancel()
+
+    assert asyncio.run(supervise(0, None)) is None
+    assert asyncio.run(supervise(0, TimeoutSpec(5.0, 5.0))) is None
+    assert asyncio.run(supervise(5, TimeoutSpec(0.1))) == "superó el límite de 0.1s"
+    assert asyncio.run(supervise(5, TimeoutSpec(5.0, 0.1))) == "sin salida durante 0.1s"
+
+
+def test_idle_command_is_terminated(capsys):
+    started = time.monotonic()
+    result = run_command(
+        _python("import time; print('listo', flush=True); time.sleep(60)"),
+        cwd=None,
+        dry_run=False,
+        limits=TimeoutSpec(idle_timeout=1.0),
+    )
+    elapsed = time.monotonic() - started
+
+    assert isinstance(result, TimedOutProcess)
+    assert result.returncode == -signal.SIGTERM
+    assert result.reason == "sin salida durante 1s"
+    assert result.stdout == "listo"
+    assert 1.0 <= elapsed < 5.0
+
+
+def test_command_ignoring_sigterm_is_killed_after_the_grace_period(monkeypatch, capsys):
+    monkeypatch.setattr(executors, "KILL_GRACE_SECONDS", 0.5)
+    started = time.monotonic()
+    result = run_command(
+        ["sh", "-c", "trap '' TERM; while :; do sleep 0.1; done"],
+        cwd=None,
+        dry_run=False,
+        limits=TimeoutSpec(timeout=0.3),
+    )
+    elapsed = time.monotonic() - started
+
+    assert result.returncode == -signal.SIGKILL
+    assert result.reason == "superó el límite de 0.3s"
+    assert 0.8 <= elapsed < 3.0
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(executors, "KILL_GRACE_SECONDS", 0.5)
+    pid_file = tmp_path / "pid"
+    # El nieto ignora SIGTERM y sigue en el grupo cuando el líder ya salió.
+    result = run_command(
+        ["sh", "-c", f"(trap '' TERM; exec sleep 60) & echo $! > {pid_file}; wait"],
+        cwd=None,
+        dry_run=False,
+        limits=TimeoutSpec(timeout=0.5),
+    )
+
+    assert result.returncode == -signal.SIGTERM
+    assert _gone(int(pid_file.read_text()))
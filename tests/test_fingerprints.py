@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+from sygmare_app.fingerprints import FingerprintStore
+from sygmare_app.fsindex import FileSystemIndex
+from sygmare_app.models import BuildKind, Component
+from sygmare_app.orchestrator import Orchestrator, OrchestratorConfig
+from sygmare_app.statuses import BuildStatus
+
+
+def _component(tmp_path, name="lib"):
+    root = tmp_path / name
+    root.mkdir(exist_ok=True)
+    return Component(name, root, BuildKind.PYTHON)
+
+
+def _cached_files(state_dir):
+    return set(json.loads((state_dir / FingerprintStore.FILENAME).read_text())["files"])
+
+
+def _fingerprint(state_dir, *components, known=None):
+    store = FingerprintStore(state_dir, FileSystemIndex())
+    if known is not None:
+        store.forget(known)
+    for component in components:
+        store.record(component, store.compute(component, {}))
+    store.save()
+
+
+def _names(state_dir):
+    return {Path(path).relative_to(state_dir.parent).as_posix() for path in _cached_files(state_dir)}
+
+
+def test_save_prunes_only_the_scanned_components(tmp_path):
+    state = tmp_path / "state"
+    lib, app = _component(tmp_path, "lib"), _component(tmp_path, "app")
+    for name in ("a.py", "b.py"):
+        (lib.path / name).write_text("x = 1\n")
+    (app.path / "main.py").write_text("y = 1\n")
+    _fingerprint(state, lib, app)
+    assert _names(state) == {"lib/a.py", "lib/b.py", "app/main.py"}
+
+    (lib.path / "b.py").unlink()
+    _fingerprint(state, lib)
+    assert _names(state) == {"lib/a.py", "app/main.py"}
+    # Una ejecución parcial no expulsa a los componentes que no recorrió.
+    (app.path / "main.py").unlink()
+    _fingerprint(state, lib)
+    assert _names(state) == {"lib/a.py", "app/main.py"}
+
+
+def test_forgotten_components_leave_the_cache(tmp_path):
+    state = tmp_path / "state"
+    lib, app = _component(tmp_path, "lib"), _component(tmp_path, "app")
+    (lib.path / "a.py").write_text("x = 1\n")
+    (app.path / "main.py").write_text("y = 1\n")
+    _fingerprint(state, lib, app)
+
+    _fingerprint(state, lib, known=["lib"])
+    assert _names(state) == {"lib/a.py"}
+    store = FingerprintStore(state)
+    assert store.stored("app") is None and store.stored("lib") is not None
+
+
+def test_unchanged_components_are_skipped(tmp_path):
+    base = _component(tmp_path, "base")
+    (base.path / "base.py").write_text("VALUE = 1\n")
+    app = _component(tmp_path, "app")
+    (app.path / "app.py").write_text("import base\n")
+    app = Component("app", app.path, BuildKind.PYTHON, dependencies=("base",))
+
+    def build(**config):
+        config = OrchestratorConfig(state_dir=tmp_path / "state", jobs=2, **config)
+        orchestrator = Orchestrator(config)
+        try:
+            return [record.status for record in orchestrator.build([base, app])]
+        finally:
+            orchestrator.shutdown()
+
+    assert build() == [BuildStatus.BUILT, BuildStatus.BUILT]
+    assert build() == [BuildStatus.UP_TO_DATE, BuildStatus.UP_TO_DATE]
+    # Un cambio en la dependencia invalida también a quien depende de ella.
+    (base.path / "base.py").write_text("VALUE = 2\n")
+    assert build() == [BuildStatus.BUILT, BuildStatus.BUILT]
+    (app.path / "app.py").write_text("import base  # cambio\n")
+    assert build() == [BuildStatus.UP_TO_DATE, BuildStatus.BUILT]
+    assert build(force=True) == [BuildStatus.BUILT, BuildStatus.BUILT]
@@ -0,0 +1,23 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sygmare_app.fsindex import FileSystemIndex
+
+
+@pytest.mark.parametrize("relative", [".", "..", "sub/..", "sub/../..", "sub/."])
+def test_dot_paths_are_stat_ed_directly(tmp_path, monkeypatch, relative):
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path)
+    fs = FileSystemIndex()
+    assert fs.exists(Path(relative))
+    assert fs.is_dir(Path(relative))
+    assert not fs.is_file(Path(relative))
+    assert fs.stat(Path(relative)).st_ino == os.stat(relative).st_ino
+
+
+def test_missing_paths(tmp_path):
+    fs = FileSystemIndex()
+    assert not fs.exists(tmp_path / "missing")
+    assert fs.stat(tmp_path / "missing") is None
@@ -0,0 +1,36 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from sygmare_app.history import BuildHistory
+from sygmare_app.models import BuildKind, BuildRecord, Component
+from sygmare_app.statuses import BuildStatus
+
+APP = Component("app", Path("app"), BuildKind.PYTHON)
+LIB = Component("lib", Path("lib"), BuildKind.PYTHON)
+
+
+def _rows(state_dir, table):
+    connection = sqlite3.connect(state_dir / BuildHistory.FILENAME)
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_keeps_latest_rows_per_component_and_status(tmp_path):
+    history = BuildHistory(tmp_path, window=3, retention=5)
+    for duration in range(1, 9):
+        history.record(
+            [
+                BuildRecord(APP, BuildStatus.BUILT, duration=float(duration)),
+                BuildRecord(LIB, BuildStatus.UP_TO_DATE, duration=0.0),
+            ],
+            time.time(),
+        )
+    history.record([BuildRecord(LIB, BuildStatus.BUILT, duration=2.0)], time.time())
+
+    assert _rows(tmp_path, "builds") == 5 + 5 + 1
+    assert _rows(tmp_path, "runs") == 6
+    assert history.durations() == {"app": [6.0, 7.0, 8.0], "lib": [2.0]}
+    assert history.median_durations() == {"app": 7.0, "lib": 2.0}
@@ -0,0 +1,56 @@
+import os
+import time
+
+from sygmare_app.logarchive import LogArchive, run_logs
+
+
+def _write(archive, *commands):
+    run_log = archive.start_run()
+    for component, command, lines, exit_code in commands:
+        segment = run_log.open_segment(component, command)
+        for line in lines:
+            segment.write(line)
+        segment.close(exit_code)
+    run_log.close()
+    return run_log.directory
+
+
+def test_segments_are_read_back_individually(tmp_path, capsys):
+    archive = LogArchive(tmp_path / "logs")
+    run_dir = _write(
+        archive,
+        ("app", "make", [f"línea {i}" for i in range(1000)], 0),
+        ("lib", "npm ci", ["instalado"], 0),
+        ("app", "make test", ["FAIL"], 1),
+    )
+    segments = archive.segments(run_dir)
+    assert [(s.component, s.command, s.exit_code) for s in segments] == [
+        ("app", "make", 0),
+        ("lib", "npm ci", 0),
+        ("app", "make test", 1),
+    ]
+    # Los dos comandos de app comparten archivo, cada uno en su propio miembro gzip.
+    assert segments[0].file == segments[2].file != segments[1].file
+    assert segments[2].offset == segments[0].offset + segments[0].length
+    assert archive.read(run_dir, segments[2]) == "FAIL\n"
+    assert archive.read(run_dir, segments[0]).splitlines()[-1] == "línea 999"
+
+    assert archive.resolve("last") == run_dir
+    assert run_logs(["--state-dir", str(tmp_path), "last", "app", "--command", "2"]) == 0
+    assert capsys.readouterr().out == "$ make test\nFAIL\n[exit 1]\n"
+
+
+def test_prune_by_age_and_size(tmp_path):
+    archive = LogArchive(tmp_path / "logs")
+    runs = []
+    for _ in range(4):
+        runs.append(_write(archive, ("app", "make", [os.urandom(8).hex() * 4000], 0)))
+    old = time.time() - 30 * 86400
+    os.utime(runs[0], (old, old))
+
+    assert archive.prune(max_age_days=14, max_size_mb=1024) == 1
+    assert archive.runs() == runs[1:]
+
+    # Con un presupuesto diminuto solo sobrevive la ejecución protegida.
+    assert archive.prune(max_age_days=14, max_size_mb=0, keep=[runs[1].name]) == 2
+    assert archive.runs() == [runs[1]]
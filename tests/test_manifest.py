@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from sygmare_app.fsindex import FileSystemIndex
+from sygmare_app.manifest import ManifestLoader
+from sygmare_app.models import TimeoutSpec
+
+
+def _load(tmp_path, component):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps([{"name": "app", "path": "app", "kind": "shell", **component}]))
+    return ManifestLoader(tmp_path, FileSystemIndex()).load(manifest).components[0]
+
+
+def test_command_objects_carry_their_own_limits(tmp_path):
+    component = _load(
+        tmp_path,
+        {"commands": [["make"], {"command": ["make", "test"], "timeout": 30}], "idle_timeout": 5},
+    )
+    assert component.build_commands == (("make",), ("make", "test"))
+    assert component.command_timeouts == (None, TimeoutSpec(30.0, None))
+    assert component.timeouts == TimeoutSpec(None, 5.0)
+
+
+@pytest.mark.parametrize("entry", [{"timeout": 10}, {"command": []}, {"command": "make"}])
+def test_command_object_without_command_is_rejected(tmp_path, entry):
+    with pytest.raises(ValueError, match="app"):
+        _load(tmp_path, {"commands": [entry]})
+
+
+@pytest.mark.parametrize("value", [0, -1, True, "10"])
+@pytest.mark.parametrize("key", ["timeout", "idle_timeout"])
+def test_non_positive_limits_are_rejected(tmp_path, key, value):
+    with pytest.raises(ValueError, match="app"):
+        _load(tmp_path, {key: value})
+    with pytest.raises(ValueError, match="app"):
+        _load(tmp_path, {"commands": [{"command": ["make"], key: value}]})
+
+
+@pytest.mark.parametrize("cpu", ["NaN", "Infinity", "0", "-1"])
+def test_cpu_must_be_finite_and_positive(tmp_path, cpu):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(f'[{{"name": "app", "path": "app", "resources": {{"cpu": {cpu}}}}}]')
+    with pytest.raises(ValueError, match="app"):
+        ManifestLoader(tmp_path, FileSystemIndex()).load(manifest)
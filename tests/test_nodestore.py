@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from sygmare_app.executors import NodeBuilder, OutputPolicy
+from sygmare_app.fsindex import FileSystemIndex
+from sygmare_app.models import BuildKind, Component
+from sygmare_app.nodestore import NodeModulesStore
+from sygmare_app.statuses import BuildStatus
+
+FAKE_NPM = """#!/bin/sh
+case "$1" in
+  --version) echo "${FAKE_NPM_VERSION:-9.0.0}" ;;
+  ci|install)
+    echo "$1" >> "$NPM_CALLS"
+    mkdir -p node_modules/pkg
+    echo "module.exports = 1;" > node_modules/pkg/index.js
+    ;;
+  run) echo "build ok" ;;
+esac
+"""
+
+
+@pytest.fixture
+def fake_npm(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    npm = bin_dir / "npm"
+    npm.write_text(FAKE_NPM)
+    npm.chmod(0o755)
+    calls = tmp_path / "npm-calls"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("NPM_CALLS", str(calls))
+    return calls
+
+
+def _project(tmp_path, lockfile="{}"):
+    project = tmp_path / "app"
+    project.mkdir(exist_ok=True)
+    (project / "package.json").write_text('{"name": "app"}')
+    (project / "package-lock.json").write_text(lockfile)
+    return Component("app", project, BuildKind.NODE)
+
+
+def _build(store, component):
+    builder = NodeBuilder(OutputPolicy(), FileSystemIndex(), store)
+    return asyncio.run(builder.build_async(component, dry_run=False))
+
+
+def _installs(calls):
+    return calls.read_text().split() if calls.exists() else []
+
+
+def test_miss_then_hit_then_new_key(tmp_path, fake_npm, monkeypatch):
+    store = NodeModulesStore(tmp_path / "store")
+    component = _project(tmp_path)
+
+    assert _build(store, component).status is BuildStatus.BUILT
+    assert _installs(fake_npm) == ["ci"]
+    first_key = store.key(component.path)
+    assert (tmp_path / "store" / first_key / "node_modules" / "pkg" / "index.js").exists()
+
+    # Sin node_modules, se restaura desde el almacén sin instalar.
+    NodeModulesStore._discard(component.path / "node_modules")
+    assert _build(store, component).status is BuildStatus.BUILT
+    assert _installs(fake_npm) == ["ci"]
+    assert (component.path / "node_modules" / "pkg" / "index.js").exists()
+
+    (component.path / "package-lock.json").write_text('{"lockfileVersion": 3}')
+    assert store.key(component.path) != first_key
+    _build(store, component)
+    assert _installs(fake_npm) == ["ci", "ci"]
+
+    monkeypatch.setenv("FAKE_NPM_VERSION", "10.0.0")
+    upgraded = NodeModulesStore(tmp_path / "store")
+    assert upgraded.key(component.path) != store.key(component.path)
+
+
+def test_writes_in_project_do_not_reach_the_store(tmp_path, fake_npm):
+    store = NodeModulesStore(tmp_path / "store")
+    component = _project(tmp_path)
+    _build(store, component)
+    stored = tmp_path / "store" / store.key(component.path) / "node_modules" / "pkg" / "index.js"
+
+    # Un postinstall o un parche que reescribe el archivo en su sitio.
+    installed = component.path / "node_modules" / "pkg" / "index.js"
+    with installed.open("a") as handle:
+        handle.write("patched\n")
+    assert "patched" not in stored.read_text()
+
+    NodeModulesStore._discard(component.path / "node_modules")
+    _build(store, component)
+    with installed.open("a") as handle:
+        handle.write("patched\n")
+    assert "patched" not in stored.read_text()
+
+
+def test_prune_drops_stale_and_excess_entries(tmp_path):
+    root = tmp_path / "store"
+    now = time.time()
+    for position, name in enumerate(["old", "a", "b", "c"]):
+        entry = root / name / "node_modules"
+        entry.mkdir(parents=True)
+        age = 90 * 86400 if name == "old" else position
+        os.utime(root / name, (now - age, now - age))
+
+    removed = NodeModulesStore(root).prune(max_age_days=30, max_entries=2)
+
+    assert removed == 2
+    assert sorted(path.name for path in root.iterdir()) == ["a", "b"]
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+from sygmare_app.models import BuildError, BuildKind, Component, TimeoutSpec
+from sygmare_app.orchestrator import Orchestrator, OrchestratorConfig
+from sygmare_app.reporting import Totals, render_table
+from sygmare_app.statuses import BuildStatus
+
+SCRIPT = """#!/bin/sh
+echo "start $1" >> "$2"
+sleep "$3"
+echo "end $1" >> "$2"
+exit "$4"
+"""
+
+
+def _shell(
+    tmp_path: Path, name: str, *deps: str, seconds=0.2, exit_code=0, timeouts=None
+) -> Component:
+    script = tmp_path / f"{name}.sh"
+    script.write_text(SCRIPT)
+    command = ("sh", script.name, name, str(tmp_path / "events"), str(seconds), str(exit_code))
+    return Component(
+        name, script, BuildKind.SHELL, build_commands=(command,), dependencies=deps, timeouts=timeouts
+    )
+
+
+def _events(tmp_path: Path):
+    return (tmp_path / "events").read_text().splitlines()
+
+
+def _build(tmp_path: Path, plan, **config):
+    orchestrator = Orchestrator(OrchestratorConfig(state_dir=tmp_path / "state", **config))
+    try:
+        return orchestrator.build(plan)
+    finally:
+        orchestrator.shutdown()
+
+
+def test_components_start_after_their_dependencies(tmp_path):
+    plan = [
+        _shell(tmp_path, "base"),
+        _shell(tmp_path, "left", "base"),
+        _shell(tmp_path, "right", "base"),
+        _shell(tmp_path, "top", "left", "right"),
+    ]
+    records = _build(tmp_path, plan, jobs=4)
+
+    assert [record.status for record in records] == [BuildStatus.BUILT] * 4
+    events = _events(tmp_path)
+    for component in plan:
+        for dependency in component.dependencies:
+            assert events.index(f"end {dependency}") < events.index(f"start {component.name}")
+    # Las dos ramas independientes se solapan.
+    assert events.index("start right") < events.index("end left")
+    assert events.index("start left") < events.index("end right")
+
+
+def test_stop_on_failure_lets_running_builds_finish(tmp_path):
+    plan = [
+        _shell(tmp_path, "broken", seconds=0, exit_code=3),
+        _shell(tmp_path, "slow", seconds=0.5),
+        _shell(tmp_path, "pending"),
+        _shell(tmp_path, "child", "broken"),
+    ]
+    with pytest.raises(BuildError, match="broken"):
+        _build(tmp_path, plan, jobs=2, stop_on_failure=True)
+
+    events = _events(tmp_path)
+    assert "end slow" in events
+    assert not any(name in line for line in events for name in ("pending", "child"))
+
+
+def test_without_stop_on_failure_only_dependants_are_held_back(tmp_path):
+    plan = [
+        _shell(tmp_path, "broken", seconds=0, exit_code=3),
+        _shell(tmp_path, "other"),
+    ]
+    records = _build(tmp_path, plan, jobs=2)
+    assert [record.status for record in records] == [BuildStatus.FAILED, BuildStatus.BUILT]
+
+
+def test_component_timeout_cancels_the_build(tmp_path):
+    plan = [
+        _shell(tmp_path, "stuck", seconds=60, timeouts=TimeoutSpec(timeout=0.5)),
+        _shell(tmp_path, "other"),
+    ]
+    records = _build(tmp_path, plan, jobs=2)
+
+    assert [record.status for record in records] == [BuildStatus.TIMED_OUT, BuildStatus.BUILT]
+    stuck = records[0]
+    assert "0.5s" in stuck.details
+    assert 0.5 <= stuck.duration < 5.0
+    assert "end stuck" not in _events(tmp_path)
+
+    totals = Totals.from_records(records)
+    assert totals.timed_out_seconds == pytest.approx(stuck.duration)
+    assert f"Tiempo perdido por límites de tiempo: {stuck.duration:.2f}s" in render_table(records)
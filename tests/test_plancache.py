@@ -0,0 +1,75 @@
+import os
+
+from sygmare_app.models import BuildKind, Component, Manifest, TimeoutSpec
+from sygmare_app.plancache import PlanCache, component_to_tuple
+
+KEY = ("repo", "manifest.json")
+
+
+def _setup(tmp_path):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text('[{"name": "lib"}]')
+    source = tmp_path / "src"
+    source.mkdir()
+    lib = Component(
+        "lib",
+        source,
+        BuildKind.SHELL,
+        build_commands=(("make",),),
+        timeouts=TimeoutSpec(10.0, None),
+    )
+    app = Component("app", source, BuildKind.PYTHON, dependencies=("lib",))
+    manifest = Manifest([app, lib])
+    PlanCache(tmp_path / "state", KEY).store(manifest, [lib, app], [manifest_file, source])
+    return manifest_file, source, manifest
+
+
+def _load(tmp_path, key=KEY):
+    return PlanCache(tmp_path / "state", key).load()
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_round_trip(tmp_path):
+    _, _, manifest = _setup(tmp_path)
+    cached_manifest, plan = _load(tmp_path)
+    assert [component_to_tuple(c) for c in cached_manifest.components] == [
+        component_to_tuple(c) for c in manifest.components
+    ]
+    assert [component.name for component in plan] == ["lib", "app"]
+    assert _load(tmp_path, ("other", "manifest.json")) is None
+
+
+def test_edited_manifest_invalidates(tmp_path):
+    manifest_file, _, _ = _setup(tmp_path)
+    manifest_file.write_text('[{"name": "lib"}, {"name": "new"}]')
+    assert _load(tmp_path) is None
+
+
+def test_touched_but_identical_inputs_are_revalidated(tmp_path):
+    manifest_file, source, _ = _setup(tmp_path)
+    _bump_mtime(manifest_file)
+    (source / "__pycache__").mkdir()
+    assert _load(tmp_path) is not None
+    # La entrada se reescribió con los nuevos mtime.
+    state = tmp_path / "state" / PlanCache.FILENAME
+    before = state.stat().st_mtime_ns
+    assert _load(tmp_path) is not None
+    assert state.stat().st_mtime_ns == before
+
+
+def test_new_directory_entry_invalidates(tmp_path):
+    _, source, _ = _setup(tmp_path)
+    (source / "extra").mkdir()
+    assert _load(tmp_path) is None
+
+
+def test_warm_entry_notices_changes(tmp_path):
+    manifest_file, _, _ = _setup(tmp_path)
+    cache = PlanCache(tmp_path / "state", KEY)
+    assert cache.load() is not None
+    manifest_file.write_text("[]")
+    assert cache.load() is None
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import signal
+import stat
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from sygmare_app.models import BuildKind, Component
+from sygmare_app.orchestrator import AsyncOrchestrator, OrchestratorConfig
+from sygmare_app.remote import (
+    SECRET_ENV,
+    Address,
+    RemoteWorkers,
+    component_payload,
+    encode,
+    receive,
+)
+from sygmare_app.statuses import BuildStatus
+from sygmare_app.models import BuildError
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def workers(tmp_path):
+    started = []
+
+    def start(name, *extra, env=None):
+        sock = tmp_path / f"{name}.sock"
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "sygmare_app",
+                "worker",
+                "--listen",
+                f"unix:{sock}",
+                "--slots",
+                "1",
+                "--state-dir",
+                str(tmp_path / f"{name}-state"),
+                *extra,
+            ],
+            cwd=ROOT,
+            env={**os.environ, **(env or {})},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        started.append(process)
+        deadline = time.monotonic() + 15
+        while not sock.exists():
+            assert process.poll() is None, "el worker terminó al arrancar"
+            assert time.monotonic() < deadline, "el worker no creó su socket"
+            time.sleep(0.05)
+        return process, f"unix:{sock}"
+
+    yield start
+    for process in started:
+        if process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def _component(tmp_path, name, script):
+    path = tmp_path / f"{name}.sh"
+    path.write_text("#!/bin/sh\ntrue\n")
+    return Component(name, path, BuildKind.SHELL, (("sh", "-c", script),))
+
+
+def _build(tmp_path, addresses, plan, jobs):
+    config = OrchestratorConfig(
+        jobs=jobs, state_dir=tmp_path / "coordinator", workers=tuple(addresses)
+    )
+    return asyncio.run(AsyncOrchestrator(config).build(plan))
+
+
+def test_builds_are_distributed_and_output_reaches_coordinator(tmp_path, workers, capsys):
+    pids = {workers(name)[0].pid for name in ("w1", "w2", "w3")}
+    addresses = [f"unix:{tmp_path / name}.sock" for name in ("w1", "w2", "w3")]
+    plan = [
+        _component(tmp_path, f"c{i}", f"echo salida-c{i}; echo $PPID > pid-c{i}; sleep 1")
+        for i in range(3)
+    ]
+
+    records = _build(tmp_path, addresses, plan, jobs=3)
+
+    assert [record.status for record in records] == [BuildStatus.BUILT] * 3
+    used = {int((tmp_path / f"pid-c{i}").read_text()) for i in range(3)}
+    assert used == pids
+    out = capsys.readouterr().out
+    for i in range(3):
+        assert f"salida-c{i}" in out
+
+
+def test_build_of_dead_worker_is_reassigned(tmp_path, workers, capsys):
+    doomed, first = workers("w1")
+    survivor, second = workers("w2")
+    plan = [_component(tmp_path, f"c{i}", f"echo $PPID > pid-c{i}; sleep 1.5") for i in range(2)]
+    threading.Timer(0.7, doomed.kill).start()
+
+    records = _build(tmp_path, [first, second], plan, jobs=2)
+
+    assert [record.status for record in records] == [BuildStatus.BUILT] * 2
+    assert {int((tmp_path / f"pid-c{i}").read_text()) for i in range(2)} == {survivor.pid}
+    assert "reasignando" in capsys.readouterr().out
+
+
+def test_worker_enforces_its_slots(tmp_path, workers):
+    _, address = workers("w1")
+    plan = [_component(tmp_path, f"c{i}", "sleep 0.5") for i in range(2)]
+
+    async def scenario():
+        reader, writer = await Address.parse(address).connect()
+        assert (await receive(reader))["slots"] == 1
+        started = time.monotonic()
+        for request_id, component in enumerate(plan):
+            writer.write(
+                encode(
+                    {
+                        "type": "build",
+                        "id": request_id,
+                        "component": component_payload(component),
+                        "dry_run": False,
+                    }
+                )
+            )
+        await writer.drain()
+        results = 0
+        while results < 2:
+            message = await receive(reader)
+            results += message["type"] == "result"
+        writer.close()
+        return time.monotonic() - started
+
+    # Con un slot, el segundo build espera al primero.
+    assert asyncio.run(scenario()) >= 1.0
+
+
+def test_unix_socket_is_private(tmp_path, workers):
+    workers("w1")
+    assert stat.S_IMODE(os.stat(tmp_path / "w1.sock").st_mode) == 0o600
+
+
+def test_secret_is_required_when_configured(tmp_path, workers):
+    _, address = workers("w1", env={SECRET_ENV: "correcto"})
+
+    async def connect(secret):
+        remote = RemoteWorkers([address], secret=secret)
+        try:
+            await remote.start()
+        finally:
+            await remote.close()
+
+    with pytest.raises(BuildError):
+        asyncio.run(connect("incorrecto"))
+    with pytest.raises(BuildError):
+        asyncio.run(connect(None))
+    asyncio.run(connect("correcto"))
+
+
+def test_public_address_requires_secret(monkeypatch):
+    from sygmare_app.worker import run_worker
+
+    monkeypatch.delenv(SECRET_ENV, raising=False)
+    with pytest.raises(SystemExit) as excinfo:
+        run_worker(["--listen", "0.0.0.0:0"])
+    assert excinfo.value.code == 2
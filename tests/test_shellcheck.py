@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+from sygmare_app.shellcheck import ShellcheckLinter
+
+# Falso shellcheck: termina con código 3 si algún archivo del lote contiene
+# "CRASH" e informa un hallazgo por cada archivo que contiene "BAD".
+FAKE_SHELLCHECK = """#!{python}
+import json, os, sys
+files = sys.argv[3:]
+with open(os.environ["SHELLCHECK_CALLS"], "a") as log:
+    log.write(" ".join(os.path.basename(name) for name in files) + "\\n")
+contents = {{name: open(name).read() for name in files}}
+if any("CRASH" in text for text in contents.values()):
+    sys.stderr.write("internal error\\n")
+    sys.exit(3)
+comments = [
+    {{"file": name, "line": 1, "column": 1, "level": "warning", "code": 2086, "message": "bad"}}
+    for name, text in contents.items()
+    if "BAD" in text
+]
+print(json.dumps(comments))
+sys.exit(1 if comments else 0)
+"""
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "shellcheck"
+    fake.write_text(FAKE_SHELLCHECK.format(python=sys.executable))
+    fake.chmod(0o755)
+    log = tmp_path / "calls"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("SHELLCHECK_CALLS", str(log))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("SHELLCHECK_OPTS", raising=False)
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    return log
+
+
+def _scripts(directory, **contents):
+    directory.mkdir(exist_ok=True)
+    paths = {}
+    for name, text in contents.items():
+        paths[name] = directory / f"{name}.sh"
+        paths[name].write_text(f"#!/bin/sh\n{text}\n")
+    return paths
+
+
+def _results(linter, paths):
+    async def lint():
+        await linter.prepare(paths.values(), asyncio.Semaphore(2))
+        return {name: await linter.check(path) for name, path in paths.items()}
+
+    return asyncio.run(lint())
+
+
+def _invocations(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def test_failed_batch_is_rerun_per_file(tmp_path, calls):
+    paths = _scripts(tmp_path / "src", ok="echo ok", bad="echo BAD", crash="echo CRASH")
+    results = _results(ShellcheckLinter(tmp_path / "state"), paths)
+
+    assert results["ok"].clean
+    assert results["bad"].findings and results["bad"].error is None
+    assert results["crash"].error == "internal error"
+    assert _invocations(calls)[1:] == ["ok.sh", "bad.sh", "crash.sh"]
+
+
+def test_clean_cache_depends_on_configuration(tmp_path, calls, monkeypatch):
+    state = tmp_path / "state"
+    paths = _scripts(tmp_path / "src", one="echo 1", two="echo 2")
+
+    def run():
+        linter = ShellcheckLinter(state)
+        results = _results(linter, paths)
+        linter.save()
+        return results
+
+    assert all(result.clean and not result.cached for result in run().values())
+    assert all(result.cached for result in run().values())
+    assert len(_invocations(calls)) == 1
+
+    monkeypatch.setenv("SHELLCHECK_OPTS", "--exclude=SC2086")
+    assert not any(result.cached for result in run().values())
+    (tmp_path / "home").mkdir()
+    (tmp_path / "home" / ".shellcheckrc").write_text("disable=SC2034\n")
+    assert not any(result.cached for result in run().values())
+    (tmp_path / "src" / ".shellcheckrc").write_text("shell=bash\n")
+    assert not any(result.cached for result in run().values())
+    assert all(result.cached for result in run().values())
+
+
+def test_partial_runs_keep_the_other_clean_entries(tmp_path, calls):
+    state = tmp_path / "state"
+    paths = _scripts(tmp_path / "src", one="echo 1", two="echo 2")
+
+    def clean_entries(paths):
+        linter = ShellcheckLinter(state)
+        results = _results(linter, paths)
+        linter.save()
+        return results, json.loads((state / ShellcheckLinter.FILENAME).read_text())["clean"]
+
+    _, full = clean_entries(paths)
+    assert set(full) == {os.path.abspath(path) for path in paths.values()}
+
+    paths["two"].write_text("#!/bin/sh\necho changed\n")
+    _, partial = clean_entries({"two": paths["two"]})
+    one, two = (os.path.abspath(paths[name]) for name in ("one", "two"))
+    assert partial[one] == full[one]
+    assert partial[two] != full[two]
+
+    paths["two"].write_text("#!/bin/sh\necho BAD\n")
+    _, dirty = clean_entries({"two": paths["two"]})
+    assert dirty == {one: full[one]}
+
+    results, _ = clean_entries(paths)
+    assert results["one"].cached and not results["two"].clean